@@ -1,17 +1,13 @@
 """Module for tg."""
 
-import asyncio
-import logging
-from asyncio import Task
-from typing import Any
-
-from aiogram import Bot, Dispatcher, types
-from fastapi import APIRouter, Depends
+import orjson
+from aiogram import Bot, types
+from fastapi import APIRouter, Depends, status
 from fastapi.responses import ORJSONResponse
 from starlette.requests import Request
 
-from integrations import get_dispatcher, get_bot
-from utils.background_tasks import tg_background_tasks
+from integrations import get_bot, get_update_router
+from utils.ingestion import UpdateRouter
 
 tg_router = APIRouter()
 
@@ -19,7 +15,7 @@ tg_router = APIRouter()
 @tg_router.post("/")
 async def tg_api(
     request: Request,
-    dp: Dispatcher = Depends(get_dispatcher),
+    update_router: UpdateRouter = Depends(get_update_router),
     bot: Bot = Depends(get_bot),
 ) -> ORJSONResponse:
     """
@@ -27,20 +23,21 @@ async def tg_api(
 
     Args:
         request (Request): The incoming HTTP request.
-        dp (Dispatcher): The dispatcher for handling updates.
+        update_router (UpdateRouter): Queues the update in the process
+                                      owning its user.
         bot (Bot): The Telegram bot instance (default: Depends on get_bot).
 
     Returns:
-        ORJSONResponse: A JSON response indicating success.
+        ORJSONResponse: A JSON response indicating success, or an error
+                        asking Telegram to deliver the update again later.
     """
-    data = await request.json()
-    update = types.Update(**data)
-
-    task: Task[Any] = asyncio.create_task(dp.feed_webhook_update(bot, update))
-    tg_background_tasks.add(task)
-
-    logging.info(len(tg_background_tasks))
-
-    task.add_done_callback(tg_background_tasks.discard)
-
+    body = await request.body()
+    update = types.Update.model_validate(
+        orjson.loads(body), context={"bot": bot}
+    )
+    if not await update_router.route(update, body):
+        return ORJSONResponse(
+            {"success": False},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
     return ORJSONResponse({"success": True})
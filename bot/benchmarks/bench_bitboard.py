@@ -0,0 +1,137 @@
+"""Module for bitboard benchmark.
+
+Compare the per-move cost of the list-of-lists board with the bitboard
+engine of ``GameBoard``.
+
+Run from the ``bot`` directory:
+
+    python -m benchmarks.bench_bitboard
+"""
+
+import json
+import random
+import timeit
+
+from utils.engine import EMPTY_CELL, GameBoard
+
+MOVES = 100_000
+
+
+def check_winner(board):
+    """
+    Check the list board for a winner the way handlers used to.
+
+    Args:
+        board (list): A 2D list representing the current state of the board.
+
+    Returns:
+        str or None: The symbol of the winning player ('X' or 'O').
+    """
+    lines = []
+    lines.extend(board)
+    lines.extend([[board[i][j] for i in range(3)] for j in range(3)])
+    lines.append([board[i][i] for i in range(3)])
+    lines.append([board[i][2 - i] for i in range(3)])
+
+    for line in lines:
+        if line[0] == line[1] == line[2] and line[0] != " ":
+            return line[0]
+    return None
+
+
+def is_board_full(board):
+    """
+    Check if the list board is full the way handlers used to.
+
+    Args:
+        board (list): A 2D list representing the current state of the board.
+
+    Returns:
+        bool: True if the board is full, False if there are any empty cells.
+    """
+    return all(cell != " " for row in board for cell in row)
+
+
+def random_positions(count: int) -> list[tuple[list[list[str]], int]]:
+    """
+    Generate mid-game positions together with a legal next move.
+
+    Args:
+        count (int): The number of positions to generate.
+
+    Returns:
+        list: Pairs of a list board and a free cell index.
+    """
+    positions = []
+    rng = random.Random(42)
+    while len(positions) < count:
+        cells = list(range(9))
+        rng.shuffle(cells)
+        taken = rng.randint(0, 7)
+        board = [[" "] * 3 for _ in range(3)]
+        for turn, index in enumerate(cells[:taken]):
+            board[index // 3][index % 3] = "X" if turn % 2 == 0 else "O"
+        positions.append((board, cells[taken]))
+    return positions
+
+
+def list_move(data: str, index: int) -> None:
+    """
+    Apply one move on the JSON-stored list board.
+
+    Args:
+        data (str): The JSON-encoded board as kept in FSM storage.
+        index (int): The cell to play.
+    """
+    board = json.loads(data)
+    i, j = divmod(index, 3)
+    if board[i][j] != " ":
+        return
+    board[i][j] = "X"
+    check_winner(board)
+    is_board_full(board)
+    json.dumps(board)
+
+
+def bitboard_move(data: str, index: int) -> None:
+    """
+    Apply one move on the JSON-stored bitboard.
+
+    Args:
+        data (str): The JSON-encoded board fields as kept in FSM storage.
+        index (int): The cell to play.
+    """
+    board = GameBoard.from_dict(json.loads(data))
+    row, col = divmod(index, board.size)
+    if board.is_occupied(row, col):
+        return
+    board.play("X", row, col)
+    board.is_full()
+    json.dumps(board.to_dict())
+
+
+def main() -> None:
+    """Run the benchmark and print the per-move timings."""
+    positions = random_positions(MOVES)
+    list_data = [(json.dumps(board), index) for board, index in positions]
+    bit_data = []
+    for board, index in positions:
+        cells = "".join(cell for row in board for cell in row)
+        position = GameBoard.from_cells(3, 3, cells.replace(" ", EMPTY_CELL))
+        bit_data.append((json.dumps(position.to_dict()), index))
+
+    list_time = timeit.timeit(
+        lambda: [list_move(data, index) for data, index in list_data], number=1
+    )
+    bit_time = timeit.timeit(
+        lambda: [bitboard_move(data, index) for data, index in bit_data],
+        number=1,
+    )
+
+    print(f"list board: {list_time / MOVES * 1e6:.2f} us/move")
+    print(f"bitboard:   {bit_time / MOVES * 1e6:.2f} us/move")
+    print(f"speedup:    {list_time / bit_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Module for game store benchmark.
+
+Measure the cost of finding a user's game as the number of running games
+grows to 10 000. Uses the Redis server from the environment, or an
+in-process fakeredis server when ``BENCH_FAKEREDIS=1``.
+
+Run from the ``bot`` directory:
+
+    python -m benchmarks.bench_game_store
+"""
+
+import asyncio
+import os
+import statistics
+import time
+
+from integrations.game_store import GameStore
+from integrations.redis_connection import get_redis
+from utils.engine import GameBoard
+
+GAME_COUNTS = (10, 100, 1_000, 10_000)
+LOOKUPS = 2_000
+
+
+def get_bench_redis():
+    """
+    Pick the Redis client to benchmark against.
+
+    Returns:
+        Redis: The configured client, or a fakeredis one.
+    """
+    if os.getenv("BENCH_FAKEREDIS") == "1":
+        import fakeredis
+
+        return fakeredis.FakeAsyncRedis()
+    return get_redis()
+
+
+async def fill(store: GameStore, start: int, stop: int) -> None:
+    """
+    Create games between pairs of users.
+
+    Args:
+        store (GameStore): The store to fill.
+        start (int): The number of the first game to create.
+        stop (int): The number after the last game to create.
+    """
+    board = GameBoard()
+    for number in range(start, stop):
+        await store.create(
+            f"bench-{number}",
+            board,
+            player_x=2 * number + 1,
+            name_x="x",
+            player_o=2 * number + 2,
+            name_o="o",
+        )
+
+
+async def lookup_latency(store: GameStore, games: int) -> list[float]:
+    """
+    Time lookups of users spread over all running games.
+
+    Args:
+        store (GameStore): The filled store.
+        games (int): The number of running games.
+
+    Returns:
+        list[float]: The latency of each lookup in seconds.
+    """
+    latencies = []
+    for lookup in range(LOOKUPS):
+        user_id = lookup * 7919 % (2 * games) + 1
+        start = time.perf_counter()
+        await store.find_user_game(user_id)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def main() -> None:
+    """Run the benchmark and print the results."""
+    redis = get_bench_redis()
+    store = GameStore(redis)
+    created = 0
+    try:
+        print("find_user_game latency")
+        for games in GAME_COUNTS:
+            await fill(store, created, games)
+            created = games
+            latencies = await lookup_latency(store, games)
+            print(
+                f"  {games:>6} games: "
+                f"p50={statistics.median(latencies) * 1e6:.0f}us "
+                f"p99={statistics.quantiles(latencies, n=100)[98] * 1e6:.0f}us"
+            )
+    finally:
+        for number in range(created):
+            game = await store.get(f"bench-{number}")
+            if game is not None:
+                await store.abandon(game)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
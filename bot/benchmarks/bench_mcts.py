@@ -0,0 +1,91 @@
+"""Module for MCTS benchmark.
+
+Report playouts per second on one core and the end-to-end latency of a bot
+move as more games ask the worker pool for moves at the same time.
+
+Run from the ``bot`` directory:
+
+    python -m benchmarks.bench_mcts
+"""
+
+import asyncio
+import os
+import statistics
+import time
+
+from utils.engine import VARIANTS, GameBoard
+from utils.mcts import MCTSPool, search
+
+TIME_BUDGET = 0.5
+CONCURRENCY = (1, 2, 4, 8, 16)
+
+
+def playouts_per_second(variant: str, batch_size: int) -> float:
+    """
+    Measure single-core search speed on an empty board.
+
+    Args:
+        variant (str): One of the keys of ``VARIANTS``.
+        batch_size (int): The number of playouts per new leaf.
+
+    Returns:
+        float: Playouts per second.
+    """
+    board = GameBoard.from_variant(variant)
+    start = time.perf_counter()
+    _, playouts = search(
+        f"bench-{variant}-{batch_size}",
+        board.to_dict(),
+        "X",
+        TIME_BUDGET,
+        batch_size=batch_size,
+    )
+    return playouts / (time.perf_counter() - start)
+
+
+async def move_latency(pool: MCTSPool, games: int) -> list[float]:
+    """
+    Ask the pool for moves in several games at once.
+
+    Args:
+        pool (MCTSPool): The worker pool.
+        games (int): The number of concurrent games.
+
+    Returns:
+        list[float]: The end-to-end latency of each move in seconds.
+    """
+    async def one_move(game_id: str) -> float:
+        start = time.perf_counter()
+        await pool.choose_move(game_id, GameBoard.from_variant("15x15"), "X")
+        return time.perf_counter() - start
+
+    return await asyncio.gather(
+        *(one_move(f"latency-{games}-{i}") for i in range(games))
+    )
+
+
+async def main() -> None:
+    """Run the benchmark and print the results."""
+    print("playouts per second per core")
+    for variant in VARIANTS:
+        for batch_size in (1, 8):
+            rate = playouts_per_second(variant, batch_size)
+            print(f"  {variant:>6} batch={batch_size}: {rate:,.0f}")
+
+    workers = os.cpu_count() or 1
+    pool = MCTSPool(workers=workers, time_budget=TIME_BUDGET)
+    print(f"\n15x15 move latency, {workers} workers, {TIME_BUDGET}s budget")
+    try:
+        for games in CONCURRENCY:
+            latencies = await move_latency(pool, games)
+            print(
+                f"  {games:>3} games: "
+                f"p50={statistics.median(latencies):.3f}s "
+                f"max={max(latencies):.3f}s"
+            )
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
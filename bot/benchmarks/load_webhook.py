@@ -0,0 +1,206 @@
+"""Module for webhook load test.
+
+Post synthetic updates from many users to the webhook served by 1, 2 and 4
+processes and report how many updates per second are handled. Every update
+runs a short bot-move search, so the handlers are CPU bound as in real
+games against the bot, and updates received by a process that does not own
+the user travel through the Redis streams like in production.
+
+Needs the Redis server from the environment. Run from the ``bot``
+directory:
+
+    python -m benchmarks.load_webhook
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import httpx
+from aiogram import Dispatcher, Router, types
+from fastapi import FastAPI
+
+from api.tg import tg_router
+from config import settings
+from integrations import get_bot, get_update_router
+from integrations.redis_connection import get_redis
+from main_workers import start_workers, stop_workers
+from utils.engine import GameBoard
+from utils.ingestion import UpdateQueue, UpdateRouter
+from utils.mcts import drop_tree, search
+
+WORKER_COUNTS = (1, 2, 4)
+UPDATES = 2_000
+USERS = 500
+CONCURRENCY = 64
+MOVE_PLAYOUTS = 200
+PORT = 8099
+
+HANDLED_KEY = "TICTACTOE:bench:handled"
+READY_KEY = "TICTACTOE:bench:ready"
+
+bench_router = Router()
+
+
+@bench_router.message()
+async def handle_bench_move(message: types.Message) -> None:
+    """
+    Search a bot move on a 5 x 5 board and count the handled update.
+
+    Args:
+        message (types.Message): The synthetic message.
+    """
+    game_id = f"load-{message.message_id}"
+    search(
+        game_id,
+        GameBoard.from_variant("5x5").to_dict(),
+        "X",
+        time_budget=1.0,
+        max_playouts=MOVE_PLAYOUTS,
+    )
+    drop_tree(game_id)
+    await get_redis().incr(HANDLED_KEY)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Start the ingestion of one benchmark process.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+
+    Yields:
+        None
+    """
+    dp = Dispatcher()
+    dp.include_router(bench_router)
+    update_queue = UpdateQueue(
+        dp,
+        get_bot(),
+        workers=settings.INGESTION_WORKERS,
+        maxsize=settings.INGESTION_QUEUE_SIZE,
+        put_timeout=settings.INGESTION_PUT_TIMEOUT,
+    )
+    update_queue.start()
+    update_router = UpdateRouter(
+        get_redis(),
+        update_queue,
+        worker=settings.WORKER_INDEX,
+        workers=settings.WORKER_COUNT,
+    )
+    update_router.start()
+    app.dependency_overrides[get_update_router] = lambda: update_router
+    await get_redis().incr(READY_KEY)
+
+    yield
+
+    await update_router.close()
+    await update_queue.close(settings.INGESTION_DRAIN_TIMEOUT)
+
+
+def create_bench_app() -> FastAPI:
+    """
+    Create the webhook application with the benchmark handler.
+
+    Returns:
+        FastAPI: The application serving the real webhook route.
+    """
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(tg_router)
+    return app
+
+
+def make_update(number: int) -> dict:
+    """
+    Build a message update from one of the synthetic users.
+
+    Args:
+        number (int): The number of the update.
+
+    Returns:
+        dict: The update as Telegram posts it.
+    """
+    user_id = 1 + number % USERS
+    return {
+        "update_id": number,
+        "message": {
+            "message_id": number,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "load"},
+            "text": "move",
+        },
+    }
+
+
+async def post_updates(client: httpx.AsyncClient) -> tuple[int, int]:
+    """
+    Post all updates with a fixed number of requests in flight.
+
+    Args:
+        client (httpx.AsyncClient): The client pointed at the webhook.
+
+    Returns:
+        tuple[int, int]: The numbers of accepted and rejected updates.
+    """
+    numbers = iter(range(UPDATES))
+    accepted = rejected = 0
+
+    async def post_next() -> None:
+        nonlocal accepted, rejected
+        for number in numbers:
+            response = await client.post("/", json=make_update(number))
+            if response.status_code == 200:
+                accepted += 1
+            else:
+                rejected += 1
+
+    await asyncio.gather(*(post_next() for _ in range(CONCURRENCY)))
+    return accepted, rejected
+
+
+async def run(workers: int) -> None:
+    """
+    Load the webhook served by a number of processes and print the result.
+
+    Args:
+        workers (int): The number of processes.
+    """
+    redis = get_redis()
+    await redis.delete(HANDLED_KEY, READY_KEY)
+    processes, sock = start_workers(
+        "benchmarks.load_webhook:create_bench_app", PORT, workers
+    )
+    try:
+        while int(await redis.get(READY_KEY) or 0) < workers:
+            await asyncio.sleep(0.1)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{PORT}", timeout=60
+        ) as client:
+            start = time.perf_counter()
+            accepted, rejected = await post_updates(client)
+            while int(await redis.get(HANDLED_KEY) or 0) < accepted:
+                await asyncio.sleep(0.01)
+            elapsed = time.perf_counter() - start
+        print(
+            f"  {workers} workers: {accepted / elapsed:,.0f} updates/s "
+            f"({rejected} rejected)"
+        )
+    finally:
+        stop_workers(processes, sock)
+
+
+async def main() -> None:
+    """Run the load test for each number of processes."""
+    print(
+        f"{UPDATES} updates from {USERS} users, "
+        f"{CONCURRENCY} requests in flight"
+    )
+    for workers in WORKER_COUNTS:
+        await run(workers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
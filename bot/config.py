@@ -19,6 +19,58 @@ class Settings(BaseSettings):
         REDIS_PORT (int): The port number of the Redis server.
         REDIS_PASSWORD (str): The password for the Redis server.
         TELEGRAM_API_TOKEN (str): The API token for the Telegram bot.
+        MCTS_WORKERS (int): The number of processes searching bot moves.
+        MCTS_TIME_BUDGET (float): Seconds a bot move may take on large boards.
+        MCTS_MAX_PLAYOUTS (int): The playout limit per bot move, 0 for none.
+        MCTS_BATCH_SIZE (int): The number of random playouts per new leaf.
+        KEYBOARD_CACHE_SIZE (int): The number of game keyboards kept ready.
+        MATCHMAKING_RATING_BAND (int): The largest rating difference between
+                                       paired players, 0 to pair in order
+                                       of waiting.
+        MATCHMAKING_BAND_WIDENING (float): Rating points added to the band
+                                           per second of waiting.
+        MATCHMAKING_CANDIDATES (int): The most waiting players inspected
+                                      above and below the rating when
+                                      pairing.
+        API_MAX_CONNECTIONS (int): The most open connections to the API.
+        API_MAX_KEEPALIVE_CONNECTIONS (int): The most idle connections kept
+                                             open to the API.
+        API_KEEPALIVE_EXPIRY (float): Seconds an idle connection is kept.
+        API_TIMEOUT (float): Seconds to wait for the API to respond.
+        API_CONNECT_TIMEOUT (float): Seconds to wait for a new connection.
+        API_HTTP2 (bool): Whether to talk HTTP/2 to the API when possible.
+        TOKEN_REFRESH_MARGIN (float): Seconds before expiry an access token
+                                      is refreshed.
+        TOKEN_CACHE_SIZE (int): The most access tokens kept in process.
+        PROFILE_CACHE_TTL (float): Seconds a player profile is cached.
+        PROFILE_CACHE_SIZE (int): The most player profiles kept in process.
+        PROFILE_FETCH_CONCURRENCY (int): The most profiles requested from
+                                         Telegram at once.
+        SEND_GLOBAL_RATE (float): Messages per second sent to Telegram.
+        SEND_CHAT_RATE (float): Messages per second sent to one chat.
+        SEND_CHAT_BURST (float): Messages sent to one chat at once.
+        SEND_MAX_IN_FLIGHT (int): The most messages waiting for Telegram.
+        SEND_DRAIN_TIMEOUT (float): Seconds given to queued messages at
+                                    shutdown.
+        INGESTION_WORKERS (int): The number of workers handling updates.
+        INGESTION_QUEUE_SIZE (int): The most updates waiting per worker.
+        INGESTION_PUT_TIMEOUT (float): Seconds an update waits for room in
+                                       a full queue before it is rejected.
+        INGESTION_DRAIN_TIMEOUT (float): Seconds given to queued updates
+                                         at shutdown.
+        WEBHOOK_WORKERS (int): The number of webhook processes started by
+                               ``main_workers``.
+        WORKER_INDEX (int): The index of this webhook process, set by
+                            ``main_workers``.
+        WORKER_COUNT (int): The number of webhook processes, set by
+                            ``main_workers``.
+        RESULTS_BATCH_SIZE (int): The most game results posted at once.
+        RESULTS_FLUSH_INTERVAL (float): Seconds the flusher waits for new
+                                        game results.
+        RESULTS_RETRY_DELAY (float): Seconds before game results that
+                                     failed to post are posted again.
+        RESULTS_CLAIM_IDLE (float): Seconds after which game results read
+                                    by a stopped process are taken over.
     """
 
     POSTGRES_HOST: str
@@ -67,5 +119,50 @@ class Settings(BaseSettings):
     WEBHOOK_DOMAIN: str
     JWT_SECRET: str
 
+    MCTS_WORKERS: int = 2
+    MCTS_TIME_BUDGET: float = 1.0
+    MCTS_MAX_PLAYOUTS: int = 0
+    MCTS_BATCH_SIZE: int = 1
+
+    KEYBOARD_CACHE_SIZE: int = 8192
+
+    MATCHMAKING_RATING_BAND: int = 0
+    MATCHMAKING_BAND_WIDENING: float = 10.0
+    MATCHMAKING_CANDIDATES: int = 32
+
+    API_MAX_CONNECTIONS: int = 100
+    API_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    API_KEEPALIVE_EXPIRY: float = 30.0
+    API_TIMEOUT: float = 5.0
+    API_CONNECT_TIMEOUT: float = 2.0
+    API_HTTP2: bool = False
+
+    TOKEN_REFRESH_MARGIN: float = 60.0
+    TOKEN_CACHE_SIZE: int = 10000
+
+    PROFILE_CACHE_TTL: float = 3600.0
+    PROFILE_CACHE_SIZE: int = 10000
+    PROFILE_FETCH_CONCURRENCY: int = 5
+
+    SEND_GLOBAL_RATE: float = 30.0
+    SEND_CHAT_RATE: float = 1.0
+    SEND_CHAT_BURST: float = 3.0
+    SEND_MAX_IN_FLIGHT: int = 10
+    SEND_DRAIN_TIMEOUT: float = 10.0
+
+    INGESTION_WORKERS: int = 16
+    INGESTION_QUEUE_SIZE: int = 100
+    INGESTION_PUT_TIMEOUT: float = 0.5
+    INGESTION_DRAIN_TIMEOUT: float = 10.0
+
+    WEBHOOK_WORKERS: int = 1
+    WORKER_INDEX: int = 0
+    WORKER_COUNT: int = 1
+
+    RESULTS_BATCH_SIZE: int = 100
+    RESULTS_FLUSH_INTERVAL: float = 1.0
+    RESULTS_RETRY_DELAY: float = 1.0
+    RESULTS_CLAIM_IDLE: float = 60.0
+
 
 settings = Settings()
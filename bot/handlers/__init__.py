@@ -3,13 +3,18 @@
 from .router import router
 from .leave import leave_game
 from .start import start_game
-from .play import handle_move
+from .versus_bot import start_bot_game
+from .play import handle_move, handle_page
 from .stats import show_stats
+from .top import show_top
 
 __all__ = (
     "router",
     "start_game",
     "leave_game",
+    "start_bot_game",
     "handle_move",
+    "handle_page",
     "show_stats",
+    "show_top",
 )
@@ -1,19 +1,32 @@
 """Module for leave in the bot."""
 
-from aiogram import Bot, types
+from aiogram import types
 from handlers import router
 from aiogram.filters import Command
+from handlers.versus_bot import AI_PLAYER_ID
+from integrations.game_store import GameStore
+from integrations.matchmaking import Matchmaker
+from utils.mcts import MCTSPool
+from utils.sender import Sender
 
 
 @router.message(Command("leave"))
-async def leave_game(message: types.Message, bot: Bot, games: dict):
+async def leave_game(
+    message: types.Message,
+    sender: Sender,
+    game_store: GameStore,
+    matchmaker: Matchmaker,
+    mcts_pool: MCTSPool,
+):
     """
-    Handle the /leave command, allowing a player to exit a game.
+    Handle the /leave command, allowing a player to exit a game or the queue.
 
     Args:
         message (types.Message): The Telegram message containing the command.
-        bot (Bot): The Telegram bot instance.
-        games (dict): A dictionary containing games, with game IDs as keys.
+        sender (Sender): The queue of outgoing messages.
+        game_store (GameStore): The shared store of games.
+        matchmaker (Matchmaker): The shared queue of waiting players.
+        mcts_pool (MCTSPool): The workers searching bot moves on large boards.
 
     Returns:
         None: This function returns None.
@@ -22,21 +35,22 @@ async def leave_game(message: types.Message, bot: Bot, games: dict):
         return
 
     user_id = message.from_user.id
-    game_id = next(
-        (gid for gid, game in games.items() if user_id in game['players']),
-        None
-    )
+    game_id = await game_store.find_user_game(user_id)
+    game = await game_store.get(game_id) if game_id is not None else None
 
-    if game_id is not None:
-        opponent = next(
-            pid for pid in games[game_id]['players'] if pid != user_id
-        )
-        await bot.send_message(
-            opponent,
-            f"{games[game_id]['players'][user_id]['username']} покинул игру.",
-            reply_markup=None
-        )
-        del games[game_id]
-        await message.answer("Вы покинули игру.")
+    if game is not None:
+        opponent = game.opponent_of(user_id)
+        await game_store.abandon(game)
+        if opponent == AI_PLAYER_ID:
+            mcts_pool.forget(game.id)
+        else:
+            sender.send_message(
+                opponent,
+                f"{game.name_of(game.symbol_of(user_id))} покинул игру.",
+                reply_markup=None
+            )
+        sender.answer(message, "Вы покинули игру.")
+    elif await matchmaker.leave(user_id):
+        sender.answer(message, "Вы покинули очередь.")
     else:
-        await message.answer("Вы не находитесь в игре.")
+        sender.answer(message, "Вы не находитесь в игре.")
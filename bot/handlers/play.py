@@ -1,136 +1,143 @@
 """Module for play in the bot."""
 
-from aiogram import F, Bot, types
-from aiogram.fsm.context import FSMContext
-from utils import get_auth_from_state
-from utils.state import GameState
+from aiogram import F, types
 from handlers import router
-from utils import (
-    check_winner,
-    get_game_keyboard,
-    is_board_full,
-    build_headers
+from integrations.game_store import (
+    FINISHED,
+    NO_GAME,
+    NOT_YOUR_TURN,
+    OK,
+    GameStore,
 )
-import httpx
+from integrations.result_outbox import ResultOutbox
+from utils import clamp_viewport, get_game_keyboard, get_viewport
+from utils.mcts import MCTSPool
+from utils.sender import GAME, Sender
+from utils.solver import SolutionTable
+from handlers.versus_bot import answer_ai_move, get_result_text
 
 
 @router.callback_query(F.data.startswith("cell_"))
 async def handle_move(
     callback_query: types.CallbackQuery,
-    bot: Bot,
-    state: FSMContext,
-    api_url: str,
+    sender: Sender,
+    result_outbox: ResultOutbox,
+    game_store: GameStore,
+    solution_table: SolutionTable,
+    mcts_pool: MCTSPool,
 ):
     """
     Process a player's move in an ongoing Tic-Tac-Toe game.
 
+    The move is checked and applied atomically by the game store, so the
+    handler never rewrites the game itself. The result of a finished game
+    goes to the outbox before the players are told, and is recorded in the
+    API in the background.
+
     Args:
         callback_query (types.CallbackQuery): Callback user's action.
-        bot (Bot): Send messages and interact with the Telegram API.
-        games (dict): A dictionary containing the current state of all games.
-        api_url (str): A string representing api url.
+        sender (Sender): The queue of outgoing messages.
+        result_outbox (ResultOutbox): The outbox of finished game results.
+        game_store (GameStore): The shared store of games.
+        solution_table (SolutionTable): The move table for games vs the bot.
+        mcts_pool (MCTSPool): The workers searching bot moves on large boards.
     """
-    games =  await state.get_data('games')
     user_id = callback_query.from_user.id
-    game_id = next(
-        (gid for gid, game in games.items() if user_id in game["players"]),
-        None
-    )
+    game_id = await game_store.find_user_game(user_id)
     if game_id is None:
         await callback_query.answer("Начните новую игру с /start")
         return
-    board = games[game_id]["board"]
-    turn = games[game_id]["turn"]
-    opponent_id: int = next(
-        pid for pid in games[game_id]["players"] if pid != user_id
-    )
-    username = games[game_id]["players"][user_id]["username"]
 
-    if turn != games[game_id]["players"][opponent_id]["symbol"]:
-        await callback_query.answer("Не ваш ход!")
+    if callback_query.data is None or callback_query.message is None:
         return
-
-    if callback_query.data is None:
+    if isinstance(callback_query.message, types.InaccessibleMessage):
         return
     i, j = map(int, callback_query.data.split("_")[1:])
-    if board[i][j] != " ":
+
+    result = await game_store.apply_move(game_id, user_id, i, j)
+    game = result.game
+    if result.code in (NO_GAME, FINISHED) or game is None:
+        await callback_query.answer("Начните новую игру с /start")
+        return
+    if result.code == NOT_YOUR_TURN:
+        await callback_query.answer("Не ваш ход!")
+        return
+    if result.code != OK:
         await callback_query.answer("Неверный ход! Эта клетка уже занята.")
         return
 
-    if (
-        isinstance(
-            callback_query.message,
-            types.InaccessibleMessage
-        ) or callback_query.message is None
-    ):
-        return
-    board[i][j] = turn
-    winner = check_winner(board)
-    if winner:
-        if winner == "O":
-            winner = games[game_id]['players'][opponent_id]['username']
+    if game.ai:
+        if game.finished:
+            mcts_pool.forget(game_id)
+            sender.edit_text(
+                callback_query.message,
+                get_result_text(game),
+                reply_markup=None,
+            )
         else:
-            winner = games[game_id]['players'][user_id]['username']
-        await callback_query.message.edit_text(
-            f"Игра окончена! {winner} победил!", reply_markup=None
-        )
-        games.pop(game_id)
-        await bot.send_message(
-            opponent_id, f"Игра окончена! {winner} победил!", reply_markup=None
-        )
-        access_token = await get_auth_from_state(
-            state,
-            api_url,
-            user_id,
-            username
-        )
-        async with httpx.AsyncClient(
-            base_url=api_url, headers=build_headers(access_token)
-        ) as client:
-            await client.post(
-                "/games/",
-                json={
-                    "player1_id": user_id if turn == "X" else opponent_id,
-                    "player2_id": opponent_id if turn == "X" else user_id,
-                    "result": winner,
-                },
+            await answer_ai_move(
+                callback_query.message,
+                sender,
+                game_store,
+                game,
+                solution_table,
+                mcts_pool,
             )
+        await callback_query.answer()
         return
-    if is_board_full(board):
-        await callback_query.message.edit_text(
-            "Игра окончена! Ничья!", reply_markup=None
-        )
-        games.pop(game_id)
-        await bot.send_message(
-            opponent_id,
-            "Игра окончена! Ничья!",
-            reply_markup=None
+
+    opponent_id = game.opponent_of(user_id)
+    if game.finished:
+        await result_outbox.append(
+            game, user_id, callback_query.from_user.username or ""
         )
-        access_token = await get_auth_from_state(
-            state,
-            api_url,
-            user_id,
-            username
+        text = get_result_text(game)
+        sender.edit_text(callback_query.message, text, reply_markup=None)
+        sender.send_message(
+            opponent_id, text, reply_markup=None, priority=GAME
         )
-        async with httpx.AsyncClient(
-            base_url=api_url, headers=build_headers(access_token)
-        ) as client:
-            await client.post(
-                "/games/",
-                json={
-                    "player1_id": user_id,
-                    "player2_id": opponent_id,
-                    "result": "draw",
-                },
-            )
         return
-    games[game_id]["turn"] = "O" if turn == "X" else "X"
-    await state.update_data(games=games)
-    await callback_query.message.edit_text(
-        f"Ход {games[game_id]['players'][opponent_id]['username']}:",
-        reply_markup=get_game_keyboard(board),
+
+    keyboard = get_game_keyboard(game.board, *get_viewport(game.board, i, j))
+    sender.edit_text(
+        callback_query.message,
+        f"Ход {game.name_of(game.turn)}:",
+        reply_markup=keyboard,
+    )
+    sender.send_message(
+        opponent_id, "Ваш ход:", reply_markup=keyboard, priority=GAME
+    )
+    await callback_query.answer()
+
+
+@router.callback_query(F.data.startswith("page_"))
+async def handle_page(
+    callback_query: types.CallbackQuery,
+    sender: Sender,
+    game_store: GameStore,
+):
+    """
+    Scroll the keyboard of a board larger than Telegram's button limits.
+
+    Args:
+        callback_query (types.CallbackQuery): Callback user's action.
+        sender (Sender): The queue of outgoing messages.
+        game_store (GameStore): The shared store of games.
+    """
+    game_id = await game_store.find_user_game(callback_query.from_user.id)
+    game = await game_store.get(game_id) if game_id is not None else None
+    if game is None:
+        await callback_query.answer("Начните новую игру с /start")
+        return
+    if callback_query.data is None or callback_query.message is None:
+        return
+    if isinstance(callback_query.message, types.InaccessibleMessage):
+        return
+    top, left = clamp_viewport(
+        game.board, *map(int, callback_query.data.split("_")[1:])
     )
-    await bot.send_message(
-        opponent_id, f"Ваш ход:", reply_markup=get_game_keyboard(board)
+    sender.edit_reply_markup(
+        callback_query.message,
+        reply_markup=get_game_keyboard(game.board, top, left),
     )
     await callback_query.answer()
@@ -4,11 +4,20 @@ import logging
 import uuid
 from http import HTTPStatus
 from aiogram import Bot, types
-from aiogram.filters import Command
-from aiogram.fsm.context import FSMContext
+from aiogram.filters import Command, CommandObject
 from handlers.router import router
-from utils.state import GameState
+from integrations.game_store import GameStore
+from integrations.matchmaking import (
+    DEFAULT_RATING,
+    PAIRED,
+    QUEUED,
+    Matchmaker,
+)
+from integrations.profile_cache import Profile, ProfileCache
+from integrations.token_manager import TokenManager
 from utils import get_game_keyboard
+from utils.engine import DEFAULT_VARIANT, VARIANTS, GameBoard
+from utils.sender import GAME, Sender
 
 import httpx
 
@@ -18,78 +27,116 @@ import httpx
 )
 async def start_game(
     message: types.Message,
+    command: CommandObject,
     bot: Bot,
-    state: FSMContext,
-    queue: list,
-    api_url: str,
+    sender: Sender,
+    token_manager: TokenManager,
+    matchmaker: Matchmaker,
+    api_client: httpx.AsyncClient,
+    game_store: GameStore,
+    profile_cache: ProfileCache,
 ):
     """
     Initiate a new Tic-Tac-Toe game or adds the user to the waiting queue.
 
     Args:
         message (types.Message): The message object initiating the game.
-        bot (Bot): The bot used to send messages with the Telegram API.
-        state (FSMContext): Machine context for managing user states.
-        games (dict): A dictionary containing games, keyed by game ID.
-        queue (list): A list of user IDs waiting for an opponent.
-        api_url (str): A string representing api url.
+        command (CommandObject): The parsed command, its argument selects
+                                 the board variant (e.g. ``/start 5x5``).
+        bot (Bot): The bot used to look up players with the Telegram API.
+        sender (Sender): The queue of outgoing messages.
+        token_manager (TokenManager): The cache of access tokens.
+        matchmaker (Matchmaker): The shared queue of waiting players.
+        api_client (httpx.AsyncClient): The client for the API.
+        game_store (GameStore): The shared store of games.
+        profile_cache (ProfileCache): The cache of player profiles.
     """
     logging.info(f"MESSAGE {message}")
     if message.from_user is None:
         return
 
-    if message.from_user.id in queue:
-        await message.answer("Вы уже в очереди. Пожалуйста, подождите противника.")
+    variant = (command.args or DEFAULT_VARIANT).strip()
+    if variant not in VARIANTS:
+        sender.answer(
+            message,
+            f"Доступные поля: {', '.join(VARIANTS)}. Например: /start 5x5"
+        )
+        return
+
+    if await matchmaker.is_queued(message.from_user.id):
+        sender.answer(
+            message, "Вы уже в очереди. Пожалуйста, подождите противника."
+        )
+        return
+    if await game_store.find_user_game(message.from_user.id) is not None:
+        sender.answer(
+            message, "Вы уже в игре. Чтобы выйти, отправьте /leave"
+        )
         return
-    async with httpx.AsyncClient(base_url=api_url) as client:
-        response = await client.post(
-            "/users/",
-            json={
-                "telegram_id": message.from_user.id,
-                "username": message.from_user.username,
-            },
+    response = await api_client.post(
+        "/users/",
+        json={
+            "telegram_id": message.from_user.id,
+            "username": message.from_user.username,
+        },
+    )
+    if response.status_code != HTTPStatus.CREATED:
+        sender.answer(
+            message,
+            "Не удалось зарегистрировать пользователя. Попробуйте еще раз."
         )
-        await state.update_data({"access_token": response.json()["access_token"]})
-        if response.status_code != HTTPStatus.CREATED:
-            await message.answer(
-                "Не удалось зарегистрировать пользователя. Попробуйте еще раз."
+        return
+    user = response.json()
+    await token_manager.store(message.from_user.id, user["access_token"])
+    await profile_cache.remember(Profile.from_user(message.from_user))
+
+    match = await matchmaker.join(
+        message.from_user.id,
+        variant,
+        round(user.get("rating", DEFAULT_RATING)),
+    )
+    if match.status == PAIRED and match.opponent is not None:
+        opponent = match.opponent
+        opponent_profile = await profile_cache.get(bot, opponent)
+        opponent_name = ""
+        if opponent_profile is not None and opponent_profile.first_name:
+            opponent_name = opponent_profile.first_name
+        game = await game_store.create(
+            str(uuid.uuid4()),
+            GameBoard.from_variant(variant),
+            player_x=opponent,
+            name_x=opponent_name,
+            player_o=message.from_user.id,
+            name_o=message.from_user.first_name,
+        )
+        if game is None:
+            sender.answer(
+                message,
+                "Соперник уже начал другую игру. "
+                "Отправьте /start, чтобы найти нового."
             )
             return
-
-    if queue:
-        opponent = queue.pop(0)
-        board = [[" " for _ in range(3)] for _ in range(3)]
-        game_id = str(uuid.uuid4())
-        games = await state.get_data('games')
-        games[game_id] = {
-            "board": board,
-            "turn": "X",
-            "players": {
-                message.from_user.id: {
-                    "symbol": "X",
-                    "username": message.from_user.first_name,
-                },
-                opponent: {
-                    "symbol": "O",
-                    "username": (
-                        await bot.get_chat_member(opponent, opponent)
-                    ).user.first_name,
-                },
-            },
-        }
-        await bot.send_message(
+        keyboard = get_game_keyboard(game.board)
+        sender.send_message(
             opponent,
-            (
-                f"{
-                    games[game_id]['players'][message.from_user.id]['username']
-                }"
-                f" бросил вам вызов! Игра началась. Вы за 'X' и ходите первым!."
-            ),
-            reply_markup=get_game_keyboard(board),
+            f"{game.name_o} бросил вам вызов! Игра началась. "
+            "Вы за 'X' и ходите первым!",
+            reply_markup=keyboard,
+            priority=GAME,
+        )
+        sender.answer(
+            message,
+            "Игра началась! Вы за 'O'. Ожидайте ход соперника",
+            reply_markup=keyboard,
+            priority=GAME,
         )
-        await message.answer(
-            "Игра началась! Вы за 'O'. Ожидайте ход соперника", reply_markup=get_game_keyboard(board)
+    elif match.status == QUEUED:
+        sender.answer(
+            message,
+            "Вы добавлены в очередь. Ожидание противника...\n"
+            "Не хотите ждать? Сыграйте с ботом: /bot"
         )
     else:
-        queue.append(message.from_user.id)
-        await message.answer("Вы добавлены в очередь. Ожидание противника...")
+        sender.answer(
+            message, "Вы уже в очереди. Пожалуйста, подождите противника."
+        )
@@ -1,66 +1,85 @@
 """Module for stats."""
 
+from datetime import datetime
 from http import HTTPStatus
-from aiogram import Bot, types
+from aiogram import types
 from aiogram.filters import Command
-from aiogram.fsm.context import FSMContext
-from utils import get_auth_from_state, get_chat_info_by_id, build_headers
+from integrations.token_manager import TokenManager
+from utils.sender import Sender
+from utils import build_headers
 from handlers.router import router
 
 import httpx
 
 
+def get_stats_text(stats: dict) -> str:
+    """
+    Describe a user's stats.
+
+    Args:
+        stats (dict): The stats returned by the API.
+
+    Returns:
+        str: The message shown to the user.
+    """
+    lines = [
+        "Ваша статистика:\n",
+        f"Побед: {stats['wins']}",
+        f"Поражений: {stats['losses']}",
+        f"Ничьих: {stats['draws']}",
+        f"Рейтинг: {round(stats['rating'])}",
+    ]
+    streak = stats["current_streak"]
+    if streak > 0:
+        lines.append(f"Побед подряд: {streak}")
+    elif streak < 0:
+        lines.append(f"Поражений подряд: {-streak}")
+    lines.append(f"Лучшая серия побед: {stats['best_streak']}")
+    last_played_at = datetime.fromisoformat(stats["last_played_at"])
+    lines.append(f"Последняя игра: {last_played_at:%d.%m.%Y %H:%M} UTC")
+    return "\n".join(lines)
+
+
 @router.message(
     Command("stats"),
 )
-async def show_stats(message: types.Message, bot: Bot, state: FSMContext, api_url: str):
+async def show_stats(
+    message: types.Message,
+    sender: Sender,
+    token_manager: TokenManager,
+    api_client: httpx.AsyncClient,
+):
     """
-    Display the user's latest 10 Tic-Tac-Toe game results.
+    Display the user's wins, losses, draws and streaks.
 
     Args:
         message (types.Message): The message object /stats command.
-        bot (Bot): The bot used to send messages.
-        api_url (str): The url to api.
+        sender (Sender): The queue of outgoing messages.
+        token_manager (TokenManager): The cache of access tokens.
+        api_client (httpx.AsyncClient): The client for the API.
     """
     if message.from_user is None:
         return
     user_id = message.from_user.id
-    access_token = await get_auth_from_state(
-        state, api_url, user_id, message.from_user.username or ""
-    )
-    async with httpx.AsyncClient(
-        base_url=api_url, headers=build_headers(access_token)
-    ) as client:
-        response = await client.get(f"/games/{user_id}")
-
-        if response.status_code != HTTPStatus.OK:
-            await message.answer(
-                "Не удалось получить статистику игр. Попробуйте еще раз позже."
-            )
-            return
+    try:
+        access_token = await token_manager.get_token(
+            api_client, user_id, message.from_user.username or ""
+        )
+        response = await api_client.get(
+            f"/users/{user_id}/stats", headers=build_headers(access_token)
+        )
+    except httpx.HTTPError:
+        response = None
 
-        games = response.json()
-        if not games:
-            await message.answer("У вас нет сыгранных игр.")
-            return
-        latest_games = games[-10:]
-        stats_message = "Ваши последние 10 игр:\n\n"
-        for game in latest_games:
-            result = game.get("result")
-            user1 = await get_chat_info_by_id(bot, game["player1_id"])
-            user2 = await get_chat_info_by_id(bot, game["player2_id"])
-            if not user1.username or not user2.username or not result:
-                continue
-            if result == "X":
-                result = user1.username
-            elif result == "O":
-                result = user2.username
-            else:
-                result = "Ничья"
-            stats_message += f"{
-                user1.username
-            } vs {user2.username} - Результат: {
-                result
-            } \n"
+    if response is None or response.status_code != HTTPStatus.OK:
+        sender.answer(
+            message,
+            "Не удалось получить статистику игр. Попробуйте еще раз позже."
+        )
+        return
 
-        await message.answer(stats_message)
+    stats = response.json()
+    if stats["last_played_at"] is None:
+        sender.answer(message, "У вас нет сыгранных игр.")
+        return
+    sender.answer(message, get_stats_text(stats))
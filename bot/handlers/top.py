@@ -0,0 +1,109 @@
+"""Module for top."""
+
+import asyncio
+from http import HTTPStatus
+from aiogram import Bot, types
+from aiogram.filters import Command
+from integrations.profile_cache import ProfileCache
+from integrations.token_manager import TokenManager
+from utils.sender import Sender
+from utils import build_headers
+from handlers.router import router
+
+import httpx
+
+TOP_SIZE = 10
+
+
+def get_top_text(top: list[dict], names: dict[int, str], rank: dict) -> str:
+    """
+    Describe the leaderboard.
+
+    Args:
+        top (list[dict]): The best players returned by the API.
+        names (dict[int, str]): The names of the players by Telegram ID.
+        rank (dict): The place and rating of the user returned by the API.
+
+    Returns:
+        str: The message shown to the user.
+    """
+    lines = ["Лучшие игроки:\n"]
+    for player in top:
+        name = names.get(player["telegram_id"], str(player["telegram_id"]))
+        lines.append(f"{player['rank']}. {name} — {round(player['rating'])}")
+    if rank["rank"] is None:
+        lines.append("\nСыграйте игру, чтобы попасть в рейтинг.")
+    else:
+        lines.append(
+            f"\nВаше место: {rank['rank']} (рейтинг {round(rank['rating'])})"
+        )
+    return "\n".join(lines)
+
+
+@router.message(
+    Command("top"),
+)
+async def show_top(
+    message: types.Message,
+    bot: Bot,
+    sender: Sender,
+    token_manager: TokenManager,
+    api_client: httpx.AsyncClient,
+    profile_cache: ProfileCache,
+):
+    """
+    Display the highest rated players and the user's own place.
+
+    Args:
+        message (types.Message): The message object /top command.
+        bot (Bot): The bot used to look up players with the Telegram API.
+        sender (Sender): The queue of outgoing messages.
+        token_manager (TokenManager): The cache of access tokens.
+        api_client (httpx.AsyncClient): The client for the API.
+        profile_cache (ProfileCache): The cache of player profiles.
+    """
+    if message.from_user is None:
+        return
+    user_id = message.from_user.id
+    try:
+        access_token = await token_manager.get_token(
+            api_client, user_id, message.from_user.username or ""
+        )
+        headers = build_headers(access_token)
+        responses = await asyncio.gather(
+            api_client.get(
+                "/leaderboard", params={"limit": TOP_SIZE}, headers=headers
+            ),
+            api_client.get(f"/users/{user_id}/rank", headers=headers),
+        )
+    except httpx.HTTPError:
+        responses = []
+
+    if not responses or any(
+        response.status_code != HTTPStatus.OK for response in responses
+    ):
+        sender.answer(
+            message,
+            "Не удалось получить рейтинг игроков. Попробуйте еще раз позже."
+        )
+        return
+
+    top_response, rank_response = responses
+    top = top_response.json()
+    if not top:
+        sender.answer(message, "Пока никто не сыграл ни одной игры.")
+        return
+    profiles = await profile_cache.get_many(
+        bot,
+        [player["telegram_id"] for player in top],
+        api_client,
+        access_token,
+    )
+    names = {
+        player_id: profile.first_name or profile.username
+        for player_id, profile in profiles.items()
+        if profile.first_name or profile.username
+    }
+    sender.answer(
+        message, get_top_text(top, names, rank_response.json())
+    )
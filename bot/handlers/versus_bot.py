@@ -0,0 +1,151 @@
+"""Module for playing against the bot."""
+
+import uuid
+
+from aiogram import types
+from aiogram.filters import Command, CommandObject
+from handlers.router import router
+from integrations.game_store import DRAW, Game, GameStore
+from integrations.matchmaking import Matchmaker
+from utils import get_game_keyboard, get_viewport
+from utils.bitboard import BOARD_SIZE
+from utils.engine import DEFAULT_VARIANT, VARIANTS, GameBoard
+from utils.mcts import MCTSPool
+from utils.sender import GAME, Sender
+from utils.solver import DEFAULT_DIFFICULTY, DIFFICULTIES, SolutionTable
+
+AI_PLAYER_ID = 0
+AI_USERNAME = "Бот"
+
+
+def get_result_text(game: Game) -> str:
+    """
+    Describe how a finished game ended.
+
+    Args:
+        game (Game): The finished game.
+
+    Returns:
+        str: The message shown to the players.
+    """
+    if game.status == DRAW:
+        return "Игра окончена! Ничья!"
+    return f"Игра окончена! {game.name_of(game.status)} победил!"
+
+
+@router.message(Command("bot"))
+async def start_bot_game(
+    message: types.Message,
+    command: CommandObject,
+    sender: Sender,
+    matchmaker: Matchmaker,
+    game_store: GameStore,
+):
+    """
+    Start a game against the bot.
+
+    Args:
+        message (types.Message): The message object initiating the game.
+        command (CommandObject): The parsed command, its arguments select
+                                 the board variant and the difficulty
+                                 (e.g. ``/bot 5x5 easy``).
+        sender (Sender): The queue of outgoing messages.
+        matchmaker (Matchmaker): The shared queue of waiting players.
+        game_store (GameStore): The shared store of games.
+    """
+    if message.from_user is None:
+        return
+
+    variant = DEFAULT_VARIANT
+    difficulty = DEFAULT_DIFFICULTY
+    for arg in (command.args or "").split():
+        if arg in VARIANTS:
+            variant = arg
+        elif arg in DIFFICULTIES:
+            difficulty = arg
+        else:
+            sender.answer(
+                message,
+                f"Доступные поля: {', '.join(VARIANTS)}. "
+                f"Доступные уровни: {', '.join(DIFFICULTIES)}. "
+                "Например: /bot 5x5 easy"
+            )
+            return
+
+    user_id = message.from_user.id
+    if await game_store.find_user_game(user_id) is not None:
+        sender.answer(
+            message, "Вы уже в игре. Чтобы выйти, отправьте /leave"
+        )
+        return
+    await matchmaker.leave(user_id)
+
+    game = await game_store.create(
+        str(uuid.uuid4()),
+        GameBoard.from_variant(variant),
+        player_x=user_id,
+        name_x=message.from_user.first_name,
+        player_o=AI_PLAYER_ID,
+        name_o=AI_USERNAME,
+        ai=difficulty,
+    )
+    if game is None:
+        sender.answer(
+            message, "Вы уже в игре. Чтобы выйти, отправьте /leave"
+        )
+        return
+    sender.answer(
+        message,
+        "Игра с ботом началась! Вы за 'X' и ходите первым.",
+        reply_markup=get_game_keyboard(game.board),
+        priority=GAME,
+    )
+
+
+async def answer_ai_move(
+    message: types.Message,
+    sender: Sender,
+    game_store: GameStore,
+    game: Game,
+    solution_table: SolutionTable,
+    mcts_pool: MCTSPool,
+):
+    """
+    Play the bot's reply after the player's move and show the result.
+
+    The 3 x 3 board is answered from the solution table, larger boards are
+    searched by the MCTS workers.
+
+    Args:
+        message (types.Message): The message holding the game keyboard.
+        sender (Sender): The queue of outgoing messages.
+        game_store (GameStore): The shared store of games.
+        game (Game): The game after the player's move.
+        solution_table (SolutionTable): The perfect-play move table.
+        mcts_pool (MCTSPool): The workers searching moves on large boards.
+    """
+    board = game.board
+    if board.size == BOARD_SIZE and board.win_length == BOARD_SIZE:
+        move = solution_table.choose_move(board.x, board.o, game.ai)
+    else:
+        move = await mcts_pool.choose_move(
+            game.id, board, game.turn, DIFFICULTIES[game.ai]
+        )
+    row, col = divmod(move, board.size)
+    result = await game_store.apply_move(game.id, AI_PLAYER_ID, row, col)
+    game = result.game
+    if game is None:
+        return
+    if game.finished:
+        mcts_pool.forget(game.id)
+        sender.edit_text(
+            message, get_result_text(game), reply_markup=None
+        )
+        return
+    sender.edit_text(
+        message,
+        "Ваш ход:",
+        reply_markup=get_game_keyboard(
+            game.board, *get_viewport(game.board, row, col)
+        ),
+    )
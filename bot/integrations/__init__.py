@@ -1,9 +1,31 @@
 """Module for init."""
 
+from .api_client import create_api_client
 from .bot import get_bot
 from .dispatcher import get_dispatcher
+from .game_store import get_game_store
+from .ingestion import get_update_queue, get_update_router
+from .matchmaking import get_matchmaker
+from .mcts_pool import create_mcts_pool
+from .profile_cache import get_profile_cache
+from .result_outbox import create_result_flusher, get_result_outbox
+from .sender import create_sender
+from .solution_table import get_solution_table
+from .token_manager import get_token_manager
 
 __all__ = (
+    "create_api_client",
     "get_bot",
     "get_dispatcher",
+    "get_game_store",
+    "get_update_queue",
+    "get_update_router",
+    "get_matchmaker",
+    "create_mcts_pool",
+    "get_profile_cache",
+    "create_result_flusher",
+    "get_result_outbox",
+    "create_sender",
+    "get_solution_table",
+    "get_token_manager",
 )
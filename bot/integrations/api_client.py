@@ -0,0 +1,103 @@
+"""Module for api_client.
+
+One long-lived HTTP client for every call the bot makes to the API, so
+requests reuse pooled keep-alive connections instead of opening a new one
+per move or per /stats.
+"""
+
+import logging
+import time
+
+import httpx
+
+from config import settings
+from metrics import (
+    API_POOL_CONNECTIONS,
+    API_REQUEST_DURATION,
+    API_REQUESTS_IN_FLIGHT,
+)
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Transport that reports requests and pool usage to Prometheus."""
+
+    async def handle_async_request(
+        self, request: httpx.Request
+    ) -> httpx.Response:
+        """
+        Send a request and record its duration.
+
+        Args:
+            request (httpx.Request): The outgoing request.
+
+        Returns:
+            httpx.Response: The response of the API.
+        """
+        start = time.perf_counter()
+        status = "error"
+        API_REQUESTS_IN_FLIGHT.inc()
+        try:
+            response = await super().handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            API_REQUESTS_IN_FLIGHT.dec()
+            API_REQUEST_DURATION.labels(request.method, status).observe(
+                time.perf_counter() - start
+            )
+
+    def count_connections(self, idle: bool) -> int:
+        """
+        Count the pooled connections in one state.
+
+        Args:
+            idle (bool): Whether to count idle or busy connections.
+
+        Returns:
+            int: The number of connections.
+        """
+        return sum(
+            connection.is_idle() == idle
+            for connection in self._pool.connections
+        )
+
+
+def create_api_client() -> httpx.AsyncClient:
+    """
+    Create the client used for all requests to the API.
+
+    HTTP/2 is only used when the ``h2`` package is installed, and only over
+    TLS, since httpx negotiates it through ALPN.
+
+    Returns:
+        httpx.AsyncClient: The client configured from the settings.
+    """
+    http2 = settings.API_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logging.warning("h2 is not installed, API_HTTP2 is ignored")
+            http2 = False
+
+    transport = InstrumentedTransport(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.API_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.API_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.API_KEEPALIVE_EXPIRY,
+        ),
+    )
+    API_POOL_CONNECTIONS.labels("idle").set_function(
+        lambda: transport.count_connections(idle=True)
+    )
+    API_POOL_CONNECTIONS.labels("active").set_function(
+        lambda: transport.count_connections(idle=False)
+    )
+    return httpx.AsyncClient(
+        base_url=settings.API_URL,
+        transport=transport,
+        timeout=httpx.Timeout(
+            settings.API_TIMEOUT, connect=settings.API_CONNECT_TIMEOUT
+        ),
+    )
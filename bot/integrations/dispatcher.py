@@ -4,15 +4,24 @@ from aiogram import Dispatcher
 from aiogram.fsm.storage.redis import RedisStorage
 from integrations.redis_connection import get_redis
 from integrations.bot import get_bot
-from config import settings
+from integrations.game_store import get_game_store
+from integrations.matchmaking import get_matchmaker
+from integrations.profile_cache import get_profile_cache
+from integrations.result_outbox import get_result_outbox
+from integrations.solution_table import get_solution_table
+from integrations.token_manager import get_token_manager
 
 redis = get_redis()
 storage = RedisStorage(redis)
 dp = Dispatcher(
     bot=get_bot(),
     storage=storage,
-    queue=[],
-    api_url=settings.API_URL
+    matchmaker=get_matchmaker(),
+    game_store=get_game_store(),
+    solution_table=get_solution_table(),
+    token_manager=get_token_manager(),
+    profile_cache=get_profile_cache(),
+    result_outbox=get_result_outbox(),
 )
 
 
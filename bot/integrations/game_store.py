@@ -0,0 +1,438 @@
+"""Module for game_store.
+
+Games shared by both players, one Redis hash per game.
+
+A move is validated and applied by a Lua script inside Redis: it checks the
+turn and the cell, updates the board, detects a win or a draw and bumps the
+game's version in a single round trip, so concurrent clicks cannot overwrite
+each other.
+
+Every player of an active game has a key pointing at that game. The keys are
+written by the script that creates the game, which refuses to start a game
+for a player who is already in one, and removed once the game is finished or
+abandoned, so finding a user's game is a single GET however many games are
+running. Games and their keys expire, so a game nobody finishes is not kept
+forever.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+
+from redis.asyncio import Redis
+
+from integrations.redis_connection import get_redis
+from utils.engine import EMPTY_CELL, GameBoard
+
+GAME_KEY = "TICTACTOE:game:{}"
+USER_GAME_KEY = "TICTACTOE:user_game:{}"
+ACTIVE_GAME_TTL = timedelta(days=1)
+FINISHED_GAME_TTL = timedelta(hours=1)
+
+ACTIVE = "active"
+DRAW = "draw"
+
+OK = "ok"
+NO_GAME = "no_game"
+FINISHED = "finished"
+NOT_YOUR_TURN = "not_your_turn"
+OCCUPIED = "occupied"
+
+APPLY_MOVE_SCRIPT = """
+local game = KEYS[1]
+local fields = redis.call(
+    'HMGET', game,
+    'status', 'turn', 'player_x', 'player_o', 'size', 'win_length', 'board'
+)
+if not fields[1] then
+    return {'no_game'}
+end
+if fields[1] ~= 'active' then
+    return {'finished', unpack(redis.call('HGETALL', game))}
+end
+
+local turn = fields[2]
+local player = fields[3]
+if turn == 'O' then
+    player = fields[4]
+end
+if player ~= ARGV[1] then
+    return {'not_your_turn', unpack(redis.call('HGETALL', game))}
+end
+
+local size = tonumber(fields[5])
+local win_length = tonumber(fields[6])
+local board = fields[7]
+local row = tonumber(ARGV[2])
+local col = tonumber(ARGV[3])
+local function cell(r, c)
+    local index = r * size + c + 1
+    return string.sub(board, index, index)
+end
+if row < 0 or row >= size or col < 0 or col >= size
+        or cell(row, col) ~= '.' then
+    return {'occupied', unpack(redis.call('HGETALL', game))}
+end
+
+local index = row * size + col + 1
+board = string.sub(board, 1, index - 1) .. turn .. string.sub(board, index + 1)
+
+local function run(d_row, d_col)
+    local count = 0
+    local r = row + d_row
+    local c = col + d_col
+    while count < win_length - 1 and r >= 0 and r < size and c >= 0
+            and c < size and cell(r, c) == turn do
+        count = count + 1
+        r = r + d_row
+        c = c + d_col
+    end
+    return count
+end
+
+local status = 'active'
+for _, d in ipairs({{0, 1}, {1, 0}, {1, 1}, {1, -1}}) do
+    if 1 + run(d[1], d[2]) + run(-d[1], -d[2]) >= win_length then
+        status = turn
+        break
+    end
+end
+if status == 'active' and not string.find(board, '.', 1, true) then
+    status = 'draw'
+end
+
+local next_turn = turn
+if status == 'active' then
+    next_turn = turn == 'X' and 'O' or 'X'
+end
+redis.call('HINCRBY', game, 'version', 1)
+redis.call(
+    'HSET', game,
+    'board', board, 'turn', next_turn, 'status', status,
+    'last_row', row, 'last_col', col
+)
+if status ~= 'active' then
+    redis.call('EXPIRE', game, ARGV[4])
+end
+return {'ok', unpack(redis.call('HGETALL', game))}
+"""
+
+CREATE_SCRIPT = """
+for i = 2, #KEYS do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        return 0
+    end
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+for i = 2, #KEYS do
+    redis.call('SET', KEYS[i], ARGV[1], 'EX', ARGV[2])
+end
+return 1
+"""
+
+RELEASE_SCRIPT = """
+for i = 2, #KEYS do
+    if redis.call('GET', KEYS[i]) == ARGV[1] then
+        redis.call('DEL', KEYS[i])
+    end
+end
+if ARGV[2] == '1' then
+    redis.call('DEL', KEYS[1])
+end
+"""
+
+
+@dataclass
+class Game:
+    """
+    Represent a game stored in Redis.
+
+    Attributes:
+        id (str): The ID of the game.
+        board (GameBoard): The current board.
+        turn (str): The symbol to move next.
+        status (str): ``ACTIVE``, ``DRAW`` or the winner's symbol.
+        player_x (int): The Telegram ID of the 'X' player.
+        player_o (int): The Telegram ID of the 'O' player.
+        name_x (str): The display name of the 'X' player.
+        name_o (str): The display name of the 'O' player.
+        ai (str): The bot's difficulty, empty for games between users.
+        version (int): The number of moves applied so far.
+        last_move (tuple[int, int] | None): The last played cell.
+    """
+
+    id: str
+    board: GameBoard
+    turn: str
+    status: str
+    player_x: int
+    player_o: int
+    name_x: str
+    name_o: str
+    ai: str
+    version: int
+    last_move: tuple[int, int] | None
+
+    @classmethod
+    def from_hash(cls, game_id: str, data: dict[bytes, bytes]) -> "Game":
+        """
+        Build a game from its Redis hash.
+
+        Args:
+            game_id (str): The ID of the game.
+            data (dict[bytes, bytes]): The fields returned by HGETALL.
+
+        Returns:
+            Game: The decoded game.
+        """
+        fields = {key.decode(): value.decode() for key, value in data.items()}
+        last_move = None
+        if "last_row" in fields:
+            last_move = int(fields["last_row"]), int(fields["last_col"])
+        return cls(
+            id=game_id,
+            board=GameBoard.from_cells(
+                int(fields["size"]), int(fields["win_length"]), fields["board"]
+            ),
+            turn=fields["turn"],
+            status=fields["status"],
+            player_x=int(fields["player_x"]),
+            player_o=int(fields["player_o"]),
+            name_x=fields["name_x"],
+            name_o=fields["name_o"],
+            ai=fields["ai"],
+            version=int(fields["version"]),
+            last_move=last_move,
+        )
+
+    @property
+    def finished(self) -> bool:
+        """
+        Check whether the game is over.
+
+        Returns:
+            bool: True after a win or a draw.
+        """
+        return self.status != ACTIVE
+
+    def symbol_of(self, user_id: int) -> str:
+        """
+        Get the symbol a player plays with.
+
+        Args:
+            user_id (int): The Telegram ID of the player.
+
+        Returns:
+            str: 'X' or 'O'.
+        """
+        return "X" if user_id == self.player_x else "O"
+
+    def opponent_of(self, user_id: int) -> int:
+        """
+        Get the other player of the game.
+
+        Args:
+            user_id (int): The Telegram ID of one player.
+
+        Returns:
+            int: The Telegram ID of the other player.
+        """
+        return self.player_o if user_id == self.player_x else self.player_x
+
+    def name_of(self, symbol: str) -> str:
+        """
+        Get the display name of the player with a symbol.
+
+        Args:
+            symbol (str): 'X' or 'O'.
+
+        Returns:
+            str: The player's display name.
+        """
+        return self.name_x if symbol == "X" else self.name_o
+
+
+@dataclass
+class MoveResult:
+    """
+    Represent the outcome of applying a move.
+
+    Attributes:
+        code (str): ``OK`` or the reason the move was rejected.
+        game (Game | None): The game after the attempt, None if it is gone.
+    """
+
+    code: str
+    game: Game | None
+
+
+class GameStore:
+    """Store games in Redis and apply moves atomically."""
+
+    def __init__(self, redis: Redis) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            redis (Redis): The Redis client.
+        """
+        self.redis = redis
+        self._apply_move = redis.register_script(APPLY_MOVE_SCRIPT)
+        self._create = redis.register_script(CREATE_SCRIPT)
+        self._release = redis.register_script(RELEASE_SCRIPT)
+
+    async def create(
+        self,
+        game_id: str,
+        board: GameBoard,
+        player_x: int,
+        name_x: str,
+        player_o: int,
+        name_o: str,
+        ai: str = "",
+    ) -> Game | None:
+        """
+        Save a new game with 'X' to move.
+
+        Nothing is saved if one of the players is already in a game.
+
+        Args:
+            game_id (str): The ID of the game.
+            board (GameBoard): The empty board of the chosen variant.
+            player_x (int): The Telegram ID of the 'X' player.
+            name_x (str): The display name of the 'X' player.
+            player_o (int): The Telegram ID of the 'O' player.
+            name_o (str): The display name of the 'O' player.
+            ai (str): The bot's difficulty, empty for games between users.
+
+        Returns:
+            Game | None: The created game, or None if a player is busy.
+        """
+        fields = {
+            "size": board.size,
+            "win_length": board.win_length,
+            "board": EMPTY_CELL * (board.size * board.size),
+            "turn": "X",
+            "status": ACTIVE,
+            "player_x": player_x,
+            "player_o": player_o,
+            "name_x": name_x,
+            "name_o": name_o,
+            "ai": ai,
+            "version": 0,
+        }
+        players = [player_x] if ai else [player_x, player_o]
+        created = await self._create(
+            keys=[
+                GAME_KEY.format(game_id),
+                *(USER_GAME_KEY.format(player) for player in players),
+            ],
+            args=[
+                game_id,
+                int(ACTIVE_GAME_TTL.total_seconds()),
+                *(item for field in fields.items() for item in field),
+            ],
+        )
+        if not created:
+            return None
+        return Game.from_hash(
+            game_id,
+            {key.encode(): str(value).encode() for key, value in fields.items()},
+        )
+
+    async def get(self, game_id: str) -> Game | None:
+        """
+        Load a game.
+
+        Args:
+            game_id (str): The ID of the game.
+
+        Returns:
+            Game | None: The game, or None if it does not exist.
+        """
+        data = await self.redis.hgetall(GAME_KEY.format(game_id))
+        if not data:
+            return None
+        return Game.from_hash(game_id, data)
+
+    async def find_user_game(self, user_id: int) -> str | None:
+        """
+        Find the active game a user plays in.
+
+        Args:
+            user_id (int): The Telegram ID of the user.
+
+        Returns:
+            str | None: The ID of the game, or None.
+        """
+        game_id = await self.redis.get(USER_GAME_KEY.format(user_id))
+        return game_id.decode() if game_id is not None else None
+
+    async def apply_move(
+        self, game_id: str, user_id: int, row: int, col: int
+    ) -> MoveResult:
+        """
+        Validate and apply a move in one round trip.
+
+        A move that finishes the game also frees both players for a new one.
+
+        Args:
+            game_id (str): The ID of the game.
+            user_id (int): The Telegram ID of the player making the move.
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+
+        Returns:
+            MoveResult: The outcome and the game after the attempt.
+        """
+        reply = await self._apply_move(
+            keys=[GAME_KEY.format(game_id)],
+            args=[user_id, row, col, int(FINISHED_GAME_TTL.total_seconds())],
+        )
+        code = reply[0].decode()
+        if code == NO_GAME:
+            return MoveResult(code, None)
+        data = dict(zip(reply[1::2], reply[2::2]))
+        game = Game.from_hash(game_id, data)
+        if code == OK and game.finished:
+            await self._release_game(game, delete=False)
+        return MoveResult(code, game)
+
+    async def abandon(self, game: Game) -> None:
+        """
+        Remove a game that a player has left.
+
+        Args:
+            game (Game): The game.
+        """
+        await self._release_game(game, delete=True)
+
+    async def _release_game(self, game: Game, delete: bool) -> None:
+        """
+        Free the players of a game for a new one.
+
+        Args:
+            game (Game): The game.
+            delete (bool): Whether to remove the game itself too.
+        """
+        players = [game.player_x] if game.ai else [game.player_x, game.player_o]
+        await self._release(
+            keys=[
+                GAME_KEY.format(game.id),
+                *(USER_GAME_KEY.format(player) for player in players),
+            ],
+            args=[game.id, int(delete)],
+        )
+
+
+game_store = GameStore(get_redis())
+
+
+def get_game_store() -> GameStore:
+    """
+    Retrieve the current instance of the GameStore.
+
+    Returns:
+        GameStore: The current instance of the GameStore.
+    """
+    return game_store
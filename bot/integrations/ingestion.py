@@ -0,0 +1,43 @@
+"""Module for ingestion."""
+
+from config import settings
+from integrations.bot import get_bot
+from integrations.dispatcher import get_dispatcher
+from integrations.redis_connection import get_redis
+from utils.ingestion import UpdateQueue, UpdateRouter
+
+update_queue = UpdateQueue(
+    get_dispatcher(),
+    get_bot(),
+    workers=settings.INGESTION_WORKERS,
+    maxsize=settings.INGESTION_QUEUE_SIZE,
+    put_timeout=settings.INGESTION_PUT_TIMEOUT,
+)
+
+
+def get_update_queue() -> UpdateQueue:
+    """
+    Retrieve the current instance of the UpdateQueue.
+
+    Returns:
+        UpdateQueue: The current instance of the UpdateQueue.
+    """
+    return update_queue
+
+
+update_router = UpdateRouter(
+    get_redis(),
+    update_queue,
+    worker=settings.WORKER_INDEX,
+    workers=settings.WORKER_COUNT,
+)
+
+
+def get_update_router() -> UpdateRouter:
+    """
+    Retrieve the current instance of the UpdateRouter.
+
+    Returns:
+        UpdateRouter: The current instance of the UpdateRouter.
+    """
+    return update_router
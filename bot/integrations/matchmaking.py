@@ -0,0 +1,244 @@
+"""Module for matchmaking.
+
+Players waiting for an opponent, shared by every bot replica through Redis.
+
+Each board variant has a sorted set of waiting users scored by rating and a
+sorted set of the times they joined. A Lua script pairs a new player with a
+waiting one or queues them in a single atomic step, so two replicas can
+never hand the same opponent to two players.
+
+With a rating band set, a waiting player accepts opponents whose rating
+differs by at most the band, and the band widens the longer they wait.
+Without it, the player who has waited longest is paired first.
+"""
+
+import time
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+
+from config import settings
+from integrations.redis_connection import get_redis
+
+QUEUE_KEY = "TICTACTOE:queue:{}"
+JOINED_KEY = "TICTACTOE:queue:{}:joined"
+QUEUED_USERS_KEY = "TICTACTOE:queued"
+DEFAULT_RATING = 1000
+
+PAIRED = "paired"
+QUEUED = "queued"
+ALREADY_QUEUED = "already_queued"
+
+JOIN_SCRIPT = """
+local queue = KEYS[1]
+local joined = KEYS[2]
+local queued_users = KEYS[3]
+local user = ARGV[1]
+local rating = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local variant = ARGV[4]
+local band = tonumber(ARGV[5])
+local widening = tonumber(ARGV[6])
+local candidates = tonumber(ARGV[7])
+
+if redis.call('HEXISTS', queued_users, user) == 1 then
+    return {'already_queued'}
+end
+
+local opponent = nil
+if band <= 0 then
+    opponent = redis.call('ZRANGE', joined, 0, 0)[1]
+else
+    local max_band = band + widening * math.max(
+        0, now - tonumber(redis.call('ZRANGE', joined, 0, 0, 'WITHSCORES')[2]
+            or now)
+    )
+    -- The closest candidates on each side, not the lowest in the band.
+    local above = redis.call(
+        'ZRANGEBYSCORE', queue, rating, rating + max_band,
+        'WITHSCORES', 'LIMIT', 0, candidates
+    )
+    local below = redis.call(
+        'ZREVRANGEBYSCORE', queue, rating, rating - max_band,
+        'WITHSCORES', 'LIMIT', 0, candidates
+    )
+    local best = nil
+    for _, nearby in ipairs({above, below}) do
+        for i = 1, #nearby, 2 do
+            local distance = math.abs(tonumber(nearby[i + 1]) - rating)
+            local waited = now - tonumber(
+                redis.call('ZSCORE', joined, nearby[i])
+            )
+            if distance <= band + widening * waited
+                    and (best == nil or distance < best) then
+                opponent = nearby[i]
+                best = distance
+            end
+        end
+    end
+end
+
+if opponent then
+    redis.call('ZREM', queue, opponent)
+    redis.call('ZREM', joined, opponent)
+    redis.call('HDEL', queued_users, opponent)
+    return {'paired', opponent}
+end
+
+redis.call('ZADD', queue, rating, user)
+redis.call('ZADD', joined, now, user)
+redis.call('HSET', queued_users, user, variant)
+return {'queued'}
+"""
+
+LEAVE_SCRIPT = """
+local variant = redis.call('HGET', KEYS[1], ARGV[1])
+if not variant then
+    return 0
+end
+if variant ~= ARGV[2] then
+    return -1
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('ZREM', KEYS[3], ARGV[1])
+redis.call('HDEL', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+@dataclass
+class MatchResult:
+    """
+    Represent the outcome of joining the queue.
+
+    Attributes:
+        status (str): ``PAIRED``, ``QUEUED`` or ``ALREADY_QUEUED``.
+        opponent (int | None): The Telegram ID of the paired opponent.
+    """
+
+    status: str
+    opponent: int | None = None
+
+
+class Matchmaker:
+    """Pair players waiting for an opponent on the same board variant."""
+
+    def __init__(
+        self,
+        redis: Redis,
+        rating_band: int = 0,
+        band_widening: float = 0.0,
+        candidates: int = 32,
+    ) -> None:
+        """
+        Initialize the matchmaker.
+
+        Args:
+            redis (Redis): The Redis client.
+            rating_band (int): The largest rating difference accepted right
+                               away, 0 to pair in order of waiting.
+            band_widening (float): Rating points added to a waiting player's
+                                   band per second of waiting.
+            candidates (int): The most waiting players inspected above and
+                              below the rating per join.
+        """
+        self.redis = redis
+        self.rating_band = rating_band
+        self.band_widening = band_widening
+        self.candidates = candidates
+        self._join = redis.register_script(JOIN_SCRIPT)
+        self._leave = redis.register_script(LEAVE_SCRIPT)
+
+    async def join(
+        self, user_id: int, variant: str, rating: int = DEFAULT_RATING
+    ) -> MatchResult:
+        """
+        Pair a player with a waiting opponent or put them in the queue.
+
+        Args:
+            user_id (int): The Telegram ID of the player.
+            variant (str): The board variant the player wants.
+            rating (int): The player's rating.
+
+        Returns:
+            MatchResult: The opponent found, or whether the player waits.
+        """
+        reply = await self._join(
+            keys=[
+                QUEUE_KEY.format(variant),
+                JOINED_KEY.format(variant),
+                QUEUED_USERS_KEY,
+            ],
+            args=[
+                user_id,
+                rating,
+                time.time(),
+                variant,
+                self.rating_band,
+                self.band_widening,
+                self.candidates,
+            ],
+        )
+        status = reply[0].decode()
+        if status == PAIRED:
+            return MatchResult(status, int(reply[1]))
+        return MatchResult(status)
+
+    async def is_queued(self, user_id: int) -> bool:
+        """
+        Check whether a player is waiting for an opponent.
+
+        Args:
+            user_id (int): The Telegram ID of the player.
+
+        Returns:
+            bool: True if the player is in any queue.
+        """
+        return bool(await self.redis.hexists(QUEUED_USERS_KEY, user_id))
+
+    async def leave(self, user_id: int) -> bool:
+        """
+        Remove a player from the queue.
+
+        The variant the player waits for is looked up first, so the script
+        is given every key it touches. If the player has moved to another
+        variant in between, the lookup is repeated.
+
+        Args:
+            user_id (int): The Telegram ID of the player.
+
+        Returns:
+            bool: True if the player was waiting.
+        """
+        while True:
+            variant = await self.redis.hget(QUEUED_USERS_KEY, user_id)
+            if variant is None:
+                return False
+            removed = await self._leave(
+                keys=[
+                    QUEUED_USERS_KEY,
+                    QUEUE_KEY.format(variant.decode()),
+                    JOINED_KEY.format(variant.decode()),
+                ],
+                args=[user_id, variant],
+            )
+            if removed >= 0:
+                return bool(removed)
+
+
+matchmaker = Matchmaker(
+    get_redis(),
+    rating_band=settings.MATCHMAKING_RATING_BAND,
+    band_widening=settings.MATCHMAKING_BAND_WIDENING,
+    candidates=settings.MATCHMAKING_CANDIDATES,
+)
+
+
+def get_matchmaker() -> Matchmaker:
+    """
+    Retrieve the current instance of the Matchmaker.
+
+    Returns:
+        Matchmaker: The current instance of the Matchmaker.
+    """
+    return matchmaker
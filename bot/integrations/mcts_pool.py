@@ -0,0 +1,19 @@
+"""Module for mcts_pool."""
+
+from config import settings
+from utils.mcts import MCTSPool
+
+
+def create_mcts_pool() -> MCTSPool:
+    """
+    Start the worker processes searching bot moves on large boards.
+
+    Returns:
+        MCTSPool: The pool configured from the settings.
+    """
+    return MCTSPool(
+        workers=settings.MCTS_WORKERS,
+        time_budget=settings.MCTS_TIME_BUDGET,
+        max_playouts=settings.MCTS_MAX_PLAYOUTS,
+        batch_size=settings.MCTS_BATCH_SIZE,
+    )
@@ -0,0 +1,274 @@
+"""Module for profile_cache.
+
+Telegram profiles of players, cached so that /stats and matchmaking do not
+ask Telegram for the same users again and again.
+
+A lookup goes through an in-process LRU with a TTL, then Redis, then
+Telegram; misses are fetched concurrently under a cap. Users Telegram does
+not return are looked up among the usernames stored by the API.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+import httpx
+from aiogram import Bot, types
+from redis.asyncio import Redis
+
+from config import settings
+from integrations.redis_connection import get_redis
+from metrics import PROFILE_LOOKUPS
+from utils import build_headers
+
+PROFILE_KEY = "TICTACTOE:profile:{}"
+
+
+@dataclass
+class Profile:
+    """
+    Represent the public profile of a player.
+
+    Attributes:
+        user_id (int): The Telegram ID of the player.
+        username (str | None): The Telegram username.
+        first_name (str | None): The first name.
+    """
+
+    user_id: int
+    username: str | None = None
+    first_name: str | None = None
+
+    @classmethod
+    def from_user(cls, user: types.User) -> "Profile":
+        """
+        Build a profile from a Telegram user.
+
+        Args:
+            user (types.User): The user who sent an update.
+
+        Returns:
+            Profile: The profile of the user.
+        """
+        return cls(user.id, user.username, user.first_name)
+
+    @property
+    def name(self) -> str | None:
+        """
+        Get the name to show for the player.
+
+        Returns:
+            str | None: The username, or the first name if there is none.
+        """
+        return self.username or self.first_name
+
+
+class ProfileCache:
+    """Cache Telegram profiles in process and in Redis."""
+
+    def __init__(
+        self, redis: Redis, ttl: float, maxsize: int, concurrency: int
+    ) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            redis (Redis): The Redis client shared by all replicas.
+            ttl (float): Seconds a profile is kept.
+            maxsize (int): The most profiles kept in process.
+            concurrency (int): The most profiles fetched from Telegram
+                               at once.
+        """
+        self.redis = redis
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.concurrency = concurrency
+        self._profiles: OrderedDict[int, tuple[Profile, float]] = OrderedDict()
+
+    def _remember(self, profile: Profile) -> None:
+        """
+        Keep a profile in process, dropping the least recently used one.
+
+        Args:
+            profile (Profile): The profile to keep.
+        """
+        self._profiles[profile.user_id] = profile, time.monotonic() + self.ttl
+        self._profiles.move_to_end(profile.user_id)
+        if len(self._profiles) > self.maxsize:
+            self._profiles.popitem(last=False)
+
+    async def remember(self, *profiles: Profile) -> None:
+        """
+        Save profiles that are already known, e.g. from an incoming update.
+
+        Args:
+            *profiles (Profile): The profiles to save.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for profile in profiles:
+                self._remember(profile)
+                pipe.set(
+                    PROFILE_KEY.format(profile.user_id),
+                    json.dumps(asdict(profile)),
+                    ex=int(self.ttl),
+                )
+            await pipe.execute()
+
+    async def _fetch(
+        self, bot: Bot, user_id: int, semaphore: asyncio.Semaphore
+    ) -> Profile | None:
+        """
+        Fetch a profile from Telegram.
+
+        Args:
+            bot (Bot): The bot used to call the Telegram API.
+            user_id (int): The Telegram ID of the player.
+            semaphore (asyncio.Semaphore): Caps the concurrent requests.
+
+        Returns:
+            Profile | None: The profile, or None if Telegram refused.
+        """
+        async with semaphore:
+            try:
+                chat = await bot.get_chat(user_id)
+            except Exception:
+                return None
+        return Profile(user_id, chat.username, chat.first_name)
+
+    async def _fetch_usernames(
+        self,
+        api_client: httpx.AsyncClient,
+        access_token: str,
+        user_ids: list[int],
+    ) -> list[Profile]:
+        """
+        Fetch the usernames stored by the API.
+
+        Args:
+            api_client (httpx.AsyncClient): The client for the API.
+            access_token (str): The access token of the requesting user.
+            user_ids (list[int]): The Telegram IDs of the players.
+
+        Returns:
+            list[Profile]: The profiles of the players the API knows.
+        """
+        response = await api_client.get(
+            "/users/",
+            params={"telegram_ids": user_ids},
+            headers=build_headers(access_token),
+        )
+        if response.is_error:
+            return []
+        return [
+            Profile(user["telegram_id"], user["username"])
+            for user in response.json()
+        ]
+
+    async def get_many(
+        self,
+        bot: Bot,
+        user_ids: list[int],
+        api_client: httpx.AsyncClient | None = None,
+        access_token: str | None = None,
+    ) -> dict[int, Profile]:
+        """
+        Get the profiles of several players.
+
+        Args:
+            bot (Bot): The bot used to call the Telegram API.
+            user_ids (list[int]): The Telegram IDs of the players.
+            api_client (httpx.AsyncClient | None): The client for the API,
+                                                   to fall back to the
+                                                   stored usernames.
+            access_token (str | None): The access token for the API.
+
+        Returns:
+            dict[int, Profile]: The profiles found, keyed by Telegram ID.
+        """
+        profiles: dict[int, Profile] = {}
+        now = time.monotonic()
+        unique_ids = list(dict.fromkeys(user_ids))
+        missing = []
+        for user_id in unique_ids:
+            cached = self._profiles.get(user_id)
+            if cached is not None and cached[1] > now:
+                self._profiles.move_to_end(user_id)
+                profiles[user_id] = cached[0]
+            else:
+                missing.append(user_id)
+        PROFILE_LOOKUPS.labels("memory").inc(len(profiles))
+        if not missing:
+            return profiles
+
+        stored = await self.redis.mget(
+            [PROFILE_KEY.format(user_id) for user_id in missing]
+        )
+        fetch = []
+        for user_id, data in zip(missing, stored):
+            if data is None:
+                fetch.append(user_id)
+                continue
+            profile = Profile(**json.loads(data))
+            self._remember(profile)
+            profiles[user_id] = profile
+        PROFILE_LOOKUPS.labels("redis").inc(len(missing) - len(fetch))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        fetched = await asyncio.gather(
+            *(self._fetch(bot, user_id, semaphore) for user_id in fetch)
+        )
+        found = [profile for profile in fetched if profile is not None]
+        PROFILE_LOOKUPS.labels("telegram").inc(len(found))
+        unknown = [
+            user_id
+            for user_id, profile in zip(fetch, fetched)
+            if profile is None
+        ]
+        if unknown and api_client is not None and access_token is not None:
+            stored_names = await self._fetch_usernames(
+                api_client, access_token, unknown
+            )
+            PROFILE_LOOKUPS.labels("api").inc(len(stored_names))
+            found.extend(stored_names)
+
+        for profile in found:
+            profiles[profile.user_id] = profile
+        if found:
+            await self.remember(*found)
+        PROFILE_LOOKUPS.labels("missing").inc(
+            len(unique_ids) - len(profiles)
+        )
+        return profiles
+
+    async def get(self, bot: Bot, user_id: int) -> Profile | None:
+        """
+        Get the profile of one player.
+
+        Args:
+            bot (Bot): The bot used to call the Telegram API.
+            user_id (int): The Telegram ID of the player.
+
+        Returns:
+            Profile | None: The profile, or None if it cannot be found.
+        """
+        return (await self.get_many(bot, [user_id])).get(user_id)
+
+
+profile_cache = ProfileCache(
+    get_redis(),
+    ttl=settings.PROFILE_CACHE_TTL,
+    maxsize=settings.PROFILE_CACHE_SIZE,
+    concurrency=settings.PROFILE_FETCH_CONCURRENCY,
+)
+
+
+def get_profile_cache() -> ProfileCache:
+    """
+    Retrieve the current instance of the ProfileCache.
+
+    Returns:
+        ProfileCache: The current instance of the ProfileCache.
+    """
+    return profile_cache
@@ -0,0 +1,315 @@
+"""Module for result_outbox.
+
+Results of finished games, recorded in the API in the background.
+
+A handler appends the result to a Redis stream in one call and moves on, so
+the players do not wait for the API. Every bot process runs a flusher that
+reads the stream through a shared consumer group and posts the results in
+batches to ``POST /games/bulk``. An entry is acknowledged and deleted only
+after the API has stored it or rejected it as invalid; anything else stays
+pending and is sent again, also by another process once the one that read
+it has been gone for a while. The ID of the game is sent as the idempotency key, so a
+result posted twice is stored once.
+"""
+
+import asyncio
+import logging
+
+import httpx
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from config import settings
+from integrations.game_store import Game
+from integrations.redis_connection import get_redis
+from integrations.token_manager import TokenManager, get_token_manager
+from logger import correlation_id_ctx
+from metrics import RESULTS_FLUSHED
+from utils import build_headers
+
+RESULTS_STREAM_KEY = "TICTACTOE:results"
+RESULTS_GROUP = "flusher"
+
+Entry = tuple[bytes, dict[bytes, bytes]]
+
+
+class ResultOutbox:
+    """Append the results of finished games for the flusher."""
+
+    def __init__(self, redis: Redis) -> None:
+        """
+        Initialize the outbox.
+
+        Args:
+            redis (Redis): The Redis client shared by all processes.
+        """
+        self.redis = redis
+
+    async def append(self, game: Game, user_id: int, username: str) -> None:
+        """
+        Save the result of a finished game between two users.
+
+        Args:
+            game (Game): The finished game.
+            user_id (int): The Telegram ID of the user whose token is used
+                           to post the result.
+            username (str): The username of that user.
+        """
+        await self.redis.xadd(
+            RESULTS_STREAM_KEY,
+            {
+                "game_id": game.id,
+                "player1_id": game.player_x,
+                "player2_id": game.player_o,
+                "result": game.status,
+                "user_id": user_id,
+                "username": username,
+                "correlation_id": correlation_id_ctx.get(""),
+            },
+        )
+
+
+class ResultFlusher:
+    """Post the results from the outbox to the API in batches."""
+
+    def __init__(
+        self,
+        redis: Redis,
+        api_client: httpx.AsyncClient,
+        token_manager: TokenManager,
+        consumer: str,
+        batch_size: int,
+        interval: float,
+        retry_delay: float,
+        claim_idle: float,
+    ) -> None:
+        """
+        Initialize the flusher.
+
+        Args:
+            redis (Redis): The Redis client shared by all processes.
+            api_client (httpx.AsyncClient): The client for the API.
+            token_manager (TokenManager): The cache of access tokens.
+            consumer (str): The name of this process in the consumer group.
+            batch_size (int): The most results posted at once.
+            interval (float): Seconds to wait for new results.
+            retry_delay (float): Seconds before results that failed are
+                                 posted again, doubled after every failure.
+            claim_idle (float): Seconds after which results read by a
+                                process that is gone are taken over.
+        """
+        self.redis = redis
+        self.api_client = api_client
+        self.token_manager = token_manager
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retry_delay = retry_delay
+        self.claim_idle = claim_idle
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start flushing."""
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop flushing, unsent results stay in the outbox."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _read(self, last_id: str) -> list[Entry]:
+        """
+        Read a batch of results for this process.
+
+        Args:
+            last_id (str): ``0`` for the results read before but not
+                           acknowledged, ``>`` for new ones.
+
+        Returns:
+            list[Entry]: The entries read.
+        """
+        reply = await self.redis.xreadgroup(
+            RESULTS_GROUP,
+            self.consumer,
+            {RESULTS_STREAM_KEY: last_id},
+            count=self.batch_size,
+            block=int(self.interval * 1000),
+        )
+        return reply[0][1] if reply else []
+
+    async def _claim(self) -> list[Entry]:
+        """
+        Take over the results left unacknowledged by other processes.
+
+        Returns:
+            list[Entry]: The entries taken over.
+        """
+        reply = await self.redis.xautoclaim(
+            RESULTS_STREAM_KEY,
+            RESULTS_GROUP,
+            self.consumer,
+            min_idle_time=int(self.claim_idle * 1000),
+            count=self.batch_size,
+        )
+        return reply[1]
+
+    async def _post(self, entries: list[Entry]) -> str:
+        """
+        Post results to the API in one request.
+
+        Args:
+            entries (list[Entry]): The stream entries holding the results.
+
+        Returns:
+            str: ``stored``, ``rejected`` if the API refused the batch as
+                 invalid, or ``failed`` if it should be posted again.
+        """
+        _, fields = entries[0]
+        correlation_id_ctx.set(fields[b"correlation_id"].decode())
+        try:
+            access_token = await self.token_manager.get_token(
+                self.api_client,
+                int(fields[b"user_id"]),
+                fields[b"username"].decode(),
+            )
+            response = await self.api_client.post(
+                "/games/bulk",
+                json=[
+                    {
+                        "player1_id": int(fields[b"player1_id"]),
+                        "player2_id": int(fields[b"player2_id"]),
+                        "result": fields[b"result"].decode(),
+                        "idempotency_key": fields[b"game_id"].decode(),
+                    }
+                    for _, fields in entries
+                ],
+                headers=build_headers(access_token),
+            )
+        except httpx.HTTPError as error:
+            logging.warning("Failed to post game results: %r", error)
+            outcome = "failed"
+        else:
+            if response.status_code in (
+                httpx.codes.UNAUTHORIZED,
+                httpx.codes.FORBIDDEN,
+                httpx.codes.TOO_MANY_REQUESTS,
+            ) or response.is_server_error:
+                logging.warning(
+                    "Failed to post game results: %s", response.status_code
+                )
+                outcome = "failed"
+            elif response.is_client_error:
+                outcome = "rejected"
+                if len(entries) == 1:
+                    logging.error(
+                        "API rejected game result %s: %s",
+                        fields[b"game_id"].decode(),
+                        response.text,
+                    )
+            else:
+                outcome = "stored"
+        return outcome
+
+    async def _flush(self, entries: list[Entry]) -> bool:
+        """
+        Post a batch of results and acknowledge the ones done with.
+
+        When the API refuses a batch, its results are posted one by one so
+        only the invalid ones are dropped.
+
+        Args:
+            entries (list[Entry]): The stream entries to post.
+
+        Returns:
+            bool: True if every result is done with.
+        """
+        outcome = await self._post(entries)
+        if outcome == "rejected" and len(entries) > 1:
+            outcomes = await asyncio.gather(
+                *(self._post([entry]) for entry in entries)
+            )
+        else:
+            outcomes = [outcome] * len(entries)
+        done = []
+        for (entry_id, _), outcome in zip(entries, outcomes):
+            RESULTS_FLUSHED.labels(outcome).inc()
+            if outcome != "failed":
+                done.append(entry_id)
+        if done:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.xack(RESULTS_STREAM_KEY, RESULTS_GROUP, *done)
+                pipe.xdel(RESULTS_STREAM_KEY, *done)
+                await pipe.execute()
+        return len(done) == len(entries)
+
+    async def _flush_pending(self) -> bool:
+        """
+        Post again the results left pending here or by a stopped process.
+
+        Returns:
+            bool: True if no such result is left.
+        """
+        entries = await self._read("0") or await self._claim()
+        return not entries or await self._flush(entries)
+
+    async def _run(self) -> None:
+        """Read, post and acknowledge results until stopped."""
+        try:
+            await self.redis.xgroup_create(
+                RESULTS_STREAM_KEY, RESULTS_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as error:
+            if "BUSYGROUP" not in str(error):
+                raise
+        delay = self.retry_delay
+        while True:
+            try:
+                if not await self._flush_pending():
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.claim_idle)
+                    continue
+                delay = self.retry_delay
+                entries = await self._read(">")
+                if entries:
+                    await self._flush(entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Failed to flush game results")
+                await asyncio.sleep(self.retry_delay)
+
+
+result_outbox = ResultOutbox(get_redis())
+
+
+def get_result_outbox() -> ResultOutbox:
+    """
+    Retrieve the current instance of the ResultOutbox.
+
+    Returns:
+        ResultOutbox: The current instance of the ResultOutbox.
+    """
+    return result_outbox
+
+
+def create_result_flusher(api_client: httpx.AsyncClient) -> ResultFlusher:
+    """
+    Create the flusher of this process.
+
+    Args:
+        api_client (httpx.AsyncClient): The client for the API.
+
+    Returns:
+        ResultFlusher: The flusher configured from the settings.
+    """
+    return ResultFlusher(
+        get_redis(),
+        api_client,
+        get_token_manager(),
+        consumer=f"worker-{settings.WORKER_INDEX}",
+        batch_size=settings.RESULTS_BATCH_SIZE,
+        interval=settings.RESULTS_FLUSH_INTERVAL,
+        retry_delay=settings.RESULTS_RETRY_DELAY,
+        claim_idle=settings.RESULTS_CLAIM_IDLE,
+    )
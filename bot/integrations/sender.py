@@ -0,0 +1,25 @@
+"""Module for sender."""
+
+from config import settings
+from integrations.bot import get_bot
+from utils.sender import Sender
+
+
+def create_sender() -> Sender:
+    """
+    Create the queue all outgoing messages and edits go through.
+
+    The global budget is shared by all webhook processes. A chat's messages
+    are all sent by the process owning its user, so each process keeps the
+    full per-chat budget.
+
+    Returns:
+        Sender: The sender configured from the settings.
+    """
+    return Sender(
+        get_bot(),
+        global_rate=settings.SEND_GLOBAL_RATE / settings.WORKER_COUNT,
+        chat_rate=settings.SEND_CHAT_RATE,
+        chat_burst=settings.SEND_CHAT_BURST,
+        max_in_flight=settings.SEND_MAX_IN_FLIGHT,
+    )
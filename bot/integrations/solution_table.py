@@ -0,0 +1,15 @@
+"""Module for solution_table."""
+
+from utils.solver import SolutionTable
+
+solution_table = SolutionTable.load()
+
+
+def get_solution_table() -> SolutionTable:
+    """
+    Retrieve the memory-mapped perfect-play table.
+
+    Returns:
+        SolutionTable: The table loaded at startup.
+    """
+    return solution_table
@@ -0,0 +1,212 @@
+"""Module for token_manager.
+
+Access tokens for the API, cached per user until shortly before they expire.
+
+Tokens are kept in process and in Redis, so a replica that has not seen a
+user yet still skips ``POST /users/``. A token close to its expiry is
+refreshed in the background while the current one is still used, and
+concurrent refreshes for one user share a single request.
+"""
+
+import asyncio
+import logging
+import time
+
+import httpx
+import jwt
+from redis.asyncio import Redis
+
+from config import settings
+from integrations.redis_connection import get_redis
+from metrics import TOKEN_REQUESTS
+
+TOKEN_KEY = "TICTACTOE:token:{}"
+MIN_TOKEN_LIFETIME = 5.0
+
+
+def get_expiry(token: str) -> float:
+    """
+    Read the expiry time of a token without verifying it.
+
+    Args:
+        token (str): The JWT issued by the API.
+
+    Returns:
+        float: The expiry as a Unix timestamp, 0 if the token has none.
+    """
+    claims = jwt.decode(token, options={"verify_signature": False})
+    return float(claims.get("expires") or claims.get("exp") or 0)
+
+
+class TokenManager:
+    """Cache access tokens and refresh them before they expire."""
+
+    def __init__(
+        self, redis: Redis, refresh_margin: float, maxsize: int
+    ) -> None:
+        """
+        Initialize the token manager.
+
+        Args:
+            redis (Redis): The Redis client shared by all replicas.
+            refresh_margin (float): Seconds before expiry to refresh a token.
+            maxsize (int): The most tokens kept in process.
+        """
+        self.redis = redis
+        self.refresh_margin = refresh_margin
+        self.maxsize = maxsize
+        self._tokens: dict[int, tuple[str, float]] = {}
+        self._refreshing: dict[int, asyncio.Task[str]] = {}
+
+    def _remember(self, user_id: int, token: str, expires: float) -> None:
+        """
+        Keep a token in process, dropping the oldest one when full.
+
+        Args:
+            user_id (int): The Telegram ID of the user.
+            token (str): The access token.
+            expires (float): The expiry as a Unix timestamp.
+        """
+        self._tokens.pop(user_id, None)
+        if len(self._tokens) >= self.maxsize:
+            del self._tokens[next(iter(self._tokens))]
+        self._tokens[user_id] = token, expires
+
+    async def store(self, user_id: int, token: str) -> None:
+        """
+        Save a token issued by the API.
+
+        Args:
+            user_id (int): The Telegram ID of the user.
+            token (str): The access token.
+        """
+        expires = get_expiry(token)
+        self._remember(user_id, token, expires)
+        lifetime = int(expires - time.time())
+        if lifetime > 0:
+            await self.redis.set(TOKEN_KEY.format(user_id), token, ex=lifetime)
+
+    async def _fetch(
+        self, api_client: httpx.AsyncClient, user_id: int, username: str
+    ) -> str:
+        """
+        Get a new token from the API.
+
+        Args:
+            api_client (httpx.AsyncClient): The client for the API.
+            user_id (int): The Telegram ID of the user.
+            username (str): The username of the user.
+
+        Returns:
+            str: The new access token.
+
+        Raises:
+            httpx.HTTPError: If the request fails or the API refuses it.
+        """
+        response = await api_client.post(
+            "/users/",
+            json={
+                "telegram_id": user_id,
+                "username": username,
+            },
+        )
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        await self.store(user_id, token)
+        return token
+
+    def _refresh(
+        self, api_client: httpx.AsyncClient, user_id: int, username: str
+    ) -> asyncio.Task[str]:
+        """
+        Start a refresh, or join the one already running for the user.
+
+        Args:
+            api_client (httpx.AsyncClient): The client for the API.
+            user_id (int): The Telegram ID of the user.
+            username (str): The username of the user.
+
+        Returns:
+            asyncio.Task[str]: The task resolving to the new token.
+        """
+        task = self._refreshing.get(user_id)
+        if task is not None:
+            TOKEN_REQUESTS.labels("shared").inc()
+            return task
+        TOKEN_REQUESTS.labels("api").inc()
+        task = asyncio.create_task(self._fetch(api_client, user_id, username))
+        self._refreshing[user_id] = task
+        task.add_done_callback(lambda _: self._forget(user_id, task))
+        return task
+
+    def _forget(self, user_id: int, task: asyncio.Task[str]) -> None:
+        """
+        Drop a finished refresh and log it if it failed.
+
+        A background refresh is not awaited by anyone, so its error is
+        only seen here.
+
+        Args:
+            user_id (int): The Telegram ID of the user.
+            task (asyncio.Task[str]): The finished refresh.
+        """
+        self._refreshing.pop(user_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(
+                "Failed to refresh the access token of user %s",
+                user_id,
+                exc_info=task.exception(),
+            )
+
+    async def get_token(
+        self, api_client: httpx.AsyncClient, user_id: int, username: str
+    ) -> str:
+        """
+        Get a valid access token for a user.
+
+        Args:
+            api_client (httpx.AsyncClient): The client for the API.
+            user_id (int): The Telegram ID of the user.
+            username (str): The username of the user.
+
+        Returns:
+            str: The access token.
+        """
+        cached = self._tokens.get(user_id)
+        source = "memory"
+        if cached is None:
+            token = await self.redis.get(TOKEN_KEY.format(user_id))
+            if token is not None:
+                token = token.decode()
+                cached = token, get_expiry(token)
+                self._remember(user_id, *cached)
+                source = "redis"
+
+        if cached is not None:
+            token, expires = cached
+            lifetime = expires - time.time()
+            if lifetime > MIN_TOKEN_LIFETIME:
+                TOKEN_REQUESTS.labels(source).inc()
+                refresh_soon = lifetime < self.refresh_margin
+                if refresh_soon and user_id not in self._refreshing:
+                    self._refresh(api_client, user_id, username)
+                return token
+
+        return await self._refresh(api_client, user_id, username)
+
+
+token_manager = TokenManager(
+    get_redis(),
+    refresh_margin=settings.TOKEN_REFRESH_MARGIN,
+    maxsize=settings.TOKEN_CACHE_SIZE,
+)
+
+
+def get_token_manager() -> TokenManager:
+    """
+    Retrieve the current instance of the TokenManager.
+
+    Returns:
+        TokenManager: The current instance of the TokenManager.
+    """
+    return token_manager
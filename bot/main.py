@@ -4,8 +4,16 @@ import logging
 import asyncio
 
 from aiogram.types import BotCommand
+from bot.config import settings
 from bot.handlers import router
-from bot.integrations import get_bot, get_dispatcher
+from bot.integrations import (
+    create_api_client,
+    create_mcts_pool,
+    create_result_flusher,
+    create_sender,
+    get_bot,
+    get_dispatcher,
+)
 
 
 logging.basicConfig(level=logging.INFO)
@@ -22,11 +30,28 @@ async def main() -> None:
     await bot.set_my_commands(
         [
             BotCommand(command="start", description="Start game"),
+            BotCommand(command="bot", description="Play against the bot"),
             BotCommand(command="leave", description="Leave game"),
             BotCommand(command="stats", description="Game stats"),
+            BotCommand(command="top", description="Top players"),
         ]
     )
-    await dp.start_polling(bot)
+    mcts_pool = create_mcts_pool()
+    dp["mcts_pool"] = mcts_pool
+    api_client = create_api_client()
+    dp["api_client"] = api_client
+    sender = create_sender()
+    sender.start()
+    dp["sender"] = sender
+    result_flusher = create_result_flusher(api_client)
+    result_flusher.start()
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await result_flusher.close()
+        await sender.close(settings.SEND_DRAIN_TIMEOUT)
+        await api_client.aclose()
+        mcts_pool.shutdown()
 
 
 if __name__ == "__main__":
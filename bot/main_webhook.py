@@ -1,7 +1,5 @@
 """Module for main_webhook."""
 
-import asyncio
-import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
@@ -9,10 +7,20 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from api.tg import tg_router
-from integrations import get_bot, get_dispatcher
+from integrations import (
+    create_api_client,
+    create_mcts_pool,
+    create_result_flusher,
+    create_sender,
+    get_bot,
+    get_dispatcher,
+    get_update_queue,
+    get_update_router,
+)
+from config import settings
+from metrics import metrics
 from middleware.logger import LogServerMiddleware
 from utils.webhook import setup_webhook
-from utils.background_tasks import tg_background_tasks
 from utils.logger import setup_logger
 
 
@@ -43,6 +51,7 @@ def setup_routers(app: FastAPI) -> None:
         app (FastAPI): The FastAPI application instance.
     """
     app.include_router(tg_router)
+    app.add_route("/metrics", metrics)
 
 
 @asynccontextmanager
@@ -57,17 +66,33 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         None
     """
     print("START APP")
-    await setup_webhook(get_bot(), get_dispatcher())
+    dp = get_dispatcher()
+    mcts_pool = create_mcts_pool()
+    dp["mcts_pool"] = mcts_pool
+    api_client = create_api_client()
+    dp["api_client"] = api_client
+    sender = create_sender()
+    sender.start()
+    dp["sender"] = sender
+    result_flusher = create_result_flusher(api_client)
+    result_flusher.start()
+    update_queue = get_update_queue()
+    update_queue.start()
+    update_router = get_update_router()
+    update_router.start()
+    await setup_webhook(get_bot(), dp)
     setup_logger()
 
     yield
 
     print("Stopping")
 
-    while len(tg_background_tasks) > 0:
-        logging.info("%s tasks left", len(tg_background_tasks))
-        await asyncio.sleep(0)
-
+    await update_router.close()
+    await update_queue.close(settings.INGESTION_DRAIN_TIMEOUT)
+    await result_flusher.close()
+    await sender.close(settings.SEND_DRAIN_TIMEOUT)
+    await api_client.aclose()
+    mcts_pool.shutdown()
     print("Stopped")
 
 
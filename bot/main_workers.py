@@ -0,0 +1,104 @@
+"""Module for main_workers.
+
+Run the webhook app in ``WEBHOOK_WORKERS`` processes sharing one port.
+
+The socket is bound once and inherited by every process, the kernel spreads
+incoming webhook requests between them. Each process learns its index and
+the number of processes from ``WORKER_INDEX`` and ``WORKER_COUNT``, and
+forwards updates of users it does not own to their process through Redis.
+
+    python -m main_workers
+"""
+
+import multiprocessing
+import os
+import signal
+import socket
+from types import FrameType
+
+import uvicorn
+
+from config import settings
+
+
+def run_worker(config: uvicorn.Config, sockets: list[socket.socket]) -> None:
+    """
+    Serve an app from an already bound socket.
+
+    Args:
+        config (uvicorn.Config): The server configuration.
+        sockets (list[socket.socket]): The shared listening socket.
+    """
+    uvicorn.Server(config).run(sockets=sockets)
+
+
+def start_workers(
+    app: str, port: int, workers: int
+) -> tuple[list[multiprocessing.Process], socket.socket]:
+    """
+    Start processes serving an app on one shared port.
+
+    Args:
+        app (str): The import path of the app factory.
+        port (int): The port to listen on.
+        workers (int): The number of processes.
+
+    Returns:
+        tuple: The started processes and the shared socket.
+    """
+    config = uvicorn.Config(app, factory=True, host="0.0.0.0", port=port)
+    sock = config.bind_socket()
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    os.environ["WORKER_COUNT"] = str(workers)
+    for index in range(workers):
+        os.environ["WORKER_INDEX"] = str(index)
+        process = context.Process(target=run_worker, args=(config, [sock]))
+        process.start()
+        processes.append(process)
+    return processes, sock
+
+
+def stop_workers(
+    processes: list[multiprocessing.Process], sock: socket.socket
+) -> None:
+    """
+    Stop the processes gracefully and release the socket.
+
+    Args:
+        processes (list[multiprocessing.Process]): The running processes.
+        sock (socket.socket): The shared socket.
+    """
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+    sock.close()
+
+
+def main() -> None:
+    """Start the webhook processes and wait for them to exit."""
+    processes, sock = start_workers(
+        "main_webhook:create_app",
+        settings.WEBHOOK_PORT,
+        settings.WEBHOOK_WORKERS,
+    )
+
+    def stop(signum: int, frame: FrameType | None) -> None:
+        """
+        Stop the processes when the launcher is asked to exit.
+
+        Args:
+            signum (int): The received signal.
+            frame (FrameType | None): The interrupted frame.
+        """
+        stop_workers(processes, sock)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Module for metrics."""
+
+import os
+
+import prometheus_client
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+from starlette.requests import Request
+from starlette.responses import Response
+
+KEYBOARD_CACHE_REQUESTS = prometheus_client.Counter(
+    "tictactoe_bot_keyboard_cache_requests_total",
+    "Game keyboard lookups by cache result",
+    ["result"],
+)
+TOKEN_REQUESTS = prometheus_client.Counter(
+    "tictactoe_bot_token_requests_total",
+    "Access token lookups by where the token came from, "
+    "every source but api is a saved call to POST /users/",
+    ["source"],
+)
+PROFILE_LOOKUPS = prometheus_client.Counter(
+    "tictactoe_bot_profile_lookups_total",
+    "Player profile lookups by where the profile came from",
+    ["source"],
+)
+SEND_QUEUE_DEPTH = prometheus_client.Gauge(
+    "tictactoe_bot_send_queue_depth",
+    "Messages and edits waiting to be sent to Telegram",
+)
+SEND_LATENCY = prometheus_client.Histogram(
+    "tictactoe_bot_send_latency_seconds",
+    "Time from queueing a message or edit to Telegram accepting it",
+    ["method"],
+)
+SEND_RETRIES = prometheus_client.Counter(
+    "tictactoe_bot_send_retries_total",
+    "Sends postponed because Telegram answered with retry_after",
+)
+INGESTION_QUEUE_DEPTH = prometheus_client.Gauge(
+    "tictactoe_bot_ingestion_queue_depth",
+    "Webhook updates waiting for a worker",
+)
+INGESTION_REJECTED = prometheus_client.Counter(
+    "tictactoe_bot_ingestion_rejected_total",
+    "Webhook updates turned away for Telegram to deliver again",
+    ["reason"],
+)
+INGESTION_DEAD_LETTERS = prometheus_client.Counter(
+    "tictactoe_bot_ingestion_dead_letters_total",
+    "Forwarded updates that could not be read, moved to the dead letters",
+)
+INGESTION_FORWARDED = prometheus_client.Counter(
+    "tictactoe_bot_ingestion_forwarded_total",
+    "Webhook updates forwarded to the bot process owning their user",
+)
+RESULTS_FLUSHED = prometheus_client.Counter(
+    "tictactoe_bot_results_flushed_total",
+    "Finished game results posted from the outbox by outcome",
+    ["outcome"],
+)
+API_REQUESTS_IN_FLIGHT = prometheus_client.Gauge(
+    "tictactoe_bot_api_requests_in_flight",
+    "Requests to the API waiting for a response",
+)
+API_REQUEST_DURATION = prometheus_client.Histogram(
+    "tictactoe_bot_api_request_duration_seconds",
+    "Duration of requests to the API",
+    ["method", "status"],
+)
+API_POOL_CONNECTIONS = prometheus_client.Gauge(
+    "tictactoe_bot_api_pool_connections",
+    "Pooled connections to the API by state",
+    ["state"],
+)
+
+
+def metrics(request: Request) -> Response:
+    """
+    Endpoint for exposing Prometheus metrics.
+
+    Args:
+        request (Request): The incoming HTTP request.
+
+    Returns:
+        Response: The response containing the generated Prometheus metrics.
+    """
+    if "prometheus_multiproc_dir" in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return Response(
+        generate_latest(registry),
+        headers={"Content-Type": CONTENT_TYPE_LATEST}
+    )
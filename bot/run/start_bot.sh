@@ -1,6 +1,9 @@
 #!/usr/bin/env bash
 
 if [[ "$WEBHOOK_MODE" == "True" && -n "$WEBHOOK_PORT" && -n "$WEBHOOK_DOMAIN" ]]; then
+    if [[ "${WEBHOOK_WORKERS:-1}" -gt 1 ]]; then
+        exec python -m main_workers
+    fi
     exec uvicorn main_webhook:create_app --host 0.0.0.0 --port $WEBHOOK_PORT --factory
 else
     poetry run python -m main
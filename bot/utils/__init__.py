@@ -1,19 +1,15 @@
 """Module for utils."""
 
 from ._utils import (
-    check_winner,
-    is_board_full,
     get_game_keyboard,
-    get_chat_info_by_id,
-    get_auth_from_state,
+    get_viewport,
+    clamp_viewport,
     build_headers,
 )
 
 __all__ = (
-    "check_winner",
-    "is_board_full",
     "get_game_keyboard",
-    "get_chat_info_by_id",
-    "get_auth_from_state",
+    "get_viewport",
+    "clamp_viewport",
     "build_headers",
 )
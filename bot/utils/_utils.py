@@ -1,132 +1,117 @@
 """Module for utils in the bot."""
 
-import httpx
-import jwt
-from aiogram import Bot
-from aiogram.fsm.context import FSMContext
-from aiogram.types import ChatFullInfo, InlineKeyboardButton
+from aiogram.types import InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from logger import correlation_id_ctx
+from config import settings
+from utils.engine import GameBoard
+from utils.keyboard_cache import KeyboardCache
 
+KEYBOARD_WIDTH = 8
 
-def get_game_keyboard(board):
-    """
-    Create an inline keyboard for the Tic-Tac-Toe on the current board state.
-
-    Args:
-        board (list): A 2D list representing the current state of the board.
-
-    Returns:
-        InlineKeyboardMarkup: An inline keyboard markup object.
-    """
-    builder = InlineKeyboardBuilder()
-    for i in range(3):
-        row = []
-        for j in range(3):
-            cell = board[i][j]
-            text = cell if cell != " " else " "
-            callback_data = f"cell_{i}_{j}"
-            row.append(InlineKeyboardButton(
-                text=text,
-                callback_data=callback_data
-            ))
-        builder.add(*row)
-    builder.adjust(3, 3, 3)
-    return builder.as_markup()
+keyboard_cache = KeyboardCache(settings.KEYBOARD_CACHE_SIZE)
 
 
-def check_winner(board):
+def clamp_viewport(board: GameBoard, top: int, left: int) -> tuple[int, int]:
     """
-    Check the Tic-Tac-Toe board for a winner.
+    Move a keyboard window so it lies entirely on the board.
 
     Args:
-        board (list): A 2D list representing the current state of the board.
+        board (GameBoard): The current board.
+        top (int): The requested first row of the window.
+        left (int): The requested first column of the window.
 
     Returns:
-        str or None: The symbol of the winning player ('X' or 'O').
+        tuple[int, int]: The row and column of the window's top-left cell.
     """
-    lines = []
-    lines.extend(board)
-    lines.extend([[board[i][j] for i in range(3)] for j in range(3)])
-    lines.append([board[i][i] for i in range(3)])
-    lines.append([board[i][2 - i] for i in range(3)])
-
-    for line in lines:
-        if line[0] == line[1] == line[2] and line[0] != " ":
-            return line[0]
-    return None
+    last = max(board.size - KEYBOARD_WIDTH, 0)
+    return min(max(top, 0), last), min(max(left, 0), last)
 
 
-def is_board_full(board):
+def get_viewport(board: GameBoard, row: int, col: int) -> tuple[int, int]:
     """
-    Check if the Tic-Tac-Toe board is full.
+    Find the top-left cell of the keyboard window around a cell.
 
     Args:
-        board (list): A 2D list representing the current state of the board.
+        board (GameBoard): The current board.
+        row (int): The row the window should contain.
+        col (int): The column the window should contain.
 
     Returns:
-        bool: True if the board is full, False if there are any empty cells.
+        tuple[int, int]: The row and column of the window's top-left cell.
     """
-    return all(cell != " " for row in board for cell in row)
+    half = KEYBOARD_WIDTH // 2
+    return clamp_viewport(board, row - half, col - half)
 
 
-async def get_chat_info_by_id(bot: Bot, user_id: int) -> ChatFullInfo:
+def get_game_keyboard(board: GameBoard, top: int = 0, left: int = 0):
     """
-    Retrieve detailed information about a Telegram user by their ID.
+    Get the inline keyboard for a board state, reusing a cached one.
 
     Args:
-        bot (Bot): The bot instance used to interact with the Telegram API.
-        user_id (int): The ID of the user for which to retrieve information.
+        board (GameBoard): The current board.
+        top (int): The first row shown on a paginated keyboard.
+        left (int): The first column shown on a paginated keyboard.
 
     Returns:
-        ChatFullInfo: An object containing detailed information about the user.
+        InlineKeyboardMarkup: An inline keyboard markup object.
     """
-    chat_info = await bot.get_chat(user_id)
-    return chat_info
+    return keyboard_cache.get(
+        (board.size, board.x, board.o, top, left),
+        lambda: build_game_keyboard(board, top, left),
+    )
 
 
-async def get_auth_from_state(
-    state: FSMContext, api_url: str, user_id: int, username: str
-) -> str:
+def build_game_keyboard(board: GameBoard, top: int = 0, left: int = 0):
     """
-    Retrieve or refresh the access token from the state.
+    Create an inline keyboard for the Tic-Tac-Toe on the current board state.
+
+    Telegram allows at most 8 buttons in a row, so boards wider than that
+    show an 8 x 8 window starting at ``top``/``left`` with a row of
+    navigation buttons underneath.
 
     Args:
-        state (FSMContext): The finite state machine context that holds
-                            the current state data.
-        api_url (str): The base URL of the API used.
-        user_id (int): The unique identifier of the user.
-        username (str): The username of the user.
+        board (GameBoard): The current board.
+        top (int): The first row shown on a paginated keyboard.
+        left (int): The first column shown on a paginated keyboard.
 
     Returns:
-        str: The access token, either retrieved from the state.
-
-    Raises:
-        HTTPException: If there is an error during the API request.
+        InlineKeyboardMarkup: An inline keyboard markup object.
     """
-    state_data = await state.get_data()
-    if "access_token" not in state_data.keys() or (
-        jwt.decode(
-            state_data["access_token"],
-            options={"verify_signature": False}
-        ).get(
-            "exp"
-        )
-        is None
-    ):
-        async with httpx.AsyncClient(base_url=api_url) as client:
-            response = await client.post(
-                "/users/",
-                json={
-                    "telegram_id": user_id,
-                    "username": username,
-                },
-            )
-            new_token = response.json()["access_token"]
-            await state.update_data({"access_token": new_token})
-            return new_token
-
-    return state_data["access_token"]
+    builder = InlineKeyboardBuilder()
+    width = min(board.size, KEYBOARD_WIDTH)
+    for i in range(top, top + width):
+        row = []
+        for j in range(left, left + width):
+            text = board.symbol_at(i, j) or " "
+            callback_data = f"cell_{i}_{j}"
+            row.append(InlineKeyboardButton(
+                text=text,
+                callback_data=callback_data
+            ))
+        builder.add(*row)
+    sizes = [width] * width
+
+    if board.size > KEYBOARD_WIDTH:
+        step = KEYBOARD_WIDTH // 2
+        last = board.size - KEYBOARD_WIDTH
+        navigation = []
+        if left > 0:
+            navigation.append(("◀", top, max(left - step, 0)))
+        if top > 0:
+            navigation.append(("▲", max(top - step, 0), left))
+        if top < last:
+            navigation.append(("▼", min(top + step, last), left))
+        if left < last:
+            navigation.append(("▶", top, min(left + step, last)))
+        builder.add(*(
+            InlineKeyboardButton(text=text, callback_data=f"page_{i}_{j}")
+            for text, i, j in navigation
+        ))
+        sizes.append(len(navigation))
+
+    builder.adjust(*sizes)
+    return builder.as_markup()
 
 
 def build_headers(access_token):
@@ -1,6 +0,0 @@
-"""Module for background_tasks."""
-
-from asyncio import Task
-from typing import Any
-
-tg_background_tasks: set[Task[Any]] = set()
@@ -0,0 +1,56 @@
+"""Module for bitboard.
+
+The winning lines of the 3 x 3 board as bitmasks, used by the solver. Games
+themselves are played on ``utils.engine.GameBoard``.
+"""
+
+BOARD_SIZE = 3
+CELLS = BOARD_SIZE * BOARD_SIZE
+FULL_MASK = (1 << CELLS) - 1
+
+WIN_MASKS = (
+    0b000000111,
+    0b000111000,
+    0b111000000,
+    0b001001001,
+    0b010010010,
+    0b100100100,
+    0b100010001,
+    0b001010100,
+)
+
+
+def has_line(mask: int) -> bool:
+    """
+    Check whether a player's bitmask contains a winning line.
+
+    Args:
+        mask (int): The bitmask of one player's cells.
+
+    Returns:
+        bool: True if the mask covers any winning line.
+    """
+    for line in WIN_MASKS:
+        if mask & line == line:
+            return True
+    return False
+
+
+def legal_moves(x: int, o: int) -> list[int]:
+    """
+    List the empty cells of the board.
+
+    Args:
+        x (int): The bitmask of cells taken by 'X'.
+        o (int): The bitmask of cells taken by 'O'.
+
+    Returns:
+        list[int]: Bit indexes of the empty cells in ascending order.
+    """
+    moves = []
+    empty = ~(x | o) & FULL_MASK
+    while empty:
+        lowest = empty & -empty
+        moves.append(lowest.bit_length() - 1)
+        empty ^= lowest
+    return moves
@@ -0,0 +1,263 @@
+"""Module for engine."""
+
+from dataclasses import dataclass
+
+DEFAULT_VARIANT = "3x3"
+VARIANTS = {
+    "3x3": (3, 3),
+    "5x5": (5, 4),
+    "15x15": (15, 5),
+}
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+EMPTY_CELL = "."
+
+
+@dataclass
+class GameBoard:
+    """
+    Represent an N x N board where K in a row wins.
+
+    Each player's cells are kept as one integer bitmask, bit ``row * size +
+    col`` set for an occupied cell. A move only inspects the four lines
+    through the played cell, so the win check does not depend on the board
+    size.
+
+    Attributes:
+        size (int): The number of rows and columns.
+        win_length (int): The number of symbols in a row needed to win.
+        x (int): The bitmask of cells taken by 'X'.
+        o (int): The bitmask of cells taken by 'O'.
+    """
+
+    size: int = 3
+    win_length: int = 3
+    x: int = 0
+    o: int = 0
+
+    @classmethod
+    def from_variant(cls, variant: str) -> "GameBoard":
+        """
+        Create an empty board for a named variant.
+
+        Args:
+            variant (str): One of the keys of ``VARIANTS``.
+
+        Returns:
+            GameBoard: The empty board.
+        """
+        size, win_length = VARIANTS[variant]
+        return cls(size=size, win_length=win_length)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "GameBoard":
+        """
+        Restore a board from its storage representation.
+
+        Args:
+            data (dict): The game data holding the board fields.
+
+        Returns:
+            GameBoard: The restored board.
+        """
+        return cls(
+            size=data.get("size", 3),
+            win_length=data.get("win_length", 3),
+            x=data["x"],
+            o=data["o"],
+        )
+
+    @classmethod
+    def from_cells(cls, size: int, win_length: int, cells: str) -> "GameBoard":
+        """
+        Restore a board from a row-major string of cells.
+
+        Args:
+            size (int): The number of rows and columns.
+            win_length (int): The number of symbols in a row needed to win.
+            cells (str): One 'X', 'O' or ``EMPTY_CELL`` character per cell.
+
+        Returns:
+            GameBoard: The restored board.
+        """
+        board = cls(size=size, win_length=win_length)
+        for index, cell in enumerate(cells):
+            if cell == "X":
+                board.x |= 1 << index
+            elif cell == "O":
+                board.o |= 1 << index
+        return board
+
+    def to_cells(self) -> str:
+        """
+        Convert the board into a row-major string of cells.
+
+        Returns:
+            str: One 'X', 'O' or ``EMPTY_CELL`` character per cell.
+        """
+        return "".join(
+            "X" if self.x >> index & 1
+            else "O" if self.o >> index & 1
+            else EMPTY_CELL
+            for index in range(self.size * self.size)
+        )
+
+    def to_dict(self) -> dict:
+        """
+        Convert the board into its storage representation.
+
+        Returns:
+            dict: The board fields ready to be saved in the game data.
+        """
+        return {
+            "size": self.size,
+            "win_length": self.win_length,
+            "x": self.x,
+            "o": self.o,
+        }
+
+    @property
+    def full_mask(self) -> int:
+        """
+        Build the bitmask with every cell of the board set.
+
+        Returns:
+            int: The full-board bitmask.
+        """
+        return (1 << self.size * self.size) - 1
+
+    def index(self, row: int, col: int) -> int:
+        """
+        Convert board coordinates to a bit index.
+
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+
+        Returns:
+            int: The bit index of the cell.
+        """
+        return row * self.size + col
+
+    def contains(self, row: int, col: int) -> bool:
+        """
+        Check whether coordinates lie on the board.
+
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+
+        Returns:
+            bool: True if the cell exists.
+        """
+        return 0 <= row < self.size and 0 <= col < self.size
+
+    def symbol_at(self, row: int, col: int) -> str | None:
+        """
+        Get the symbol placed on a cell.
+
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+
+        Returns:
+            str or None: 'X', 'O' or None for an empty cell.
+        """
+        index = self.index(row, col)
+        if self.x >> index & 1:
+            return "X"
+        if self.o >> index & 1:
+            return "O"
+        return None
+
+    def is_occupied(self, row: int, col: int) -> bool:
+        """
+        Check whether a cell is already taken.
+
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+
+        Returns:
+            bool: True if either player occupies the cell.
+        """
+        return bool((self.x | self.o) >> self.index(row, col) & 1)
+
+    def is_full(self) -> bool:
+        """
+        Check if the board is full.
+
+        Returns:
+            bool: True if there are no empty cells left.
+        """
+        return self.x | self.o == self.full_mask
+
+    def legal_moves(self) -> list[int]:
+        """
+        List the empty cells of the board.
+
+        Returns:
+            list[int]: Bit indexes of the empty cells in ascending order.
+        """
+        moves = []
+        empty = ~(self.x | self.o) & self.full_mask
+        while empty:
+            lowest = empty & -empty
+            moves.append(lowest.bit_length() - 1)
+            empty ^= lowest
+        return moves
+
+    def _run_length(
+        self, mask: int, row: int, col: int, d_row: int, d_col: int
+    ) -> int:
+        """
+        Count the player's cells next to a cell in one direction.
+
+        The count stops after ``win_length - 1`` cells, which is all a win
+        check ever needs.
+
+        Args:
+            mask (int): The bitmask of the player's cells.
+            row (int): The row of the starting cell.
+            col (int): The column of the starting cell.
+            d_row (int): The row step of the direction.
+            d_col (int): The column step of the direction.
+
+        Returns:
+            int: The number of consecutive cells owned by the player.
+        """
+        count = 0
+        row += d_row
+        col += d_col
+        while count < self.win_length - 1 and self.contains(row, col):
+            if not mask >> self.index(row, col) & 1:
+                break
+            count += 1
+            row += d_row
+            col += d_col
+        return count
+
+    def play(self, symbol: str, row: int, col: int) -> bool:
+        """
+        Place a symbol on the board and check whether it wins.
+
+        Args:
+            symbol (str): The symbol to place ('X' or 'O').
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+
+        Returns:
+            bool: True if the move completes a line of ``win_length``.
+        """
+        bit = 1 << self.index(row, col)
+        if symbol == "X":
+            self.x |= bit
+            mask = self.x
+        else:
+            self.o |= bit
+            mask = self.o
+        for d_row, d_col in DIRECTIONS:
+            forward = self._run_length(mask, row, col, d_row, d_col)
+            backward = self._run_length(mask, row, col, -d_row, -d_col)
+            if 1 + forward + backward >= self.win_length:
+                return True
+        return False
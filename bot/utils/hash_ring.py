@@ -0,0 +1,60 @@
+"""Module for hash_ring."""
+
+import bisect
+import hashlib
+
+
+def hash_key(key: str) -> int:
+    """
+    Map a key to a point on the ring.
+
+    Args:
+        key (str): The key to hash.
+
+    Returns:
+        int: A 64-bit position.
+    """
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring assigning keys to nodes.
+
+    Every node is placed on the ring ``replicas`` times. A key belongs to the
+    first node point after it, so adding or removing a node only moves the
+    keys next to that node's points.
+
+    Attributes:
+        nodes (list[str]): The names of the nodes.
+    """
+
+    def __init__(self, nodes: list[str], replicas: int = 160) -> None:
+        """
+        Build the ring.
+
+        Args:
+            nodes (list[str]): The names of the nodes.
+            replicas (int): The number of points per node.
+        """
+        self.nodes = nodes
+        points = sorted(
+            (hash_key(f"{node}:{replica}"), node)
+            for node in nodes
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: str) -> str:
+        """
+        Find the node owning a key.
+
+        Args:
+            key (str): The key to place.
+
+        Returns:
+            str: The name of the owning node.
+        """
+        index = bisect.bisect(self._hashes, hash_key(key)) % len(self._hashes)
+        return self._nodes[index]
@@ -0,0 +1,331 @@
+"""Module for ingestion.
+
+Incoming webhook updates, processed by a fixed pool of workers.
+
+Each worker owns a bounded queue. Updates are routed by the ID of the user
+who sent them, so one user's clicks are handled one after another and in
+the order they arrived, while different users are served in parallel.
+A full queue makes the webhook answer with an error, and Telegram delivers
+the update again later.
+
+With several bot processes behind one port, any process may receive an
+update. The ``UpdateRouter`` places users on a consistent hash ring of the
+processes and forwards an update it does not own to the owner's Redis
+stream, so each user is still handled by one process. An entry is deleted
+from the stream only once it is in the owner's queue, so a process that
+falls behind or restarts loses nothing. Entries that cannot be read are
+moved to a capped dead-letter stream.
+"""
+
+import asyncio
+import contextvars
+import logging
+
+from aiogram import Bot, Dispatcher, types
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from logger import correlation_id_ctx
+from metrics import (
+    INGESTION_DEAD_LETTERS,
+    INGESTION_FORWARDED,
+    INGESTION_QUEUE_DEPTH,
+    INGESTION_REJECTED,
+)
+from utils.hash_ring import HashRing
+
+UPDATES_STREAM_KEY = "TICTACTOE:updates:{}"
+UPDATES_GROUP = "bot"
+DEAD_LETTERS_KEY = "TICTACTOE:updates:dead"
+DEAD_LETTERS_MAXLEN = 1000
+CONSUME_RETRY_DELAY = 1.0
+CONSUME_MAX_RETRY_DELAY = 30.0
+
+
+def get_shard_key(update: types.Update) -> int:
+    """
+    Pick the value updates are routed by.
+
+    Args:
+        update (types.Update): The incoming update.
+
+    Returns:
+        int: The ID of the user or chat the update comes from, or the ID of
+             the update itself when it has neither.
+    """
+    try:
+        event = update.event
+    except Exception:
+        return update.update_id
+    user = getattr(event, "from_user", None)
+    if user is not None:
+        return user.id
+    chat = getattr(event, "chat", None)
+    if chat is not None:
+        return chat.id
+    return update.update_id
+
+
+class UpdateQueue:
+    """Queue webhook updates and feed them to the dispatcher in order."""
+
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        workers: int,
+        maxsize: int,
+        put_timeout: float,
+    ) -> None:
+        """
+        Initialize the queues.
+
+        Args:
+            dp (Dispatcher): The dispatcher handling the updates.
+            bot (Bot): The bot the updates were sent to.
+            workers (int): The number of workers.
+            maxsize (int): The most updates waiting in one worker's queue.
+            put_timeout (float): Seconds to wait for room in a full queue
+                                 before rejecting an update.
+        """
+        self.dp = dp
+        self.bot = bot
+        self.put_timeout = put_timeout
+        self._queues: list[
+            asyncio.Queue[tuple[types.Update, contextvars.Context]]
+        ] = [asyncio.Queue(maxsize) for _ in range(workers)]
+        self._workers: list[asyncio.Task] = []
+        self._closing = False
+        INGESTION_QUEUE_DEPTH.set_function(
+            lambda: sum(queue.qsize() for queue in self._queues)
+        )
+
+    def start(self) -> None:
+        """Start the workers."""
+        self._workers = [
+            asyncio.create_task(self._work(queue)) for queue in self._queues
+        ]
+
+    async def put(self, update: types.Update, wait: bool = False) -> bool:
+        """
+        Queue an update for its user's worker.
+
+        The caller's context, with the request's correlation ID, is kept
+        with the update and restored when it is handled.
+
+        Args:
+            update (types.Update): The incoming update.
+            wait (bool): Whether to wait for room in a full queue as long as
+                         it takes instead of rejecting the update.
+
+        Returns:
+            bool: False if the update was rejected.
+        """
+        if self._closing:
+            INGESTION_REJECTED.labels("closing").inc()
+            return False
+        queue = self._queues[get_shard_key(update) % len(self._queues)]
+        try:
+            await asyncio.wait_for(
+                queue.put((update, contextvars.copy_context())),
+                None if wait else self.put_timeout,
+            )
+        except TimeoutError:
+            INGESTION_REJECTED.labels("full").inc()
+            return False
+        return True
+
+    async def _work(
+        self, queue: asyncio.Queue[tuple[types.Update, contextvars.Context]]
+    ) -> None:
+        """
+        Handle the updates of one queue one at a time.
+
+        Args:
+            queue (asyncio.Queue): The worker's queue.
+        """
+        while True:
+            update, context = await queue.get()
+            try:
+                await asyncio.create_task(
+                    self.dp.feed_update(self.bot, update), context=context
+                )
+            except Exception:
+                logging.exception("Failed to handle update %s", update.update_id)
+            finally:
+                queue.task_done()
+
+    async def close(self, timeout: float) -> None:
+        """
+        Stop accepting updates and finish the queued ones.
+
+        Args:
+            timeout (float): Seconds to wait for the queues to drain before
+                             the remaining updates are dropped.
+        """
+        self._closing = True
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)),
+                timeout,
+            )
+        except TimeoutError:
+            left = sum(queue.qsize() for queue in self._queues)
+            logging.warning("Dropping %s updates left after shutdown", left)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+
+class UpdateRouter:
+    """Hand each update to the bot process that owns its user."""
+
+    def __init__(
+        self,
+        redis: Redis,
+        update_queue: UpdateQueue,
+        worker: int,
+        workers: int,
+    ) -> None:
+        """
+        Initialize the router.
+
+        Args:
+            redis (Redis): The Redis client shared by all processes.
+            update_queue (UpdateQueue): The queue of this process.
+            worker (int): The index of this process.
+            workers (int): The number of bot processes.
+        """
+        self.redis = redis
+        self.update_queue = update_queue
+        self.worker = str(worker)
+        self.ring = HashRing([str(index) for index in range(workers)])
+        self._consumer: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start taking updates forwarded by other processes."""
+        if len(self.ring.nodes) > 1:
+            self._consumer = asyncio.create_task(self._consume())
+
+    async def route(self, update: types.Update, body: bytes) -> bool:
+        """
+        Queue an update here or forward it to the process owning its user.
+
+        Args:
+            update (types.Update): The incoming update.
+            body (bytes): The update as received, forwarded unchanged.
+
+        Returns:
+            bool: False if the update was rejected.
+        """
+        owner = self.ring.node_for(str(get_shard_key(update)))
+        if owner == self.worker:
+            return await self.update_queue.put(update)
+        await self.redis.xadd(
+            UPDATES_STREAM_KEY.format(owner),
+            {"update": body, "correlation_id": correlation_id_ctx.get("")},
+        )
+        INGESTION_FORWARDED.inc()
+        return True
+
+    async def _consume(self) -> None:
+        """
+        Move updates from this process's stream to its queue until stopped.
+
+        Entries read before and not deleted are read again first, also
+        after a Redis error, which is retried with a growing delay.
+        """
+        stream = UPDATES_STREAM_KEY.format(self.worker)
+        group_created = False
+        last_id = "0"
+        delay = CONSUME_RETRY_DELAY
+        while True:
+            try:
+                if not group_created:
+                    await self._create_group(stream)
+                    group_created = True
+                reply = await self.redis.xreadgroup(
+                    UPDATES_GROUP,
+                    self.worker,
+                    {stream: last_id},
+                    count=100,
+                    block=1000,
+                )
+                entries = reply[0][1] if reply else []
+                if last_id == "0" and not entries:
+                    last_id = ">"
+                    continue
+                for entry_id, fields in entries:
+                    await self._take(stream, entry_id, fields)
+                delay = CONSUME_RETRY_DELAY
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception(
+                    "Failed to take forwarded updates, retrying in %ss", delay
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, CONSUME_MAX_RETRY_DELAY)
+                last_id = "0"
+
+    async def _create_group(self, stream: str) -> None:
+        """
+        Create the consumer group of a stream unless it exists.
+
+        Args:
+            stream (str): The key of the stream.
+        """
+        try:
+            await self.redis.xgroup_create(
+                stream, UPDATES_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as error:
+            if "BUSYGROUP" not in str(error):
+                raise
+
+    async def _take(
+        self, stream: str, entry_id: bytes, fields: dict[bytes, bytes]
+    ) -> None:
+        """
+        Queue a forwarded update, then delete it from the stream.
+
+        Args:
+            stream (str): The key of this process's stream.
+            entry_id (bytes): The ID of the entry.
+            fields (dict[bytes, bytes]): The fields of the entry.
+        """
+        try:
+            correlation_id_ctx.set(fields[b"correlation_id"].decode())
+            update = types.Update.model_validate_json(
+                fields[b"update"],
+                context={"bot": self.update_queue.bot},
+            )
+        except (KeyError, ValueError):
+            logging.exception(
+                "Moving unreadable forwarded update %s to the dead letters",
+                entry_id,
+            )
+            INGESTION_DEAD_LETTERS.inc()
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.xadd(
+                    DEAD_LETTERS_KEY,
+                    fields,
+                    maxlen=DEAD_LETTERS_MAXLEN,
+                    approximate=True,
+                )
+                pipe.xack(stream, UPDATES_GROUP, entry_id)
+                pipe.xdel(stream, entry_id)
+                await pipe.execute()
+            return
+        if not await self.update_queue.put(update, wait=True):
+            return
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(stream, UPDATES_GROUP, entry_id)
+            pipe.xdel(stream, entry_id)
+            await pipe.execute()
+
+    async def close(self) -> None:
+        """Stop taking forwarded updates."""
+        if self._consumer is not None:
+            self._consumer.cancel()
+            await asyncio.gather(self._consumer, return_exceptions=True)
@@ -0,0 +1,68 @@
+"""Module for keyboard_cache."""
+
+from collections import OrderedDict
+
+from aiogram.types import InlineKeyboardMarkup
+
+from metrics import KEYBOARD_CACHE_REQUESTS
+
+
+class KeyboardCache:
+    """
+    LRU cache of ready game keyboards keyed by the encoded board.
+
+    A board is encoded as ``(size, x, o, top, left)``, which covers the
+    paginated windows of large boards as well as the whole 3 x 3 board.
+
+    Attributes:
+        maxsize (int): The maximum number of cached keyboards.
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that built a keyboard.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize (int): The maximum number of cached keyboards.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, InlineKeyboardMarkup] = OrderedDict()
+
+    def get(self, key: tuple, build) -> InlineKeyboardMarkup:
+        """
+        Look up a keyboard, building and storing it on a miss.
+
+        Args:
+            key (tuple): The encoded board.
+            build (Callable[[], InlineKeyboardMarkup]): Builds the keyboard.
+
+        Returns:
+            InlineKeyboardMarkup: The keyboard.
+        """
+        markup = self._entries.get(key)
+        if markup is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            KEYBOARD_CACHE_REQUESTS.labels(result="hit").inc()
+            return markup
+
+        self.misses += 1
+        KEYBOARD_CACHE_REQUESTS.labels(result="miss").inc()
+        markup = build()
+        self._entries[key] = markup
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return markup
+
+    def __len__(self) -> int:
+        """
+        Count the cached keyboards.
+
+        Returns:
+            int: The number of entries.
+        """
+        return len(self._entries)
@@ -0,0 +1,391 @@
+"""Module for mcts.
+
+Monte Carlo Tree Search opponent for boards too large to solve exhaustively.
+
+Searches run in worker processes so they never block the event loop that
+serves every other game. Each game is pinned to one single-process executor,
+which lets the worker keep the game's tree between moves and continue from
+the subtree of the opponent's reply instead of starting over.
+"""
+
+import asyncio
+import math
+import random
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.engine import GameBoard
+
+EXPLORATION = math.sqrt(2)
+NEIGHBOURHOOD = 2
+MAX_TREES = 256
+
+_trees: dict[str, tuple["Node", int, int]] = {}
+_rng = random.Random()
+
+
+class Node:
+    """
+    Represent a position in the search tree.
+
+    Attributes:
+        move (int | None): The cell played to reach the node.
+        player (str): The symbol that played ``move``.
+        parent (Node | None): The previous position.
+        children (dict[int, Node]): Expanded replies keyed by cell.
+        untried (list[int]): Candidate replies not expanded yet.
+        visits (int): The number of playouts through the node.
+        wins (float): Playouts won by ``player``, draws count as half.
+        terminal (bool): Whether the game is over in this position.
+        winner (str | None): The winner of a terminal position.
+    """
+
+    __slots__ = (
+        "move",
+        "player",
+        "parent",
+        "children",
+        "untried",
+        "visits",
+        "wins",
+        "terminal",
+        "winner",
+    )
+
+    def __init__(
+        self, move: int | None, player: str, parent: "Node | None"
+    ) -> None:
+        """
+        Initialize an unvisited node.
+
+        Args:
+            move (int | None): The cell played to reach the node.
+            player (str): The symbol that played ``move``.
+            parent (Node | None): The previous position.
+        """
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children: dict[int, Node] = {}
+        self.untried: list[int] = []
+        self.visits = 0
+        self.wins = 0.0
+        self.terminal = False
+        self.winner: str | None = None
+
+    def uct(self, log_parent_visits: float) -> float:
+        """
+        Compute the UCT score used to pick a child during selection.
+
+        Args:
+            log_parent_visits (float): Natural log of the parent's visits.
+
+        Returns:
+            float: The exploitation plus exploration score.
+        """
+        return self.wins / self.visits + EXPLORATION * math.sqrt(
+            log_parent_visits / self.visits
+        )
+
+
+def other(symbol: str) -> str:
+    """
+    Get the opponent's symbol.
+
+    Args:
+        symbol (str): 'X' or 'O'.
+
+    Returns:
+        str: The other symbol.
+    """
+    return "O" if symbol == "X" else "X"
+
+
+def candidate_moves(board: GameBoard) -> list[int]:
+    """
+    List empty cells close to the stones already on the board.
+
+    Moves far away from every stone are almost never good on large boards,
+    so the tree only expands cells within ``NEIGHBOURHOOD`` steps of one.
+
+    Args:
+        board (GameBoard): The current board.
+
+    Returns:
+        list[int]: Bit indexes of the candidate cells.
+    """
+    size = board.size
+    occupied = board.x | board.o
+    if not occupied:
+        return [board.index(size // 2, size // 2)]
+    full = board.full_mask
+    first_col = sum(1 << row * size for row in range(size))
+    last_col = first_col << size - 1
+    area = occupied
+    for _ in range(NEIGHBOURHOOD):
+        row = area | (area & ~last_col) << 1 | (area & ~first_col) >> 1
+        area = (row | row << size | row >> size) & full
+    moves = []
+    empty = area & ~occupied
+    while empty:
+        lowest = empty & -empty
+        moves.append(lowest.bit_length() - 1)
+        empty ^= lowest
+    return moves
+
+
+def playout(board: GameBoard, symbol: str, rng: random.Random) -> str | None:
+    """
+    Finish the game with uniformly random moves.
+
+    Args:
+        board (GameBoard): The position to start from, left untouched.
+        symbol (str): The symbol to move first.
+        rng (random.Random): The random source.
+
+    Returns:
+        str or None: The winner's symbol, or None for a draw.
+    """
+    sim = GameBoard(board.size, board.win_length, board.x, board.o)
+    moves = sim.legal_moves()
+    rng.shuffle(moves)
+    for index in moves:
+        if sim.play(symbol, *divmod(index, sim.size)):
+            return symbol
+        symbol = other(symbol)
+    return None
+
+
+def _iterate(
+    root: Node, board: GameBoard, batch_size: int, rng: random.Random
+) -> int:
+    """
+    Run one select, expand, simulate and backpropagate step.
+
+    With ``batch_size`` above one the new leaf is evaluated with several
+    playouts at once and their results are backpropagated together, which
+    spends less time walking the tree per playout.
+
+    Args:
+        root (Node): The root of the search tree.
+        board (GameBoard): The position of the root.
+        batch_size (int): The number of playouts per new leaf.
+        rng (random.Random): The random source.
+
+    Returns:
+        int: The number of playouts accounted for.
+    """
+    node = root
+    sim = GameBoard(board.size, board.win_length, board.x, board.o)
+    while not node.terminal and not node.untried and node.children:
+        log_visits = math.log(node.visits)
+        node = max(
+            node.children.values(), key=lambda child: child.uct(log_visits)
+        )
+        sim.play(node.player, *divmod(node.move, sim.size))
+
+    if not node.terminal and node.untried:
+        move = node.untried.pop(rng.randrange(len(node.untried)))
+        child = Node(move, other(node.player), node)
+        node.children[move] = child
+        node = child
+        if sim.play(node.player, *divmod(move, sim.size)):
+            node.terminal = True
+            node.winner = node.player
+        elif sim.is_full():
+            node.terminal = True
+        else:
+            node.untried = candidate_moves(sim)
+
+    tally = {"X": 0, "O": 0, None: 0}
+    if node.terminal:
+        tally[node.winner] = batch_size
+    else:
+        for _ in range(batch_size):
+            tally[playout(sim, other(node.player), rng)] += 1
+
+    draws = tally[None] / 2
+    while node is not None:
+        node.visits += batch_size
+        node.wins += tally[node.player] + draws
+        node = node.parent
+    return batch_size
+
+
+def _reuse_root(game_id: str, board: GameBoard) -> Node | None:
+    """
+    Find the subtree of the opponent's reply in the game's saved tree.
+
+    Args:
+        game_id (str): The ID of the game.
+        board (GameBoard): The position after the opponent's reply.
+
+    Returns:
+        Node | None: The reply's node detached from its parent, or None if
+                     there is no usable tree.
+    """
+    saved = _trees.pop(game_id, None)
+    if saved is None:
+        return None
+    root, x, o = saved
+    added = (board.x | board.o) & ~(x | o)
+    if board.x & x != x or board.o & o != o or added.bit_count() != 1:
+        return None
+    child = root.children.get(added.bit_length() - 1)
+    if child is not None:
+        child.parent = None
+    return child
+
+
+def search(
+    game_id: str,
+    board_data: dict,
+    symbol: str,
+    time_budget: float,
+    max_playouts: int = 0,
+    batch_size: int = 1,
+) -> tuple[int, int]:
+    """
+    Choose a move by searching until the time or playout budget runs out.
+
+    This is the entry point executed in the worker processes.
+
+    Args:
+        game_id (str): The ID of the game, used to keep its tree.
+        board_data (dict): The board fields as produced by
+                           ``GameBoard.to_dict``.
+        symbol (str): The symbol to move.
+        time_budget (float): Seconds the search may take.
+        max_playouts (int): The playout limit, 0 for time only.
+        batch_size (int): The number of playouts per new leaf.
+
+    Returns:
+        tuple[int, int]: The chosen cell and the number of playouts run.
+    """
+    board = GameBoard.from_dict(board_data)
+    root = _reuse_root(game_id, board)
+    if root is None:
+        root = Node(None, other(symbol), None)
+        root.untried = candidate_moves(board)
+
+    deadline = time.perf_counter() + time_budget
+    playouts = 0
+    while True:
+        playouts += _iterate(root, board, batch_size, _rng)
+        if max_playouts and playouts >= max_playouts:
+            break
+        if time.perf_counter() >= deadline:
+            break
+
+    best = max(root.children.values(), key=lambda child: child.visits)
+    board.play(symbol, *divmod(best.move, board.size))
+    best.parent = None
+    _trees[game_id] = (best, board.x, board.o)
+    while len(_trees) > MAX_TREES:
+        _trees.pop(next(iter(_trees)))
+    return best.move, playouts
+
+
+def drop_tree(game_id: str) -> None:
+    """
+    Forget the saved tree of a finished game.
+
+    Args:
+        game_id (str): The ID of the game.
+    """
+    _trees.pop(game_id, None)
+
+
+class MCTSPool:
+    """
+    Run MCTS searches in worker processes off the event loop.
+
+    Attributes:
+        executors (list[ProcessPoolExecutor]): Single-process executors,
+            every game always goes to the same one.
+        time_budget (float): Seconds a search may take at full strength.
+        max_playouts (int): The playout limit per move, 0 for time only.
+        batch_size (int): The number of playouts per new leaf.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        time_budget: float,
+        max_playouts: int = 0,
+        batch_size: int = 1,
+    ) -> None:
+        """
+        Start the worker processes.
+
+        Args:
+            workers (int): The number of worker processes.
+            time_budget (float): Seconds a search may take at full strength.
+            max_playouts (int): The playout limit per move, 0 for time only.
+            batch_size (int): The number of playouts per new leaf.
+        """
+        self.executors = [
+            ProcessPoolExecutor(max_workers=1) for _ in range(workers)
+        ]
+        self.time_budget = time_budget
+        self.max_playouts = max_playouts
+        self.batch_size = batch_size
+
+    def _executor(self, game_id: str) -> ProcessPoolExecutor:
+        """
+        Pick the executor that owns a game.
+
+        Args:
+            game_id (str): The ID of the game.
+
+        Returns:
+            ProcessPoolExecutor: The game's executor.
+        """
+        return self.executors[zlib.crc32(game_id.encode()) % len(self.executors)]
+
+    async def choose_move(
+        self,
+        game_id: str,
+        board: GameBoard,
+        symbol: str,
+        strength: float = 1.0,
+    ) -> int:
+        """
+        Search for a move without blocking the event loop.
+
+        Args:
+            game_id (str): The ID of the game.
+            board (GameBoard): The current board.
+            symbol (str): The symbol to move.
+            strength (float): The share of the budgets to spend.
+
+        Returns:
+            int: The bit index of the chosen cell.
+        """
+        loop = asyncio.get_running_loop()
+        move, _ = await loop.run_in_executor(
+            self._executor(game_id),
+            search,
+            game_id,
+            board.to_dict(),
+            symbol,
+            self.time_budget * strength,
+            math.ceil(self.max_playouts * strength),
+            self.batch_size,
+        )
+        return move
+
+    def forget(self, game_id: str) -> None:
+        """
+        Drop the saved tree of a finished game in its worker.
+
+        Args:
+            game_id (str): The ID of the game.
+        """
+        self._executor(game_id).submit(drop_tree, game_id)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        for executor in self.executors:
+            executor.shutdown(wait=False, cancel_futures=True)
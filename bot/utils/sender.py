@@ -0,0 +1,592 @@
+"""Module for sender.
+
+Outgoing Telegram messages and edits, spaced out to stay within Telegram's
+flood limits.
+
+Every send waits for a token from a global bucket and from a bucket of its
+chat. Queued sends go out by priority, so board updates overtake
+notifications. A ``retry_after`` answer pauses the chat and retries the send
+later. An edit of a message that is still queued replaces the queued edit
+instead of being sent separately.
+
+Handlers queue their sends without awaiting them, so a slow or paused chat
+never holds up the worker handling the update. Failed sends are logged.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import Any
+
+from aiogram import Bot, types
+from aiogram.exceptions import TelegramRetryAfter
+
+from metrics import SEND_LATENCY, SEND_QUEUE_DEPTH, SEND_RETRIES
+
+GAME = 0
+REPLY = 1
+NOTIFICATION = 2
+RUN_RETRY_DELAY = 1.0
+
+
+def _log_failure(method: str, chat_id: int, waiter: asyncio.Future) -> None:
+    """
+    Log a failed request, so its callers do not have to await it.
+
+    Args:
+        method (str): The name of the request.
+        chat_id (int): The chat the request went to.
+        waiter (asyncio.Future): The finished future of the request.
+    """
+    if not waiter.cancelled() and waiter.exception() is not None:
+        logging.warning(
+            "%s to %s failed: %s", method, chat_id, waiter.exception()
+        )
+
+
+class TokenBucket:
+    """
+    Allow ``rate`` operations per second with bursts of ``capacity``.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (float): The most tokens the bucket holds.
+        tokens (float): The tokens currently available.
+        updated (float): The monotonic time of the last refill.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        Create a full bucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): The most tokens the bucket holds.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, now: float) -> float:
+        """
+        Refill the bucket and tell how long until a token is available.
+
+        Args:
+            now (float): The current monotonic time.
+
+        Returns:
+            float: 0 if a token is available, otherwise the seconds to wait.
+        """
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        """Take a token, after ``wait_time`` has returned 0."""
+        self.tokens -= 1
+
+
+class Delivery:
+    """
+    Represent one queued request to Telegram.
+
+    Attributes:
+        priority (int): ``GAME``, ``REPLY`` or ``NOTIFICATION``.
+        seq (int): The order the delivery was queued in.
+        chat_id (int): The chat the request goes to.
+        method (str): The name of the request, used in metrics.
+        call (Callable[[], Awaitable[Any]]): Sends the request.
+        merge_key (tuple | None): Identifies the edit later edits replace.
+        waiters (list[asyncio.Future]): Resolved with the result.
+        queued_at (float): The monotonic time the delivery was queued.
+    """
+
+    __slots__ = (
+        "priority",
+        "seq",
+        "chat_id",
+        "method",
+        "call",
+        "merge_key",
+        "waiters",
+        "queued_at",
+    )
+
+    def __init__(
+        self,
+        priority: int,
+        seq: int,
+        chat_id: int,
+        method: str,
+        call: Callable[[], Awaitable[Any]],
+        merge_key: tuple | None,
+    ) -> None:
+        """
+        Initialize a delivery.
+
+        Args:
+            priority (int): ``GAME``, ``REPLY`` or ``NOTIFICATION``.
+            seq (int): The order the delivery was queued in.
+            chat_id (int): The chat the request goes to.
+            method (str): The name of the request, used in metrics.
+            call (Callable[[], Awaitable[Any]]): Sends the request.
+            merge_key (tuple | None): Identifies the edit later edits replace.
+        """
+        self.priority = priority
+        self.seq = seq
+        self.chat_id = chat_id
+        self.method = method
+        self.call = call
+        self.merge_key = merge_key
+        self.waiters: list[asyncio.Future] = []
+        self.queued_at = time.monotonic()
+
+    def __lt__(self, other: "Delivery") -> bool:
+        """
+        Order deliveries by priority, then by queueing order.
+
+        Args:
+            other (Delivery): The delivery to compare with.
+
+        Returns:
+            bool: True if this delivery goes first.
+        """
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ChatState:
+    """
+    Track the sending budget of one chat.
+
+    Attributes:
+        bucket (TokenBucket): The chat's send budget.
+        busy (bool): Whether a request to the chat is in flight.
+        paused_until (float): The monotonic time the chat may be sent to
+                              again.
+    """
+
+    __slots__ = ("bucket", "busy", "paused_until")
+
+    def __init__(self, rate: float, burst: float) -> None:
+        """
+        Initialize the state of a chat nothing was sent to yet.
+
+        Args:
+            rate (float): Requests per second allowed in the chat.
+            burst (float): Requests allowed at once.
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.busy = False
+        self.paused_until = 0.0
+
+
+class Sender:
+    """Queue outgoing requests and send them within Telegram's limits."""
+
+    def __init__(
+        self,
+        bot: Bot,
+        global_rate: float,
+        chat_rate: float,
+        chat_burst: float,
+        max_in_flight: int,
+    ) -> None:
+        """
+        Initialize the sender.
+
+        Args:
+            bot (Bot): The bot used to call the Telegram API.
+            global_rate (float): Requests per second allowed in total.
+            chat_rate (float): Requests per second allowed per chat.
+            chat_burst (float): Requests allowed at once per chat.
+            max_in_flight (int): The most requests waiting for Telegram.
+        """
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self._global = TokenBucket(global_rate, global_rate)
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._queue: list[Delivery] = []
+        self._delayed: list[tuple[float, Delivery]] = []
+        self._chats: dict[int, ChatState] = {}
+        self._edits: dict[tuple, Delivery] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._in_flight: set[asyncio.Task] = set()
+        self._task: asyncio.Task | None = None
+        SEND_QUEUE_DEPTH.set_function(
+            lambda: len(self._queue) + len(self._delayed)
+        )
+
+    def start(self) -> None:
+        """Start sending queued requests."""
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self, timeout: float) -> None:
+        """
+        Send everything still queued, then stop.
+
+        Args:
+            timeout (float): Seconds to wait for the queued requests to be
+                             sent before the remaining ones fail.
+        """
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except TimeoutError:
+            left = len(self._queue) + len(self._delayed) + len(self._in_flight)
+            logging.warning("Dropping %s requests left after shutdown", left)
+        tasks = list(self._in_flight)
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        error = RuntimeError("The sender is closed")
+        for delivery in self._queue:
+            self._fail(delivery, error)
+        for _, delivery in self._delayed:
+            self._fail(delivery, error)
+        self._queue.clear()
+        self._delayed.clear()
+        self._edits.clear()
+
+    async def _drain(self) -> None:
+        """Wait until no request is queued or in flight."""
+        while self._queue or self._delayed or self._in_flight:
+            await asyncio.sleep(0.05)
+
+    @staticmethod
+    def _fail(delivery: Delivery, error: BaseException) -> None:
+        """
+        Hand an error to the waiters of a request.
+
+        Args:
+            delivery (Delivery): The request that failed.
+            error (BaseException): The error the waiters get.
+        """
+        for waiter in delivery.waiters:
+            if not waiter.done():
+                waiter.set_exception(error)
+
+    def _enqueue(
+        self,
+        priority: int,
+        chat_id: int,
+        method: str,
+        call: Callable[[], Awaitable[Any]],
+        merge_key: tuple | None = None,
+    ) -> asyncio.Future:
+        """
+        Queue a request, merging it into a queued edit it supersedes.
+
+        Args:
+            priority (int): ``GAME``, ``REPLY`` or ``NOTIFICATION``.
+            chat_id (int): The chat the request goes to.
+            method (str): The name of the request, used in metrics.
+            call (Callable[[], Awaitable[Any]]): Sends the request.
+            merge_key (tuple | None): Identifies the edit later edits replace.
+
+        Returns:
+            asyncio.Future: Resolved with the result of the request.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        waiter.add_done_callback(partial(_log_failure, method, chat_id))
+        queued = self._edits.get(merge_key) if merge_key else None
+        if queued is not None:
+            queued.call = call
+            queued.waiters.append(waiter)
+            return waiter
+
+        delivery = Delivery(
+            priority, next(self._seq), chat_id, method, call, merge_key
+        )
+        delivery.waiters.append(waiter)
+        if merge_key:
+            self._edits[merge_key] = delivery
+        heapq.heappush(self._queue, delivery)
+        self._wakeup.set()
+        return waiter
+
+    def _chat(self, chat_id: int) -> ChatState:
+        """
+        Get the sending state of a chat.
+
+        Args:
+            chat_id (int): The ID of the chat.
+
+        Returns:
+            ChatState: The chat's state.
+        """
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = ChatState(
+                self.chat_rate, self.chat_burst
+            )
+        return chat
+
+    async def _run(self) -> None:
+        """Dispatch queued requests as their chats' budgets allow."""
+        while True:
+            try:
+                timeout = await self._send_ready()
+            except Exception:
+                logging.exception("Sending queued requests failed")
+                timeout = RUN_RETRY_DELAY
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    async def _send_ready(self) -> float | None:
+        """
+        Dispatch the queued requests whose budgets allow it.
+
+        A request that fails unexpectedly fails its waiters, so nobody waits
+        for it forever.
+
+        Returns:
+            float | None: Seconds until a waiting request may be sent, or
+                          None if only new requests can wake the sender.
+        """
+        now = time.monotonic()
+        self._promote_delayed(now)
+        waiting: list[Delivery] = []
+        global_delay = 0.0
+        try:
+            while self._queue and global_delay == 0:
+                delivery = heapq.heappop(self._queue)
+                try:
+                    global_delay = await self._send_one(delivery, now, waiting)
+                except Exception as error:
+                    self._fail(delivery, error)
+                    raise
+                now = time.monotonic()
+        finally:
+            for delivery in waiting:
+                heapq.heappush(self._queue, delivery)
+            self._wakeup.clear()
+
+        timeouts = [now + global_delay] if global_delay > 0 else []
+        if self._delayed:
+            timeouts.append(self._delayed[0][0])
+        return min(timeouts) - now if timeouts else None
+
+    def _promote_delayed(self, now: float) -> None:
+        """
+        Move the paused requests whose pause is over back to the queue.
+
+        Args:
+            now (float): The current monotonic time.
+        """
+        while self._delayed and self._delayed[0][0] <= now:
+            heapq.heappush(self._queue, heapq.heappop(self._delayed)[1])
+
+    async def _send_one(
+        self, delivery: Delivery, now: float, waiting: list[Delivery]
+    ) -> float:
+        """
+        Send a request if its chat's and the global budgets allow it.
+
+        A request to a busy chat, or one the global budget has no token for,
+        is set aside in ``waiting``. A request to a chat out of budget is
+        paused until the chat may be sent to again.
+
+        Args:
+            delivery (Delivery): The request to send.
+            now (float): The current monotonic time.
+            waiting (list[Delivery]): The requests to queue again.
+
+        Returns:
+            float: Seconds until the global budget has a token, 0 if it
+                   still has one.
+        """
+        chat = self._chat(delivery.chat_id)
+        if chat.busy:
+            waiting.append(delivery)
+            return 0.0
+        if chat.paused_until > now:
+            delay = chat.paused_until - now
+        else:
+            delay = chat.bucket.wait_time(now)
+        if delay > 0:
+            chat.paused_until = now + delay
+            heapq.heappush(self._delayed, (now + delay, delivery))
+            return 0.0
+        global_delay = self._global.wait_time(now)
+        if global_delay > 0:
+            waiting.append(delivery)
+            return global_delay
+        chat.bucket.take()
+        self._global.take()
+        await self._dispatch(delivery, chat)
+        return 0.0
+
+    async def _dispatch(self, delivery: Delivery, chat: ChatState) -> None:
+        """
+        Start sending a request once a slot for it is free.
+
+        Args:
+            delivery (Delivery): The request to send.
+            chat (ChatState): The state of the request's chat.
+        """
+        await self._slots.acquire()
+        chat.busy = True
+        if delivery.merge_key:
+            self._edits.pop(delivery.merge_key, None)
+        task = asyncio.create_task(self._deliver(delivery, chat))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _deliver(self, delivery: Delivery, chat: ChatState) -> None:
+        """
+        Send a request and hand its result to the waiters.
+
+        Args:
+            delivery (Delivery): The request to send.
+            chat (ChatState): The state of the request's chat.
+        """
+        try:
+            result = await delivery.call()
+        except TelegramRetryAfter as error:
+            SEND_RETRIES.inc()
+            chat.paused_until = time.monotonic() + error.retry_after
+            heapq.heappush(self._delayed, (chat.paused_until, delivery))
+            return
+        except asyncio.CancelledError:
+            self._fail(delivery, RuntimeError("The sender is closed"))
+            raise
+        except Exception as error:
+            self._fail(delivery, error)
+        else:
+            SEND_LATENCY.labels(delivery.method).observe(
+                time.monotonic() - delivery.queued_at
+            )
+            for waiter in delivery.waiters:
+                if not waiter.done():
+                    waiter.set_result(result)
+        finally:
+            chat.busy = False
+            self._slots.release()
+            self._wakeup.set()
+
+    def send_message(
+        self,
+        chat_id: int,
+        text: str,
+        reply_markup: types.InlineKeyboardMarkup | None = None,
+        priority: int = NOTIFICATION,
+    ) -> asyncio.Future:
+        """
+        Queue a new message to a chat.
+
+        Args:
+            chat_id (int): The chat to send the message to.
+            text (str): The text of the message.
+            reply_markup (types.InlineKeyboardMarkup | None): The keyboard.
+            priority (int): ``GAME``, ``REPLY`` or ``NOTIFICATION``.
+
+        Returns:
+            asyncio.Future: Resolved with the sent message.
+        """
+        return self._enqueue(
+            priority,
+            chat_id,
+            "send_message",
+            lambda: self.bot.send_message(
+                chat_id, text, reply_markup=reply_markup
+            ),
+        )
+
+    def answer(
+        self,
+        message: types.Message,
+        text: str,
+        reply_markup: types.InlineKeyboardMarkup | None = None,
+        priority: int = REPLY,
+    ) -> asyncio.Future:
+        """
+        Queue a reply in the chat of a message.
+
+        Args:
+            message (types.Message): The message to answer.
+            text (str): The text of the reply.
+            reply_markup (types.InlineKeyboardMarkup | None): The keyboard.
+            priority (int): ``GAME``, ``REPLY`` or ``NOTIFICATION``.
+
+        Returns:
+            asyncio.Future: Resolved with the sent message.
+        """
+        return self._enqueue(
+            priority,
+            message.chat.id,
+            "send_message",
+            lambda: message.answer(text, reply_markup=reply_markup),
+        )
+
+    def edit_text(
+        self,
+        message: types.Message,
+        text: str,
+        reply_markup: types.InlineKeyboardMarkup | None = None,
+        priority: int = GAME,
+    ) -> asyncio.Future:
+        """
+        Queue an edit of a message's text and keyboard.
+
+        A queued edit of the same message that has not been sent yet is
+        replaced by this one.
+
+        Args:
+            message (types.Message): The message to edit.
+            text (str): The new text.
+            reply_markup (types.InlineKeyboardMarkup | None): The new keyboard.
+            priority (int): ``GAME``, ``REPLY`` or ``NOTIFICATION``.
+
+        Returns:
+            asyncio.Future: Resolved with the edited message.
+        """
+        return self._enqueue(
+            priority,
+            message.chat.id,
+            "edit_message_text",
+            lambda: message.edit_text(text, reply_markup=reply_markup),
+            ("text", message.chat.id, message.message_id),
+        )
+
+    def edit_reply_markup(
+        self,
+        message: types.Message,
+        reply_markup: types.InlineKeyboardMarkup | None = None,
+        priority: int = GAME,
+    ) -> asyncio.Future:
+        """
+        Queue an edit of a message's keyboard.
+
+        A queued keyboard edit of the same message that has not been sent
+        yet is replaced by this one.
+
+        Args:
+            message (types.Message): The message to edit.
+            reply_markup (types.InlineKeyboardMarkup | None): The new keyboard.
+            priority (int): ``GAME``, ``REPLY`` or ``NOTIFICATION``.
+
+        Returns:
+            asyncio.Future: Resolved with the edited message.
+        """
+        return self._enqueue(
+            priority,
+            message.chat.id,
+            "edit_message_reply_markup",
+            lambda: message.edit_reply_markup(reply_markup=reply_markup),
+            ("markup", message.chat.id, message.message_id),
+        )
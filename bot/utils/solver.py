@@ -0,0 +1,312 @@
+"""Module for solver.
+
+Perfect play for the 3 x 3 board from a precomputed table.
+
+Every reachable position where a player still has to move is folded under
+the 8 symmetries of the square and stored once. For each canonical position
+the table keeps the minimax score of all 9 cells from the point of view of
+the player to move, so answering a move is a lookup, not a search.
+
+Regenerate the table from the ``bot`` directory with::
+
+    python -m utils.solver
+
+File layout (little-endian)::
+
+    b"TTT1" | uint32 count | uint32 keys[count] | int8 scores[count][9]
+
+``keys`` are sorted ``x << 9 | o`` values of the canonical positions.
+"""
+
+import mmap
+import random
+import struct
+from bisect import bisect_left
+from pathlib import Path
+
+from utils.bitboard import CELLS, FULL_MASK, has_line, legal_moves
+
+MAGIC = b"TTT1"
+HEADER = struct.Struct("<4sI")
+ILLEGAL = -128
+TABLE_PATH = Path(__file__).resolve().parent.parent / "data" / "solution_table.bin"
+
+DIFFICULTIES = {
+    "easy": 0.2,
+    "medium": 0.6,
+    "hard": 1.0,
+}
+DEFAULT_DIFFICULTY = "hard"
+
+
+def _symmetries() -> list[tuple[int, ...]]:
+    """
+    Build the 8 symmetries of the board as cell permutations.
+
+    Returns:
+        list[tuple[int, ...]]: For every symmetry, the target index of each
+                               cell.
+    """
+    def rotate(row: int, col: int) -> tuple[int, int]:
+        return col, 2 - row
+
+    def mirror(row: int, col: int) -> tuple[int, int]:
+        return row, 2 - col
+
+    permutations = []
+    for flip in (False, True):
+        for turns in range(4):
+            permutation = []
+            for index in range(CELLS):
+                row, col = divmod(index, 3)
+                if flip:
+                    row, col = mirror(row, col)
+                for _ in range(turns):
+                    row, col = rotate(row, col)
+                permutation.append(row * 3 + col)
+            permutations.append(tuple(permutation))
+    return permutations
+
+
+SYMMETRIES = _symmetries()
+MASK_TRANSFORMS = tuple(
+    tuple(
+        sum(1 << permutation[i] for i in range(CELLS) if mask >> i & 1)
+        for mask in range(FULL_MASK + 1)
+    )
+    for permutation in SYMMETRIES
+)
+
+
+def canonicalize(x: int, o: int) -> tuple[int, int]:
+    """
+    Find the canonical key of a position and the symmetry leading to it.
+
+    Args:
+        x (int): The bitmask of cells taken by 'X'.
+        o (int): The bitmask of cells taken by 'O'.
+
+    Returns:
+        tuple[int, int]: The canonical ``x << 9 | o`` key and the index of
+                         the symmetry in ``SYMMETRIES``.
+    """
+    best_key = -1
+    best_symmetry = 0
+    for symmetry, transform in enumerate(MASK_TRANSFORMS):
+        key = transform[x] << CELLS | transform[o]
+        if best_key < 0 or key < best_key:
+            best_key = key
+            best_symmetry = symmetry
+    return best_key, best_symmetry
+
+
+def _negamax(
+    x: int, o: int, alpha: int, beta: int, depth: int, memo: dict
+) -> int:
+    """
+    Score a position for the player to move with alpha-beta pruning.
+
+    Wins are worth more the sooner they come, losses the later.
+
+    Args:
+        x (int): The bitmask of cells taken by 'X'.
+        o (int): The bitmask of cells taken by 'O'.
+        alpha (int): The lower search bound.
+        beta (int): The upper search bound.
+        depth (int): The number of plies already played.
+        memo (dict): Exact scores of positions solved with a full window.
+
+    Returns:
+        int: The score from the point of view of the player to move.
+    """
+    key = canonicalize(x, o)[0]
+    if key in memo:
+        return memo[key]
+    full_window = alpha == -CELLS - 1 and beta == CELLS + 1
+    x_to_move = x.bit_count() == o.bit_count()
+    best = -CELLS - 1
+    for index in legal_moves(x, o):
+        bit = 1 << index
+        if x_to_move:
+            child_x, child_o, mover = x | bit, o, x | bit
+        else:
+            child_x, child_o, mover = x, o | bit, o | bit
+        if has_line(mover):
+            score = CELLS + 1 - (depth + 1)
+        elif child_x | child_o == FULL_MASK:
+            score = 0
+        else:
+            score = -_negamax(child_x, child_o, -beta, -alpha, depth + 1, memo)
+        best = max(best, score)
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            break
+    if full_window:
+        memo[key] = best
+    return best
+
+
+def solve_moves(x: int, o: int, memo: dict) -> list[int]:
+    """
+    Score every cell of a position for the player to move.
+
+    Args:
+        x (int): The bitmask of cells taken by 'X'.
+        o (int): The bitmask of cells taken by 'O'.
+        memo (dict): Shared cache of solved positions.
+
+    Returns:
+        list[int]: The score of each of the 9 cells, ``ILLEGAL`` if taken.
+    """
+    window = CELLS + 1
+    depth = (x | o).bit_count()
+    scores = [ILLEGAL] * CELLS
+    x_to_move = x.bit_count() == o.bit_count()
+    for index in legal_moves(x, o):
+        bit = 1 << index
+        child_x, child_o = (x | bit, o) if x_to_move else (x, o | bit)
+        if has_line(child_x if x_to_move else child_o):
+            scores[index] = window - (depth + 1)
+        elif child_x | child_o == FULL_MASK:
+            scores[index] = 0
+        else:
+            scores[index] = -_negamax(
+                child_x, child_o, -window, window, depth + 1, memo
+            )
+    return scores
+
+
+def build_table() -> bytes:
+    """
+    Solve every reachable position and serialize the table.
+
+    Returns:
+        bytes: The table in the file layout described in the module docs.
+    """
+    memo: dict = {}
+    positions: dict[int, list[int]] = {}
+    stack = [(0, 0)]
+    seen = set()
+    while stack:
+        x, o = stack.pop()
+        key = canonicalize(x, o)[0]
+        if key in seen:
+            continue
+        seen.add(key)
+        if has_line(x) or has_line(o) or x | o == FULL_MASK:
+            continue
+        canonical_x, canonical_o = key >> CELLS, key & FULL_MASK
+        positions[key] = solve_moves(canonical_x, canonical_o, memo)
+        x_to_move = x.bit_count() == o.bit_count()
+        for index in legal_moves(x, o):
+            bit = 1 << index
+            stack.append((x | bit, o) if x_to_move else (x, o | bit))
+
+    keys = sorted(positions)
+    return b"".join((
+        HEADER.pack(MAGIC, len(keys)),
+        struct.pack(f"<{len(keys)}I", *keys),
+        b"".join(
+            struct.pack(f"<{CELLS}b", *positions[key]) for key in keys
+        ),
+    ))
+
+
+class SolutionTable:
+    """
+    Memory-mapped table of perfect-play move scores.
+
+    Attributes:
+        keys (memoryview): Sorted canonical position keys.
+        scores (memoryview): Move scores, 9 per key.
+    """
+
+    def __init__(self, buffer) -> None:
+        """
+        Wrap a buffer holding a serialized table.
+
+        Args:
+            buffer: A bytes-like object in the table file layout.
+
+        Raises:
+            ValueError: If the buffer is not a solution table.
+        """
+        magic, count = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Not a solution table")
+        view = memoryview(buffer)
+        keys_end = HEADER.size + count * 4
+        self.keys = view[HEADER.size:keys_end].cast("I")
+        self.scores = view[keys_end:keys_end + count * CELLS].cast("b")
+
+    @classmethod
+    def load(cls, path: Path = TABLE_PATH) -> "SolutionTable":
+        """
+        Memory-map a table file.
+
+        Args:
+            path (Path): The table file produced by ``build_table``.
+
+        Returns:
+            SolutionTable: The table backed by the mapped file.
+        """
+        with open(path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def move_scores(self, x: int, o: int) -> list[int]:
+        """
+        Get the score of every cell for the player to move.
+
+        Args:
+            x (int): The bitmask of cells taken by 'X'.
+            o (int): The bitmask of cells taken by 'O'.
+
+        Returns:
+            list[int]: The score of each cell, ``ILLEGAL`` if taken.
+
+        Raises:
+            KeyError: If the position is finished or unreachable.
+        """
+        key, symmetry = canonicalize(x, o)
+        position = bisect_left(self.keys, key)
+        if position == len(self.keys) or self.keys[position] != key:
+            raise KeyError(key)
+        offset = position * CELLS
+        permutation = SYMMETRIES[symmetry]
+        return [self.scores[offset + permutation[i]] for i in range(CELLS)]
+
+    def choose_move(
+        self,
+        x: int,
+        o: int,
+        difficulty: str = DEFAULT_DIFFICULTY,
+        rng: random.Random | None = None,
+    ) -> int:
+        """
+        Pick a move according to a difficulty level.
+
+        With the probability given in ``DIFFICULTIES`` the move is one of the
+        optimal ones, otherwise any free cell.
+
+        Args:
+            x (int): The bitmask of cells taken by 'X'.
+            o (int): The bitmask of cells taken by 'O'.
+            difficulty (str): One of the keys of ``DIFFICULTIES``.
+            rng (random.Random | None): The random source to use.
+
+        Returns:
+            int: The bit index of the chosen cell.
+        """
+        rng = rng or random
+        scores = self.move_scores(x, o)
+        moves = [i for i in range(CELLS) if scores[i] != ILLEGAL]
+        if rng.random() >= DIFFICULTIES[difficulty]:
+            return rng.choice(moves)
+        best = max(scores[i] for i in moves)
+        return rng.choice([i for i in moves if scores[i] == best])
+
+
+if __name__ == "__main__":
+    TABLE_PATH.parent.mkdir(exist_ok=True)
+    TABLE_PATH.write_bytes(build_table())
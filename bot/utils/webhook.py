@@ -14,6 +14,9 @@ async def setup_webhook(bot: Bot, dp: Dispatcher = Depends(get_dispatcher)) -> N
     """
     Set up the webhook for the specified Telegram 
 
+    Every webhook process registers the handlers, only the first one
+    registers the webhook and the bot commands with Telegram.
+
     Args:
         bot (Bot): The Telegram bot instance.
 
@@ -22,6 +25,8 @@ async def setup_webhook(bot: Bot, dp: Dispatcher = Depends(get_dispatcher)) -> N
     """
     logging.info("Setup webhook")
     dp.include_router(router)
+    if settings.WORKER_INDEX != 0:
+        return
     webhook = await bot.get_webhook_info()
     url = settings.WEBHOOK_DOMAIN
 
@@ -36,8 +41,10 @@ async def setup_webhook(bot: Bot, dp: Dispatcher = Depends(get_dispatcher)) -> N
     await bot.set_my_commands(
         [
             BotCommand(command="start", description="Start game"),
+            BotCommand(command="bot", description="Play against the bot"),
             BotCommand(command="leave", description="Leave game"),
             BotCommand(command="stats", description="Game stats"),
+            BotCommand(command="top", description="Top players"),
         ]
     )
 
@@ -1,9 +1,11 @@
 """Module for init."""
 
 from .game import game_router
+from .leaderboard import leaderboard_router
 from .user import user_router
 
 __all__ = (
     "game_router",
+    "leaderboard_router",
     "user_router",
 )
@@ -1,14 +1,21 @@
 """Module for game router."""
 
-from fastapi import Depends, APIRouter, status
-from fastapi.responses import ORJSONResponse
+from fastapi import Body, Depends, APIRouter, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, Response
 from integrations.bearer import JWTBearer
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from crud.game import get_user_games
+from crud.redis import redis_get_games_page
 from schema.game import GameCreate
-from config.db import get_db
-from crud.game import create_game
+from config.db import async_session, get_db
+from crud.game import create_game, create_games
+from crud.game_batcher import get_game_batcher
+from config import settings
+
+MAX_BULK_GAMES = 1000
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
 
 game_router = APIRouter()
 
@@ -22,6 +29,9 @@ async def create_game_endpoint(
     """
     Create a new game.
 
+    With game batching on, the game is inserted together with the games
+    of concurrent requests.
+
     Args:
         game (GameCreate): Data for creating a new game.
         db (AsyncSession): Database session.
@@ -29,25 +39,78 @@ async def create_game_endpoint(
     Returns:
         ORJSONResponse: Response with the created game in JSON format.
     """
-    db_game = await create_game(game, db)
-    return ORJSONResponse(db_game, status_code=status.HTTP_201_CREATED)
+    if settings.GAME_BATCH_ENABLED:
+        created = await get_game_batcher().add(game)
+    else:
+        created = await create_game(game, db)
+    return ORJSONResponse(created, status_code=status.HTTP_201_CREATED)
+
+
+@game_router.post("/games/bulk")
+async def create_games_endpoint(
+    games: list[GameCreate] = Body(max_length=MAX_BULK_GAMES),
+    db: AsyncSession = Depends(get_db),
+    token: HTTPAuthorizationCredentials = Depends(JWTBearer()),
+) -> ORJSONResponse:
+    """
+    Create several games at once.
+
+    Games already stored with the same idempotency key are skipped,
+    so a batch sent again after a lost response is stored once.
+
+    Args:
+        games (list[GameCreate]): Data for creating the games.
+        db (AsyncSession): Database session.
+
+    Returns:
+        ORJSONResponse: Response with the games created in JSON format.
+    """
+    created = await create_games(games, db)
+    return ORJSONResponse(created, status_code=status.HTTP_201_CREATED)
 
 
 @game_router.get("/games/{user_id}")
 async def get_games_by_user(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
     token: HTTPAuthorizationCredentials = Depends(JWTBearer()),
 ) -> ORJSONResponse:
     """
-    Retrieve all games played by a specific user.
+    Retrieve a page of the games played by a specific user, newest first.
+
+    Pages are served from the cache until the user plays another game.
 
     Args:
         user_id (int): The ID of the user to retrieve games for.
-        db (AsyncSession): Database session.
+        limit (int): The most games on the page.
+        cursor (str | None): The ``next_cursor`` of the previous page.
 
     Returns:
-        ORJSONResponse: Response with a list played by the user in JSON.
+        Response: Response with the games on the page and the cursor
+                  of the next page, null on the last one.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
     """
-    games = await get_user_games(user_id, db)
-    return ORJSONResponse(games)
+
+    async def load_page() -> dict:
+        """
+        Read the page from the database in a session of its own.
+
+        Returns:
+            dict: The games on the page and the cursor of the next page.
+        """
+        async with async_session() as db:
+            games, next_cursor = await get_user_games(
+                user_id, db, limit, cursor
+            )
+        return {"games": games, "next_cursor": next_cursor}
+
+    try:
+        page = await redis_get_games_page(user_id, limit, cursor, load_page)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        )
+    return Response(page, media_type="application/json")
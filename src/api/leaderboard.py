@@ -0,0 +1,36 @@
+"""Module for leaderboard router."""
+
+from fastapi import Depends, APIRouter, Query
+from fastapi.responses import ORJSONResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from integrations.bearer import JWTBearer
+from crud.leaderboard import get_top
+
+DEFAULT_TOP_SIZE = 10
+MAX_TOP_SIZE = 100
+
+leaderboard_router = APIRouter()
+
+
+@leaderboard_router.get("/leaderboard")
+async def get_leaderboard(
+    limit: int = Query(DEFAULT_TOP_SIZE, ge=1, le=MAX_TOP_SIZE),
+    token: HTTPAuthorizationCredentials = Depends(JWTBearer()),
+) -> ORJSONResponse:
+    """
+    Retrieve the highest rated players.
+
+    Args:
+        limit (int): The number of players.
+
+    Returns:
+        ORJSONResponse: Response with the place, Telegram ID and rating
+                        of each player, best first.
+    """
+    top = await get_top(limit)
+    return ORJSONResponse(
+        [
+            {"rank": rank, "telegram_id": telegram_id, "rating": rating}
+            for rank, (telegram_id, rating) in enumerate(top, start=1)
+        ]
+    )
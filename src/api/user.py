@@ -1,45 +1,148 @@
 """Module for user in the game."""
 
-from fastapi import Depends, APIRouter, status
+import asyncio
+from dataclasses import asdict
+
+from fastapi import Depends, APIRouter, Query, status
 from fastapi.responses import ORJSONResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from integrations.auth import sign_jwt
-from crud.redis import redis_get_model, redis_set_model
+from integrations.bearer import JWTBearer
+from crud.redis import (
+    get_model_cache,
+    load_once,
+    redis_get_model,
+    redis_set_model,
+)
 from models import User
-from crud.user import get_user_by_tg_id, create_user
+from crud.leaderboard import get_rank, get_rating
+from crud.stats import DEFAULT_RATING, get_user_stats
+from crud.user import get_usernames_by_tg_ids, upsert_user
 from schema.user import UserCreate
-from config.db import get_db
+from config.db import async_session, get_db
+from metrics import CACHE_REQUESTS
 
 user_router = APIRouter()
 
 
 @user_router.post("/users/")
-async def create_user_endpoint(
-    user: UserCreate, db: AsyncSession = Depends(get_db)
-) -> ORJSONResponse:
+async def create_user_endpoint(user: UserCreate) -> ORJSONResponse:
     """
-    Create a new user.
+    Register a user, or refresh the username of a registered one.
+
+    A user cached with the same username is answered from Redis. Otherwise
+    the user is upserted and cached, concurrent registrations of the same
+    user in this process sharing one upsert.
 
     Args:
         user (UserCreate): Data for creating a new user.
+
+    Returns:
+        ORJSONResponse: Response with the user, an access token and the
+                        user's rating in JSON format.
+    """
+    cached_user, rating = await asyncio.gather(
+        redis_get_model(User.__tablename__, user.telegram_id),
+        get_rating(user.telegram_id),
+    )
+
+    async def register() -> dict:
+        """
+        Upsert the user in a session of its own and cache it.
+
+        Returns:
+            dict: The stored user.
+        """
+        async with async_session() as db:
+            db_user = await upsert_user(user, db)
+        await redis_set_model(User.__tablename__, db_user.telegram_id, db_user)
+        return asdict(db_user)
+
+    if cached_user and cached_user["username"] == user.username:
+        CACHE_REQUESTS.labels(cache="users", result="hit").inc()
+    else:
+        redis_key = await get_model_cache(User.__tablename__, user.telegram_id)
+        cached_user = await load_once(
+            "users", f"{redis_key}:{user.username}", register
+        )
+    return ORJSONResponse(
+        {
+            **cached_user,
+            "access_token": sign_jwt(str(user.telegram_id)),
+            "rating": rating or DEFAULT_RATING,
+        },
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+@user_router.get("/users/")
+async def get_usernames_endpoint(
+    telegram_ids: list[int] = Query(max_length=100),
+    db: AsyncSession = Depends(get_db),
+    token: HTTPAuthorizationCredentials = Depends(JWTBearer()),
+) -> ORJSONResponse:
+    """
+    Retrieve the usernames of several users.
+
+    Args:
+        telegram_ids (list[int]): The Telegram IDs of the users.
         db (AsyncSession): Database session.
 
     Returns:
-        ORJSONResponse: Response with the created user in JSON format.
-
-    Raises:
-        HTTPException: If a user with the same Telegram ID already exists.
-    """
-    cached_user = await redis_get_model(User.__tablename__, user.telegram_id)
-    if cached_user:
-        cached_user["access_token"] = sign_jwt(str(user.telegram_id))
-        return ORJSONResponse(cached_user, status_code=status.HTTP_201_CREATED)
-
-    existing_user = await get_user_by_tg_id(user.telegram_id, db)
-    if existing_user:
-        existing_user.access_token = sign_jwt(str(user.telegram_id))
-        return ORJSONResponse(existing_user, status_code=status.HTTP_201_CREATED)
-    db_user = await create_user(user, db)
-    db_user.access_token = sign_jwt(str(user.telegram_id))
-    await redis_set_model(User.__tablename__, db_user.telegram_id, db_user)
-    return ORJSONResponse(db_user, status_code=status.HTTP_201_CREATED)
+        ORJSONResponse: Response with the Telegram ID and username
+                        of each user found.
+    """
+    users = await get_usernames_by_tg_ids(telegram_ids, db)
+    return ORJSONResponse(
+        [
+            {"telegram_id": telegram_id, "username": username}
+            for telegram_id, username in users
+        ]
+    )
+
+
+@user_router.get("/users/{telegram_id}/stats")
+async def get_user_stats_endpoint(
+    telegram_id: int,
+    db: AsyncSession = Depends(get_db),
+    token: HTTPAuthorizationCredentials = Depends(JWTBearer()),
+) -> ORJSONResponse:
+    """
+    Retrieve the wins, losses, draws and streaks of a user.
+
+    Args:
+        telegram_id (int): The Telegram ID of the user.
+        db (AsyncSession): Database session.
+
+    Returns:
+        ORJSONResponse: Response with the user's stats in JSON format.
+    """
+    stats = await get_user_stats(telegram_id, db)
+    return ORJSONResponse(stats)
+
+
+@user_router.get("/users/{telegram_id}/rank")
+async def get_user_rank_endpoint(
+    telegram_id: int,
+    token: HTTPAuthorizationCredentials = Depends(JWTBearer()),
+) -> ORJSONResponse:
+    """
+    Retrieve the place and rating of a user on the leaderboard.
+
+    Args:
+        telegram_id (int): The Telegram ID of the user.
+
+    Returns:
+        ORJSONResponse: Response with the user's place, null for a user
+                        without games, and rating in JSON format.
+    """
+    rank = await get_rank(telegram_id)
+    if rank is None:
+        return ORJSONResponse(
+            {"telegram_id": telegram_id, "rank": None, "rating": DEFAULT_RATING}
+        )
+    place, rating = rank
+    return ORJSONResponse(
+        {"telegram_id": telegram_id, "rank": place, "rating": rating}
+    )
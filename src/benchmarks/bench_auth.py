@@ -0,0 +1,91 @@
+"""Module for auth overhead benchmark.
+
+Time ``JWTBearer`` on a request carrying a bot access token:
+
+* before: the token's signature checked and its claims parsed on every
+  request, as without the token cache;
+* after: the token found in the cache by its digest after the first
+  request.
+
+Needs no servers. Run from the ``src`` directory:
+
+    python -m benchmarks.bench_auth
+"""
+
+import asyncio
+import time
+
+from fastapi import Request
+
+from integrations.auth import decode_jwt, sign_jwt
+from integrations.bearer import JWTBearer
+
+REQUESTS = 100_000
+
+
+def make_request(token: str) -> Request:
+    """
+    Build a request with a bearer token.
+
+    Args:
+        token (str): The access token.
+
+    Returns:
+        Request: The request as the route receives it.
+    """
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/games/1",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+class UncachedJWTBearer(JWTBearer):
+    """JWTBearer verifying every token from scratch."""
+
+    def verify_jwt(self, jwtoken: str) -> dict | None:
+        """
+        Decode the token without the cache.
+
+        Args:
+            jwtoken (str): The JSON Web Token to be verified.
+
+        Returns:
+            dict | None: The claims if the token is valid, else None.
+        """
+        return decode_jwt(jwtoken) or None
+
+
+async def measure(bearer: JWTBearer, request: Request, label: str) -> None:
+    """
+    Authenticate the same request many times and print the cost of one.
+
+    Args:
+        bearer (JWTBearer): The dependency to time.
+        request (Request): The authenticated request.
+        label (str): The name printed with the results.
+
+    Raises:
+        HTTPException: If the token is refused.
+    """
+    await bearer(request)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await bearer(request)
+    elapsed = time.perf_counter() - start
+    print(f"  {label}: {elapsed / REQUESTS * 1_000_000:.2f} us/request")
+
+
+async def main() -> None:
+    """Run the benchmark and print the results."""
+    request = make_request(sign_jwt("1"))
+    print(f"auth overhead, {REQUESTS:,} requests with one token")
+    await measure(UncachedJWTBearer(), request, "before")
+    await measure(JWTBearer(), request, "after ")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+"""Module for bulk game ingestion benchmark.
+
+Compare the rows per second stored through ``POST /games/`` one game at a
+time with ``POST /games/bulk`` at several batch sizes. Requests go to the
+application in process, so the numbers include validation, auth and the
+database round trips but not the network. Uses the PostgreSQL server from
+the environment and deletes the games it creates.
+
+Run from the ``src`` directory:
+
+    python -m benchmarks.bench_bulk_games
+"""
+
+import asyncio
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete
+
+from config.db import async_session
+from crud.user import get_user_by_tg_id
+from integrations.auth import sign_jwt
+from main import main as create_app
+from models import Game, User
+from models.meta import create_db
+
+ROWS = 2_000
+BATCH_SIZES = (10, 100, 1_000)
+PLAYER1_ID = -1
+PLAYER2_ID = -2
+
+
+def make_games(count: int, run: str) -> list[dict]:
+    """
+    Build game records with unique idempotency keys.
+
+    Args:
+        count (int): The number of games.
+        run (str): The prefix of the keys of this run.
+
+    Returns:
+        list[dict]: The games as sent to the API.
+    """
+    return [
+        {
+            "player1_id": PLAYER1_ID,
+            "player2_id": PLAYER2_ID,
+            "result": "X",
+            "idempotency_key": f"{run}-{number}",
+        }
+        for number in range(count)
+    ]
+
+
+async def single_rows_per_second(client: httpx.AsyncClient, run: str) -> float:
+    """
+    Store the games one request each.
+
+    Args:
+        client (httpx.AsyncClient): The client bound to the application.
+        run (str): The prefix of the keys of this run.
+
+    Returns:
+        float: Rows stored per second.
+    """
+    games = make_games(ROWS, run)
+    start = time.perf_counter()
+    for game in games:
+        response = await client.post("/games/", json=game)
+        response.raise_for_status()
+    return ROWS / (time.perf_counter() - start)
+
+
+async def bulk_rows_per_second(
+    client: httpx.AsyncClient, run: str, batch_size: int
+) -> float:
+    """
+    Store the games in batches.
+
+    Args:
+        client (httpx.AsyncClient): The client bound to the application.
+        run (str): The prefix of the keys of this run.
+        batch_size (int): The number of games per request.
+
+    Returns:
+        float: Rows stored per second.
+    """
+    games = make_games(ROWS, run)
+    start = time.perf_counter()
+    for first in range(0, ROWS, batch_size):
+        response = await client.post(
+            "/games/bulk", json=games[first:first + batch_size]
+        )
+        response.raise_for_status()
+    return ROWS / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    """Run the benchmark and print the results."""
+    await create_db()
+    async with async_session() as db:
+        for telegram_id in (PLAYER1_ID, PLAYER2_ID):
+            if await get_user_by_tg_id(telegram_id, db) is None:
+                db.add(User(telegram_id=telegram_id, username="bench"))
+        await db.commit()
+
+    run = f"bench-{uuid.uuid4()}"
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(
+        transport=transport,
+        base_url="http://api",
+        headers={"Authorization": f"Bearer {sign_jwt(str(PLAYER1_ID))}"},
+    ) as client:
+        try:
+            print(f"rows per second, {ROWS} games")
+            rate = await single_rows_per_second(client, f"{run}-single")
+            print(f"  POST /games/          : {rate:,.0f}")
+            for batch_size in BATCH_SIZES:
+                rate = await bulk_rows_per_second(
+                    client, f"{run}-{batch_size}", batch_size
+                )
+                print(f"  POST /games/bulk x{batch_size:<4}: {rate:,.0f}")
+        finally:
+            async with async_session() as db:
+                await db.execute(
+                    delete(Game).where(Game.idempotency_key.startswith(run))
+                )
+                await db.execute(
+                    delete(User).where(
+                        User.telegram_id.in_((PLAYER1_ID, PLAYER2_ID))
+                    )
+                )
+                await db.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
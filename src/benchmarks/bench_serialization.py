@@ -0,0 +1,118 @@
+"""Module for response serialization benchmark.
+
+Compare the throughput of building a 1k-game history response from rows
+already fetched by the database driver:
+
+* before: ``select(Game)``, loading ORM objects into a session and
+  handing them to orjson;
+* after: ``select(*GAME_COLUMNS)``, mapping the rows to ``GameRecord``.
+
+The rows come from an in-memory SQLite database, so the driver costs the
+same on both sides and no servers are needed. Run from the ``src``
+directory:
+
+    python -m benchmarks.bench_serialization
+"""
+
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+import orjson
+from sqlalchemy import Engine, create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from crud.game import GAME_COLUMNS
+from models import Game
+from models.meta import DEFAULT_SCHEMA
+from schema.game import GameRecord
+
+ROWS = 1_000
+RESPONSES = 200
+
+
+def create_history() -> Engine:
+    """
+    Create an in-memory games table holding one history page.
+
+    Returns:
+        Engine: The engine bound to the database.
+    """
+    engine = create_engine(
+        "sqlite://",
+        execution_options={"schema_translate_map": {DEFAULT_SCHEMA: None}},
+    )
+    Game.__table__.create(engine)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Game),
+            [
+                {
+                    "id": number,
+                    "player1_id": 1,
+                    "player2_id": 2 + number % 70,
+                    "result": "X",
+                    "idempotency_key": f"game-{number}",
+                    "created_at": now - timedelta(seconds=number),
+                }
+                for number in range(1, ROWS + 1)
+            ],
+        )
+    return engine
+
+
+def measure(respond: Callable[[], bytes], label: str) -> None:
+    """
+    Build responses repeatedly and print the throughput.
+
+    Args:
+        respond (Callable[[], bytes]): Build one response body.
+        label (str): The name printed with the results.
+    """
+    size = len(respond())
+    start = time.perf_counter()
+    for _ in range(RESPONSES):
+        respond()
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {label}: {RESPONSES / elapsed:,.0f} responses/s, "
+        f"{RESPONSES * ROWS / elapsed:,.0f} rows/s ({size:,} bytes)"
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    engine = create_history()
+    order = (Game.created_at.desc(), Game.id.desc())
+
+    def respond_with_objects() -> bytes:
+        """
+        Load ORM objects and serialize them.
+
+        Returns:
+            bytes: The response body.
+        """
+        with Session(engine) as db:
+            games = db.scalars(select(Game).order_by(*order)).all()
+            return orjson.dumps({"games": games, "next_cursor": None})
+
+    def respond_with_records() -> bytes:
+        """
+        Map the selected rows to records and serialize them.
+
+        Returns:
+            bytes: The response body.
+        """
+        with engine.connect() as conn:
+            rows = conn.execute(select(*GAME_COLUMNS).order_by(*order))
+            games = [GameRecord(*row) for row in rows]
+            return orjson.dumps({"games": games, "next_cursor": None})
+
+    print(f"history responses of {ROWS:,} games")
+    measure(respond_with_objects, "ORM objects")
+    measure(respond_with_records, "records    ")
+
+
+if __name__ == "__main__":
+    main()
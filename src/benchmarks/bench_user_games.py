@@ -0,0 +1,196 @@
+"""Module for user games query benchmark.
+
+Seed millions of games into a scratch schema of the configured PostgreSQL
+and compare the latency of a user's first page of games:
+
+* before: ``player1_id = u OR player2_id = u`` ordered by ID, without the
+  ``(player_id, created_at)`` indexes;
+* after: ``crud.game.get_user_games`` with the indexes in place.
+
+The query plan of both is printed. The scratch schema is dropped at the end.
+
+Run from the ``src`` directory:
+
+    python -m benchmarks.bench_user_games
+"""
+
+import asyncio
+import random
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import event, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from config.db import engine
+from crud.game import get_user_games
+from models import Game
+from models.meta import DEFAULT_SCHEMA
+
+BENCH_SCHEMA = "tictactoe_bench"
+GAMES = 2_000_000
+USERS = 100_000
+LOOKUPS = 200
+PAGE_SIZE = 10
+
+last_statement: list = [None, None]
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def remember_statement(conn, cursor, statement, parameters, context, many):
+    """
+    Keep the last statement sent to the server for EXPLAIN.
+
+    Args:
+        conn: The connection.
+        cursor: The DBAPI cursor.
+        statement (str): The SQL sent.
+        parameters: Its parameters.
+        context: The execution context.
+        many (bool): Whether it is an executemany.
+    """
+    last_statement[:] = statement, parameters
+
+
+async def seed(conn: AsyncConnection) -> None:
+    """
+    Create the scratch games table and fill it.
+
+    Args:
+        conn (AsyncConnection): The connection to seed through.
+    """
+    await conn.execute(text(f"drop schema if exists {BENCH_SCHEMA} cascade"))
+    await conn.execute(text(f"create schema {BENCH_SCHEMA}"))
+    await conn.execute(
+        text(
+            f"""
+            create table {BENCH_SCHEMA}.games (
+                id bigserial primary key,
+                player1_id bigint not null,
+                player2_id bigint not null,
+                result varchar not null,
+                idempotency_key varchar unique,
+                created_at timestamptz not null default now()
+            )
+            """
+        )
+    )
+    await conn.execute(
+        text(
+            f"""
+            insert into {BENCH_SCHEMA}.games
+                (player1_id, player2_id, result, created_at)
+            select
+                1 + floor(random() * :users)::bigint,
+                1 + floor(random() * :users)::bigint,
+                'X',
+                now() - make_interval(secs => :games - n)
+            from generate_series(1, :games) as n
+            """
+        ),
+        {"users": USERS, "games": GAMES},
+    )
+    await conn.execute(text(f"analyze {BENCH_SCHEMA}.games"))
+    await conn.commit()
+
+
+async def add_indexes(conn: AsyncConnection) -> None:
+    """
+    Create the indexes of the games table in the scratch schema.
+
+    Args:
+        conn (AsyncConnection): The connection to create them through.
+    """
+    for column in ("player1_id", "player2_id"):
+        await conn.execute(
+            text(
+                f"create index on {BENCH_SCHEMA}.games ({column}, created_at)"
+            )
+        )
+    await conn.execute(text(f"analyze {BENCH_SCHEMA}.games"))
+    await conn.commit()
+
+
+async def old_first_page(user_id: int, db: AsyncSession) -> None:
+    """
+    Read a first page the way it was read before the indexes.
+
+    Args:
+        user_id (int): The Telegram ID of the user.
+        db (AsyncSession): The session bound to the scratch schema.
+    """
+    await db.execute(
+        select(Game)
+        .filter(or_(Game.player1_id == user_id, Game.player2_id == user_id))
+        .order_by(Game.id.desc())
+        .limit(PAGE_SIZE + 1)
+    )
+
+
+async def new_first_page(user_id: int, db: AsyncSession) -> None:
+    """
+    Read a first page with ``get_user_games``.
+
+    Args:
+        user_id (int): The Telegram ID of the user.
+        db (AsyncSession): The session bound to the scratch schema.
+    """
+    await get_user_games(user_id, db, PAGE_SIZE)
+
+
+async def measure(
+    conn: AsyncConnection,
+    read_page: Callable[[int, AsyncSession], Awaitable[None]],
+    label: str,
+) -> None:
+    """
+    Time first pages of random users and print the plan of the last one.
+
+    Args:
+        conn (AsyncConnection): The connection bound to the scratch schema.
+        read_page (Callable): ``old_first_page`` or ``new_first_page``.
+        label (str): The name printed with the results.
+    """
+    rng = random.Random(0)
+    latencies = []
+    async with AsyncSession(bind=conn) as db:
+        for _ in range(LOOKUPS):
+            user_id = rng.randint(1, USERS)
+            start = time.perf_counter()
+            await read_page(user_id, db)
+            latencies.append(time.perf_counter() - start)
+        statement, parameters = last_statement
+        plan = await conn.exec_driver_sql(
+            f"explain analyze {statement}", parameters
+        )
+    print(
+        f"{label}: p50={statistics.median(latencies) * 1000:.2f}ms "
+        f"p99={statistics.quantiles(latencies, n=100)[98] * 1000:.2f}ms"
+    )
+    for (line,) in plan:
+        print(f"    {line}")
+
+
+async def main() -> None:
+    """Run the benchmark and print the results."""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(
+            schema_translate_map={DEFAULT_SCHEMA: BENCH_SCHEMA}
+        )
+        try:
+            print(f"seeding {GAMES:,} games of {USERS:,} users")
+            await seed(conn)
+            await measure(conn, old_first_page, "before")
+            await add_indexes(conn)
+            await measure(conn, new_first_page, "after")
+        finally:
+            await conn.rollback()
+            await conn.execute(
+                text(f"drop schema if exists {BENCH_SCHEMA} cascade")
+            )
+            await conn.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
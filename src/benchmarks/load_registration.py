@@ -0,0 +1,191 @@
+"""Module for registration load test.
+
+Replay ``/start`` presses of many users against ``POST /users/`` and count
+the database statements per request. Each user presses several times, a
+few presses at once, with a cold cache and the users already registered,
+as after a Redis restart:
+
+* before: the previous path, a cache lookup, a SELECT and, for new users
+  only, an INSERT and a cache write, so registered users never reach the
+  cache;
+* after: the endpoint, one upsert per user whose result is cached and
+  shared by the concurrent presses.
+
+Requests go to the application in process. Uses the PostgreSQL and Redis
+servers from the environment and deletes the users it creates.
+
+Run from the ``src`` directory:
+
+    python -m benchmarks.load_registration
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+import httpx
+from sqlalchemy import delete, event
+
+from config.db import async_session, engine
+from crud.redis import (
+    get_model_cache,
+    redis_get_model,
+    redis_set_model,
+)
+from crud.user import get_user_by_tg_id, upsert_user
+from integrations.redis import get_redis
+from main import main as create_app
+from models import User
+from models.meta import create_db
+from schema.user import UserCreate
+
+USERS = 500
+PRESSES = 4
+CONCURRENT_PRESSES = 2
+FIRST_TELEGRAM_ID = -1_000_000
+
+statements = [0]
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, many):
+    """
+    Count the statements sent to the server.
+
+    Args:
+        conn: The connection.
+        cursor: The DBAPI cursor.
+        statement (str): The SQL sent.
+        parameters: Its parameters.
+        context: The execution context.
+        many (bool): Whether it is an executemany.
+    """
+    statements[0] += 1
+
+
+def make_users() -> list[UserCreate]:
+    """
+    Build the registration requests of the synthetic users.
+
+    Returns:
+        list[UserCreate]: One request per user.
+    """
+    return [
+        UserCreate(telegram_id=FIRST_TELEGRAM_ID - number, username="load")
+        for number in range(USERS)
+    ]
+
+
+async def old_register(user: UserCreate) -> None:
+    """
+    Register a user the way it was done before the upsert.
+
+    Args:
+        user (UserCreate): The registration request.
+    """
+    if await redis_get_model(User.__tablename__, user.telegram_id):
+        return
+    async with async_session() as db:
+        if await get_user_by_tg_id(user.telegram_id, db) is not None:
+            return
+        db_user = User(telegram_id=user.telegram_id, username=user.username)
+        db.add(db_user)
+        await db.commit()
+        await redis_set_model(User.__tablename__, user.telegram_id, db_user)
+
+
+async def new_register(client: httpx.AsyncClient, user: UserCreate) -> None:
+    """
+    Register a user through the endpoint.
+
+    Args:
+        client (httpx.AsyncClient): The client bound to the application.
+        user (UserCreate): The registration request.
+    """
+    response = await client.post("/users/", json=user.model_dump())
+    response.raise_for_status()
+
+
+async def reset_cache(users: list[UserCreate]) -> None:
+    """
+    Drop the cached users, as after a Redis restart.
+
+    Args:
+        users (list[UserCreate]): The synthetic users.
+    """
+    await get_redis().delete(
+        *[
+            await get_model_cache(User.__tablename__, user.telegram_id)
+            for user in users
+        ]
+    )
+
+
+async def measure(
+    users: list[UserCreate],
+    register: Callable[[UserCreate], Awaitable[None]],
+    label: str,
+) -> None:
+    """
+    Replay the presses of all users and print statements per request.
+
+    Args:
+        users (list[UserCreate]): The synthetic users.
+        register (Callable): Register one user.
+        label (str): The name printed with the results.
+    """
+    await reset_cache(users)
+    requests = USERS * PRESSES
+    statements[0] = 0
+    start = time.perf_counter()
+    for _ in range(PRESSES // CONCURRENT_PRESSES):
+        await asyncio.gather(
+            *(
+                register(user)
+                for user in users
+                for _ in range(CONCURRENT_PRESSES)
+            )
+        )
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {label}: {statements[0] / requests:.2f} statements/request, "
+        f"{requests / elapsed:,.0f} requests/s"
+    )
+
+
+async def main() -> None:
+    """Run the load test and print the results."""
+    await create_db()
+    users = make_users()
+    async with async_session() as db:
+        for user in users:
+            await upsert_user(user, db)
+
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://api"
+    ) as client:
+        try:
+            print(
+                f"{USERS} registered users, {PRESSES} presses each, "
+                f"{CONCURRENT_PRESSES} at once, cold cache"
+            )
+            await measure(users, old_register, "before")
+            await measure(
+                users, lambda user: new_register(client, user), "after "
+            )
+        finally:
+            await reset_cache(users)
+            async with async_session() as db:
+                await db.execute(
+                    delete(User).where(
+                        User.telegram_id.in_(
+                            [user.telegram_id for user in users]
+                        )
+                    )
+                )
+                await db.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -19,6 +19,13 @@ class Settings(BaseSettings):
         REDIS_PORT (int): The port number of the Redis server.
         REDIS_PASSWORD (str): The password for the Redis server.
         TELEGRAM_API_TOKEN (str): The API token for the Telegram bot.
+        TOKEN_CACHE_SIZE (int): The most verified access tokens kept in
+                                process.
+        GAME_BATCH_ENABLED (bool): Whether games from concurrent requests
+                                   are inserted in shared transactions.
+        GAME_BATCH_WINDOW (float): Seconds a game waits for others to be
+                                   inserted with.
+        GAME_BATCH_MAX_SIZE (int): The most games inserted at once.
     """
 
     POSTGRES_HOST: str
@@ -66,6 +73,11 @@ class Settings(BaseSettings):
     WEBHOOK_PORT: int
     WEBHOOK_DOMAIN: str
     JWT_SECRET: str
+    TOKEN_CACHE_SIZE: int = 10_000
+
+    GAME_BATCH_ENABLED: bool = False
+    GAME_BATCH_WINDOW: float = 0.005
+    GAME_BATCH_MAX_SIZE: int = 100
 
 
 settings = Settings()
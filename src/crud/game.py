@@ -1,54 +1,320 @@
 """Module for game."""
 
-from typing import Sequence
-from sqlalchemy import or_, select
+import base64
+import logging
+from collections import defaultdict
+from datetime import datetime
+
+import orjson
+from sqlalchemy import Select, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from crud.leaderboard import set_ratings
+from crud.redis import redis_bump_games_version
+from crud.stats import update_user_stats
 from metrics import async_integrations_timer
 from models import Game
-from schema.game import GameCreate
+from schema.game import GameCreate, GameRecord
+
+GAME_COLUMNS = (
+    Game.id,
+    Game.player1_id,
+    Game.player2_id,
+    Game.result,
+    Game.idempotency_key,
+    Game.created_at,
+)
 
 
 @async_integrations_timer
-async def create_game(game: GameCreate, db: AsyncSession) -> Game:
+async def create_game(game: GameCreate, db: AsyncSession) -> GameRecord:
     """
     Create a new game in the database.
 
+    A game sent again with the same idempotency key is not stored twice.
+    The players' stats and ratings are updated in the same transaction,
+    then the ratings are copied to the leaderboard and the players' cached
+    game history is invalidated, see ``publish_games``.
+
     Args:
         game (GameCreate): The game data to be created.
         db (AsyncSession): The database session used for the operation.
 
     Returns:
-        Game: The created game object.
+        GameRecord: The created game, or the one stored before
+                    with the same idempotency key.
     """
-    db_game = Game(
-        player1_id=game.player1_id,
-        player2_id=game.player2_id,
-        result=game.result)
-    db.add(db_game)
+    result = await db.execute(
+        insert(Game)
+        .values(game.model_dump())
+        .on_conflict_do_nothing(index_elements=[Game.idempotency_key])
+        .returning(*GAME_COLUMNS)
+    )
+    created = result.first()
+    if created is None:
+        result = await db.execute(
+            select(*GAME_COLUMNS).where(
+                Game.idempotency_key == game.idempotency_key
+            )
+        )
+        return GameRecord(*result.one())
+    ratings = await update_user_stats([created], db)
     await db.commit()
-    await db.refresh(db_game)
-    return db_game
+    record = GameRecord(*created)
+    await publish_games([record], ratings)
+    return record
 
 
 @async_integrations_timer
-async def get_user_games(user_id: int, db: AsyncSession) -> Sequence[Game]:
+async def create_games(
+    games: list[GameCreate], db: AsyncSession
+) -> list[GameRecord]:
     """
-    Retrieve all games associated with a user.
+    Create several games with a single multi-row insert.
+
+    Games whose idempotency key is already stored, or repeated within
+    the batch, are skipped. The players' stats and ratings are updated in
+    the same transaction, then the ratings are copied to the leaderboard
+    and the players' cached game history is invalidated, see
+    ``publish_games``.
 
     Args:
-        user_id (int): The ID of the user whose games are to be retrieved.
+        games (list[GameCreate]): The game data to be created.
+        db (AsyncSession): The database session used for the operation.
+
+    Returns:
+        list[GameRecord]: The games created.
+    """
+    created, ratings = await insert_games(games, db)
+    await publish_games(created, ratings)
+    return created
+
+
+async def insert_games(
+    games: list[GameCreate], db: AsyncSession
+) -> tuple[list[GameRecord], dict[int, tuple[float, int]]]:
+    """
+    Insert several games and update their players' stats in one commit.
+
+    Games whose idempotency key is already stored, or repeated within
+    the batch, are skipped. Nothing is stored if this raises before the
+    commit.
+
+    Args:
+        games (list[GameCreate]): The game data to be created.
         db (AsyncSession): The database session used for the operation.
 
     Returns:
-        Sequence[Game]: A sequence of game objects associated with the user.
+        tuple[list[GameRecord], dict[int, tuple[float, int]]]: The games
+            created and the new ratings of their players.
     """
+    rows = []
+    keys = set()
+    for game in games:
+        if game.idempotency_key is not None:
+            if game.idempotency_key in keys:
+                continue
+            keys.add(game.idempotency_key)
+        rows.append(game.model_dump())
+    if not rows:
+        return [], {}
     result = await db.execute(
-        select(Game).filter(
-            or_(
-                Game.player1_id == user_id,
-                Game.player2_id == user_id
+        insert(Game)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[Game.idempotency_key])
+        .returning(*GAME_COLUMNS)
+    )
+    created = result.all()
+    ratings = await update_user_stats(
+        sorted(created, key=lambda game: game.id), db
+    )
+    await db.commit()
+    return [GameRecord(*row) for row in created], ratings
+
+
+async def publish_games(
+    created: list[GameRecord], ratings: dict[int, tuple[float, int]]
+) -> None:
+    """
+    Copy committed games to Redis, logging failures instead of raising.
+
+    The games are already stored, so a failure here must not make the
+    caller insert them again. A rating that is not copied is corrected by
+    the player's next game or by ``jobs.rebuild_leaderboard``, and a
+    cached history page expires on its own.
+
+    Args:
+        created (list[GameRecord]): The games committed.
+        ratings (dict[int, tuple[float, int]]): The new ratings of their
+                                                players.
+    """
+    try:
+        await set_ratings(ratings)
+    except Exception:
+        logging.exception("Failed to copy ratings to the leaderboard")
+    try:
+        await redis_bump_games_version(
+            *(
+                player_id
+                for game in created
+                for player_id in (game.player1_id, game.player2_id)
             )
         )
+    except Exception:
+        logging.exception("Failed to invalidate cached game history")
+
+
+@async_integrations_timer
+async def get_stored_games(
+    games: list[GameCreate], created: list[GameRecord], db: AsyncSession
+) -> list[GameRecord]:
+    """
+    Find the stored record of each game sent to ``insert_games``.
+
+    A game whose idempotency key was stored before gets the game stored
+    with that key, so every game sent gets a record, in the order sent.
+
+    Args:
+        games (list[GameCreate]): The game data sent.
+        created (list[GameRecord]): The games ``insert_games`` created.
+        db (AsyncSession): The database session used for the operation.
+
+    Returns:
+        list[GameRecord]: The record of each game.
+    """
+    by_key = {}
+    without_key = defaultdict(list)
+    for record in created:
+        if record.idempotency_key is None:
+            without_key[
+                record.player1_id, record.player2_id, record.result
+            ].append(record)
+        else:
+            by_key[record.idempotency_key] = record
+    keys = {game.idempotency_key for game in games}
+    missing = keys - by_key.keys() - {None}
+    if missing:
+        result = await db.execute(
+            select(*GAME_COLUMNS).where(Game.idempotency_key.in_(missing))
+        )
+        for row in result:
+            by_key[row.idempotency_key] = GameRecord(*row)
+    records = []
+    for game in games:
+        if game.idempotency_key is not None:
+            records.append(by_key[game.idempotency_key])
+        else:
+            # Games without a key differ only in their ID and creation
+            # time, so any of the equal ones created will do.
+            records.append(
+                without_key[game.player1_id, game.player2_id, game.result].pop()
+            )
+    return records
+
+
+def encode_cursor(game: GameRecord) -> str:
+    """
+    Build the opaque cursor pointing after a game.
+
+    Args:
+        game (GameRecord): The last game of a page.
+
+    Returns:
+        str: The cursor of the next page.
+    """
+    return base64.urlsafe_b64encode(
+        orjson.dumps([game.created_at.isoformat(), game.id])
+    ).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Read the position stored in a cursor.
+
+    Args:
+        cursor (str): A cursor built by ``encode_cursor``.
+
+    Returns:
+        tuple[datetime, int]: The creation time and the ID of the last game
+                              of the previous page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        created_at, game_id = orjson.loads(base64.urlsafe_b64decode(cursor))
+        created_at = datetime.fromisoformat(created_at)
+    except (ValueError, TypeError) as error:
+        raise ValueError("Invalid cursor") from error
+    if not isinstance(game_id, int):
+        raise ValueError("Invalid cursor")
+    return created_at, game_id
+
+
+@async_integrations_timer
+async def get_user_games(
+    user_id: int,
+    db: AsyncSession,
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[list[GameRecord], str | None]:
+    """
+    Retrieve a page of the games associated with a user, newest first.
+
+    Pages are read by keyset, continuing below the last game of the
+    previous page, so every page costs the same however long the history.
+    The games where the user is the first and the second player are read
+    separately, each from its ``(player_id, created_at, id)`` index walked
+    backwards, and merged with UNION ALL; a single query filtering on
+    either column could use neither index. The columns are selected
+    rather than the mapped class, so rows map straight to records without
+    loading ORM objects.
+
+    Args:
+        user_id (int): The ID of the user whose games are to be retrieved.
+        db (AsyncSession): The database session used for the operation.
+        limit (int): The most games on the page.
+        cursor (str | None): The cursor of the page, None for the first.
+
+    Returns:
+        tuple[list[GameRecord], str | None]: The games on the page and the
+                                             cursor of the next page, None
+                                             on the last one.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    after = decode_cursor(cursor) if cursor is not None else None
+
+    def games_as(player_id: InstrumentedAttribute[int]) -> Select:
+        """
+        Select the user's games on one side of the board.
+
+        Args:
+            player_id (InstrumentedAttribute[int]): The player column.
+
+        Returns:
+            Select: The newest games past the cursor on that side.
+        """
+        query = select(*GAME_COLUMNS).where(player_id == user_id)
+        if player_id is Game.player2_id:
+            query = query.where(Game.player1_id != user_id)
+        if after is not None:
+            query = query.where(tuple_(Game.created_at, Game.id) < after)
+        return query.order_by(
+            Game.created_at.desc(), Game.id.desc()
+        ).limit(limit + 1)
+
+    page = union_all(
+        games_as(Game.player1_id), games_as(Game.player2_id)
+    ).subquery()
+    result = await db.execute(
+        select(*page.c)
+        .order_by(page.c.created_at.desc(), page.c.id.desc())
+        .limit(limit + 1)
     )
-    games = result.scalars().all()
-    return games
+    games = [GameRecord(*row) for row in result]
+    if len(games) > limit:
+        return games[:limit], encode_cursor(games[limit - 1])
+    return games, None
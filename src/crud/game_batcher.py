@@ -0,0 +1,167 @@
+"""Module for game_batcher.
+
+Games recorded by concurrent requests, inserted in shared transactions.
+
+With batching on, ``POST /games/`` hands its game to the batcher instead
+of committing it alone. The batcher collects games for a short window or
+until a batch is full, inserts them with a single multi-row ``INSERT ...
+RETURNING`` in one transaction, and gives each request its own record.
+If the transaction fails, its games are inserted one by one, so an invalid
+game fails only its own request. Once the batch is committed its games are
+never inserted again, whatever fails afterwards.
+"""
+
+import asyncio
+import logging
+from time import monotonic
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import settings
+from config.db import async_session
+from crud.game import (
+    create_game,
+    get_stored_games,
+    insert_games,
+    publish_games,
+)
+from metrics import GAME_BATCH_COMMIT_LATENCY, GAME_BATCH_SIZE
+from schema.game import GameCreate, GameRecord
+
+Pending = tuple[GameCreate, asyncio.Future[GameRecord]]
+
+
+class GameBatcher:
+    """Insert the games of concurrent requests in shared transactions."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        window: float,
+        max_size: int,
+    ) -> None:
+        """
+        Initialize an empty batcher.
+
+        Args:
+            session_factory (async_sessionmaker[AsyncSession]): The maker
+                of the sessions batches are inserted with.
+            window (float): Seconds a game waits for others.
+            max_size (int): The most games inserted at once.
+        """
+        self.session_factory = session_factory
+        self.window = window
+        self.max_size = max_size
+        self._pending: list[Pending] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def add(self, game: GameCreate) -> GameRecord:
+        """
+        Create a game with the next batch.
+
+        Args:
+            game (GameCreate): The game data to be created.
+
+        Returns:
+            GameRecord: The created game, or the one stored before
+                        with the same idempotency key.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((game, future))
+        if len(self._pending) >= self.max_size:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush_pending)
+        return await asyncio.shield(future)
+
+    def _flush_pending(self) -> None:
+        """Start inserting the games collected so far."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[Pending]) -> None:
+        """
+        Insert a batch of games and resolve the requests waiting for them.
+
+        Args:
+            batch (list[Pending]): The games and their futures.
+        """
+        GAME_BATCH_SIZE.observe(len(batch))
+        games = [game for game, _ in batch]
+        start = monotonic()
+        try:
+            async with self.session_factory() as db:
+                created, ratings = await insert_games(games, db)
+        except Exception:
+            logging.exception(
+                "Failed to insert a batch of %s games, "
+                "inserting them one by one",
+                len(batch),
+            )
+            await asyncio.gather(
+                *(self._create_one(game, future) for game, future in batch)
+            )
+            return
+        GAME_BATCH_COMMIT_LATENCY.observe(monotonic() - start)
+        await publish_games(created, ratings)
+        try:
+            async with self.session_factory() as db:
+                records = await get_stored_games(games, created, db)
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), record in zip(batch, records):
+            if not future.done():
+                future.set_result(record)
+
+    async def _create_one(
+        self, game: GameCreate, future: asyncio.Future[GameRecord]
+    ) -> None:
+        """
+        Insert a game of a failed batch on its own.
+
+        Args:
+            game (GameCreate): The game data to be created.
+            future (asyncio.Future[GameRecord]): The future of its request.
+        """
+        try:
+            async with self.session_factory() as db:
+                record = await create_game(game, db)
+        except Exception as error:
+            if not future.done():
+                future.set_exception(error)
+        else:
+            if not future.done():
+                future.set_result(record)
+
+    async def close(self) -> None:
+        """Insert the games still collected and wait for all batches."""
+        if self._pending:
+            self._flush_pending()
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+
+
+game_batcher = GameBatcher(
+    async_session,
+    window=settings.GAME_BATCH_WINDOW,
+    max_size=settings.GAME_BATCH_MAX_SIZE,
+)
+
+
+def get_game_batcher() -> GameBatcher:
+    """
+    Retrieve the current instance of the GameBatcher.
+
+    Returns:
+        GameBatcher: The current instance of the GameBatcher.
+    """
+    return game_batcher
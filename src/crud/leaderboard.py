@@ -0,0 +1,158 @@
+"""Module for leaderboard.
+
+Players ranked by Elo rating in a Redis sorted set.
+
+Ratings are stored in Postgres with the stats and copied here after every
+recorded game, so top lists and ranks are O(log n) reads. The set can be
+rebuilt from Postgres at any time with ``jobs.rebuild_leaderboard``.
+
+Ratings are copied after commit, when the players' rows are no longer
+locked, so two games of a player may be copied in either order. Each
+rating comes with the number of games it counts, kept in a hash next to
+the set, and a rating replaces only one counting fewer games.
+"""
+
+from collections.abc import AsyncIterable
+
+from integrations.redis import get_redis
+from metrics import async_integrations_timer
+
+LEADERBOARD_KEY = "TICTACTOE:leaderboard"
+GAMES_KEY = "TICTACTOE:leaderboard:games"
+REBUILD_KEY = "TICTACTOE:leaderboard:rebuild"
+REBUILD_GAMES_KEY = "TICTACTOE:leaderboard:games:rebuild"
+
+SET_RATINGS_SCRIPT = """
+for i = 1, #ARGV, 3 do
+    local games = tonumber(ARGV[i + 2])
+    local stored = tonumber(redis.call('HGET', KEYS[2], ARGV[i]) or '-1')
+    if games > stored then
+        redis.call('ZADD', KEYS[1], ARGV[i + 1], ARGV[i])
+        redis.call('HSET', KEYS[2], ARGV[i], games)
+    end
+end
+return 0
+"""
+
+set_ratings_script = get_redis().register_script(SET_RATINGS_SCRIPT)
+
+
+@async_integrations_timer
+async def set_ratings(ratings: dict[int, tuple[float, int]]) -> None:
+    """
+    Store the new ratings of players, unless newer ones are stored.
+
+    Args:
+        ratings (dict[int, tuple[float, int]]): The rating and the number
+                                                of games it counts by
+                                                Telegram ID.
+    """
+    if ratings:
+        await set_ratings_script(
+            keys=[LEADERBOARD_KEY, GAMES_KEY],
+            args=[
+                value
+                for telegram_id, (rating, games) in ratings.items()
+                for value in (telegram_id, rating, games)
+            ],
+        )
+
+
+@async_integrations_timer
+async def get_top(limit: int) -> list[tuple[int, float]]:
+    """
+    Retrieve the highest rated players.
+
+    Args:
+        limit (int): The number of players.
+
+    Returns:
+        list[tuple[int, float]]: Telegram ID and rating pairs, best first.
+    """
+    top = await get_redis().zrevrange(
+        LEADERBOARD_KEY, 0, limit - 1, withscores=True
+    )
+    return [(int(telegram_id), rating) for telegram_id, rating in top]
+
+
+@async_integrations_timer
+async def get_rank(telegram_id: int) -> tuple[int, float] | None:
+    """
+    Retrieve the place and rating of a player.
+
+    Args:
+        telegram_id (int): The Telegram ID of the player.
+
+    Returns:
+        tuple[int, float] | None: The place, starting at 1, and the rating,
+                                  or None for a player without games.
+    """
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.zrevrank(LEADERBOARD_KEY, telegram_id)
+        pipe.zscore(LEADERBOARD_KEY, telegram_id)
+        rank, rating = await pipe.execute()
+    if rank is None:
+        return None
+    return rank + 1, rating
+
+
+@async_integrations_timer
+async def get_rating(telegram_id: int) -> float | None:
+    """
+    Retrieve the rating of a player.
+
+    Args:
+        telegram_id (int): The Telegram ID of the player.
+
+    Returns:
+        float | None: The rating, or None for a player without games.
+    """
+    return await get_redis().zscore(LEADERBOARD_KEY, telegram_id)
+
+
+async def rebuild_leaderboard(
+    ratings: AsyncIterable[dict[int, tuple[float, int]]],
+) -> int:
+    """
+    Replace the leaderboard with ratings read from Postgres.
+
+    The new set is filled under a separate key and swapped in at once, so
+    readers never see a partial leaderboard.
+
+    Args:
+        ratings (AsyncIterable[dict[int, tuple[float, int]]]): Batches of
+            ratings and numbers of games by Telegram ID.
+
+    Returns:
+        int: The number of players on the leaderboard.
+    """
+    redis = get_redis()
+    await redis.delete(REBUILD_KEY, REBUILD_GAMES_KEY)
+    players = 0
+    async for batch in ratings:
+        if batch:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.zadd(
+                    REBUILD_KEY,
+                    {
+                        telegram_id: rating
+                        for telegram_id, (rating, _) in batch.items()
+                    },
+                )
+                pipe.hset(
+                    REBUILD_GAMES_KEY,
+                    mapping={
+                        telegram_id: games
+                        for telegram_id, (_, games) in batch.items()
+                    },
+                )
+                await pipe.execute()
+            players += len(batch)
+    async with redis.pipeline(transaction=True) as pipe:
+        if players:
+            pipe.rename(REBUILD_KEY, LEADERBOARD_KEY)
+            pipe.rename(REBUILD_GAMES_KEY, GAMES_KEY)
+        else:
+            pipe.delete(LEADERBOARD_KEY, GAMES_KEY)
+        await pipe.execute()
+    return players
@@ -1,12 +1,51 @@
 """Module for redis."""
 
+import asyncio
+from collections.abc import Awaitable, Callable
 from datetime import timedelta
-from typing import Any
+from typing import Any, TypeVar
 
 import orjson
 
 from integrations.redis import get_redis
-from metrics import async_integrations_timer
+from metrics import CACHE_REQUESTS, async_integrations_timer
+
+GAMES_CACHE_TTL = timedelta(minutes=10)
+GAMES_VERSION_TTL = timedelta(days=1)
+
+T = TypeVar("T")
+
+loads: dict[str, asyncio.Task] = {}
+
+
+async def load_once(
+    cache: str, key: str, load: Callable[[], Awaitable[T]]
+) -> T:
+    """
+    Run a cache miss once for all concurrent callers in this process.
+
+    The first caller starts ``load`` in a task, later callers with the same
+    key wait for that task instead of querying the database again. The
+    task outlives the request that started it, so ``load`` must open its
+    own database session rather than use the request's.
+
+    Args:
+        cache (str): The name of the cache reported in the metrics.
+        key (str): The key of the missing entry.
+        load (Callable[[], Awaitable[T]]): Read the entry and cache it.
+
+    Returns:
+        T: The result of ``load``.
+    """
+    task = loads.get(key)
+    if task is not None:
+        CACHE_REQUESTS.labels(cache=cache, result="coalesced").inc()
+        return await asyncio.shield(task)
+    CACHE_REQUESTS.labels(cache=cache, result="miss").inc()
+    task = asyncio.ensure_future(load())
+    loads[key] = task
+    task.add_done_callback(lambda _: loads.pop(key, None))
+    return await asyncio.shield(task)
 
 
 async def get_model_cache(model: str, user_id: int) -> str:
@@ -76,3 +115,103 @@ async def redis_drop_model_key(model: str, model_id: int) -> None:
     redis = get_redis()
     redis_key = await get_model_cache(model, model_id)
     await redis.delete(redis_key)
+
+
+async def get_games_version_cache(user_id: int) -> str:
+    """
+    Generate the key of the version of a user's game history.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        str: The generated cache key.
+    """
+    return f"TICTACTOE:games:{user_id}:version"
+
+
+async def get_games_page_cache(
+    user_id: int, version: int, limit: int, cursor: str | None
+) -> str:
+    """
+    Generate a cache key for a page of a user's game history.
+
+    Args:
+        user_id (int): The ID of the user.
+        version (int): The version of the user's game history.
+        limit (int): The most games on the page.
+        cursor (str | None): The cursor of the page, None for the first.
+
+    Returns:
+        str: The generated cache key.
+    """
+    return f"TICTACTOE:games:{user_id}:{version}:{limit}:{cursor or ''}"
+
+
+@async_integrations_timer
+async def redis_get_games_page(
+    user_id: int,
+    limit: int,
+    cursor: str | None,
+    load: Callable[[], Awaitable[Any]],
+) -> bytes:
+    """
+    Retrieve a page of a user's game history, reading through the cache.
+
+    Pages are cached under the current version of the history, so bumping
+    the version when a game is recorded makes all older pages unreachable
+    until they expire. The version is read before the database, so a page
+    read while a game is recorded is cached under the old version. Misses
+    of the same page in this process share one call to ``load``.
+
+    Args:
+        user_id (int): The ID of the user.
+        limit (int): The most games on the page.
+        cursor (str | None): The cursor of the page, None for the first.
+        load (Callable[[], Awaitable[Any]]): Read the page from the
+                                              database on a miss.
+
+    Returns:
+        bytes: The page in JSON format.
+    """
+    redis = get_redis()
+    version = await redis.get(await get_games_version_cache(user_id))
+    redis_key = await get_games_page_cache(
+        user_id, int(version or 0), limit, cursor
+    )
+    cache = await redis.get(redis_key)
+    if cache is not None:
+        CACHE_REQUESTS.labels(cache="games", result="hit").inc()
+        return cache
+
+    async def load_page() -> bytes:
+        """
+        Read the page from the database and cache it.
+
+        Returns:
+            bytes: The page in JSON format.
+        """
+        page = orjson.dumps(await load())
+        await redis.set(redis_key, page, ex=GAMES_CACHE_TTL)
+        return page
+
+    return await load_once("games", redis_key, load_page)
+
+
+@async_integrations_timer
+async def redis_bump_games_version(*user_ids: int) -> None:
+    """
+    Invalidate the cached game history of users.
+
+    Args:
+        *user_ids (int): The IDs of the users who played a new game.
+
+    Returns:
+        None
+    """
+    async with get_redis().pipeline(transaction=False) as pipe:
+        for user_id in dict.fromkeys(user_ids):
+            redis_key = await get_games_version_cache(user_id)
+            pipe.incr(redis_key)
+            pipe.expire(redis_key, GAMES_VERSION_TTL)
+        await pipe.execute()
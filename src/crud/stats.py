@@ -0,0 +1,174 @@
+"""Module for stats."""
+
+from collections.abc import Iterable
+from typing import Protocol
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from metrics import async_integrations_timer
+from models import UserStats
+
+WIN = "win"
+LOSS = "loss"
+DRAW = "draw"
+
+DEFAULT_RATING = 1000.0
+ELO_K = 32.0
+SCORES = {WIN: 1.0, LOSS: 0.0, DRAW: 0.5}
+
+
+class GameResult(Protocol):
+    """The fields of a game the stats are built from."""
+
+    player1_id: int
+    player2_id: int
+    result: str
+
+
+def get_outcomes(game: GameResult) -> tuple[tuple[int, str], ...]:
+    """
+    Tell how a game ended for each of its players.
+
+    Args:
+        game (GameResult): The finished game.
+
+    Returns:
+        tuple[tuple[int, str], ...]: The Telegram ID of each player with
+                                     ``WIN``, ``LOSS`` or ``DRAW``.
+    """
+    if game.result == "X":
+        return (game.player1_id, WIN), (game.player2_id, LOSS)
+    if game.result == "O":
+        return (game.player1_id, LOSS), (game.player2_id, WIN)
+    return (game.player1_id, DRAW), (game.player2_id, DRAW)
+
+
+def apply_outcome(stats: UserStats, outcome: str) -> None:
+    """
+    Count one more game in a user's stats.
+
+    The current streak is the number of games won in a row, negative for
+    games lost in a row, and is reset by a draw.
+
+    Args:
+        stats (UserStats): The stats to update in place.
+        outcome (str): ``WIN``, ``LOSS`` or ``DRAW``.
+    """
+    if outcome == WIN:
+        stats.wins += 1
+        stats.current_streak = max(stats.current_streak, 0) + 1
+        stats.best_streak = max(stats.best_streak, stats.current_streak)
+    elif outcome == LOSS:
+        stats.losses += 1
+        stats.current_streak = min(stats.current_streak, 0) - 1
+    else:
+        stats.draws += 1
+        stats.current_streak = 0
+
+
+def apply_game(stats: dict[int, UserStats], game: GameResult) -> None:
+    """
+    Count a game in both players' stats and move their Elo ratings.
+
+    Args:
+        stats (dict[int, UserStats]): The stats of the players by
+                                      Telegram ID, updated in place.
+        game (GameResult): The finished game.
+    """
+    (player1_id, outcome1), (player2_id, outcome2) = get_outcomes(game)
+    player1, player2 = stats[player1_id], stats[player2_id]
+    expected = 1 / (1 + 10 ** ((player2.rating - player1.rating) / 400))
+    change = ELO_K * (SCORES[outcome1] - expected)
+    player1.rating += change
+    player2.rating -= change
+    apply_outcome(player1, outcome1)
+    apply_outcome(player2, outcome2)
+
+
+def empty_stats(telegram_id: int) -> UserStats:
+    """
+    Build the stats of a user who has not finished a game.
+
+    Args:
+        telegram_id (int): The Telegram ID of the user.
+
+    Returns:
+        UserStats: Stats with every counter at zero.
+    """
+    return UserStats(
+        telegram_id=telegram_id,
+        wins=0,
+        losses=0,
+        draws=0,
+        current_streak=0,
+        best_streak=0,
+        rating=DEFAULT_RATING,
+        last_played_at=None,
+    )
+
+
+@async_integrations_timer
+async def update_user_stats(
+    games: Iterable[GameResult], db: AsyncSession
+) -> dict[int, tuple[float, int]]:
+    """
+    Add new games to their players' stats and ratings without committing.
+
+    Called in the transaction that stores the games, so the stats never
+    count a game that was not stored. The players' rows are locked in a
+    fixed order, so concurrent transactions do not deadlock.
+
+    Args:
+        games (Iterable[GameResult]): The new games, oldest first.
+        db (AsyncSession): The database session used for the operation.
+
+    Returns:
+        dict[int, tuple[float, int]]: The new rating of each player and the
+                                      number of games it counts by
+                                      Telegram ID.
+    """
+    games = list(games)
+    player_ids = sorted(
+        {player_id for game in games for player_id, _ in get_outcomes(game)}
+    )
+    if not player_ids:
+        return {}
+    await db.execute(
+        insert(UserStats)
+        .values([{"telegram_id": player_id} for player_id in player_ids])
+        .on_conflict_do_nothing()
+    )
+    result = await db.execute(
+        select(UserStats)
+        .where(UserStats.telegram_id.in_(player_ids))
+        .order_by(UserStats.telegram_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    stats = {row.telegram_id: row for row in result.scalars()}
+    for game in games:
+        apply_game(stats, game)
+    for row in stats.values():
+        row.last_played_at = func.now()
+    await db.flush()
+    return {
+        row.telegram_id: (row.rating, row.wins + row.losses + row.draws)
+        for row in stats.values()
+    }
+
+
+@async_integrations_timer
+async def get_user_stats(telegram_id: int, db: AsyncSession) -> UserStats:
+    """
+    Retrieve the stats of a user.
+
+    Args:
+        telegram_id (int): The Telegram ID of the user.
+        db (AsyncSession): The database session used for the operation.
+
+    Returns:
+        UserStats: The user's stats, all zero if they have no games.
+    """
+    stats = await db.get(UserStats, telegram_id)
+    return stats if stats is not None else empty_stats(telegram_id)
@@ -1,26 +1,42 @@
 """Module for user."""
 
-from sqlalchemy import select
+from typing import Sequence
+from sqlalchemy import Row, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from models import User
-from schema.user import UserCreate
+from schema.user import UserCreate, UserRecord
 from metrics import async_integrations_timer
 
+USER_COLUMNS = (User.id, User.telegram_id, User.username)
+
 
 @async_integrations_timer
-async def create_user(user: UserCreate, db: AsyncSession):
+async def upsert_user(user: UserCreate, db: AsyncSession) -> UserRecord:
     """
-    Create a new user in the database.
+    Create a user, or update the username of the existing one.
+
+    A single ``INSERT ... ON CONFLICT DO UPDATE RETURNING`` statement, so
+    concurrent registrations of the same Telegram ID cannot conflict and
+    an existing user is never looked up separately.
 
     Args:
-        user (UserCreate): The user data to be created.
+        user (UserCreate): The user data to be stored.
         db (AsyncSession): The database session used for the operation.
 
     Returns:
-        User: The created user object.
+        UserRecord: The created or updated user.
     """
-    db_user = User(telegram_id=user.telegram_id, username=user.username)
-    db.add(db_user)
+    statement = insert(User).values(
+        telegram_id=user.telegram_id, username=user.username
+    )
+    result = await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[User.telegram_id],
+            set_={"username": statement.excluded.username},
+        ).returning(*USER_COLUMNS)
+    )
+    db_user = UserRecord(*result.one())
     await db.commit()
     return db_user
 
@@ -40,3 +56,26 @@ async def get_user_by_tg_id(tg_id: int, db: AsyncSession) -> User | None:
     user = await db.execute(select(User).where(User.telegram_id == tg_id))
     user = user.scalar()
     return user
+
+
+@async_integrations_timer
+async def get_usernames_by_tg_ids(
+    tg_ids: list[int], db: AsyncSession
+) -> Sequence[Row[tuple[int, str]]]:
+    """
+    Retrieve the usernames of several users by their Telegram IDs.
+
+    Args:
+        tg_ids (list[int]): The Telegram IDs of the users.
+        db (AsyncSession): The database session used for the operation.
+
+    Returns:
+        Sequence[Row[tuple[int, str]]]: Telegram ID and username pairs
+                                        of the users found.
+    """
+    result = await db.execute(
+        select(User.telegram_id, User.username).where(
+            User.telegram_id.in_(tg_ids)
+        )
+    )
+    return result.all()
@@ -3,7 +3,7 @@
 from fastapi import Request, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from integrations.auth import decode_jwt
+from integrations.token_cache import get_token_cache
 
 
 class JWTBearer(HTTPBearer):
@@ -22,6 +22,8 @@ class JWTBearer(HTTPBearer):
         """
         Call the JWTBearer instance to authenticate a request.
 
+        The claims of the token are kept in ``request.state.claims``.
+
         Args:
             request (Request): The incoming HTTP request.
 
@@ -37,32 +39,30 @@ class JWTBearer(HTTPBearer):
                 raise HTTPException(
                     status_code=403, detail="Invalid authentication scheme. Use Bearer"
                 )
-            if not self.verify_jwt(credentials.credentials):
+            claims = self.verify_jwt(credentials.credentials)
+            if claims is None:
                 raise HTTPException(
                     status_code=403, detail="Invalid token or expired token."
                 )
+            request.state.claims = claims
             return credentials
         else:
             return HTTPAuthorizationCredentials(scheme="", credentials="")
 
-    def verify_jwt(self, jwtoken: str) -> bool:
+    def verify_jwt(self, jwtoken: str) -> dict | None:
         """
         Verify the validity of a JSON Web Token (JWT).
 
+        Tokens verified before are looked up in the token cache.
+
         Args:
             jwtoken (str): The JSON Web Token to be verified.
 
         Returns:
-            bool: True if the token is valid and successfully decoded;
-                False if the token is invalid or cannot be decoded.
+            dict | None: The claims if the token is valid and successfully
+                decoded; None if the token is invalid or cannot be decoded.
         """
-        isTokenValid: bool = False
-
         try:
-            payload = decode_jwt(jwtoken)
+            return get_token_cache().verify(jwtoken)
         except Exception:
-            payload = None
-        if payload:
-            isTokenValid = True
-
-        return isTokenValid
+            return None
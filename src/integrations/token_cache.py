@@ -0,0 +1,89 @@
+"""Module for token_cache.
+
+Access tokens verified before, kept until they expire.
+
+The bot sends the same token with every request for its whole lifetime,
+so after the first request a token is recognised by a SHA-256 digest of
+it instead of checking its signature and parsing it again. The digest
+covers the signature, so a forged token never matches a cached one.
+"""
+
+import hashlib
+import time
+
+from config import settings
+from integrations.auth import decode_jwt
+from metrics import CACHE_REQUESTS
+
+
+class TokenCache:
+    """Cache the claims of verified access tokens in process."""
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize (int): The most tokens kept.
+        """
+        self.maxsize = maxsize
+        self._claims: dict[bytes, dict] = {}
+
+    def verify(self, token: str) -> dict | None:
+        """
+        Get the claims of a valid token.
+
+        Args:
+            token (str): The access token sent with a request.
+
+        Returns:
+            dict | None: The decoded claims, or None if the token is
+                         invalid or expired.
+        """
+        digest = hashlib.sha256(token.encode()).digest()
+        claims = self._claims.get(digest)
+        if claims is not None:
+            if claims["expires"] >= time.time():
+                CACHE_REQUESTS.labels(cache="tokens", result="hit").inc()
+                return claims
+            del self._claims[digest]
+        CACHE_REQUESTS.labels(cache="tokens", result="miss").inc()
+        claims = decode_jwt(token)
+        if not claims:
+            return None
+        self._remember(digest, claims)
+        return claims
+
+    def _remember(self, digest: bytes, claims: dict) -> None:
+        """
+        Keep the claims of a token, making room when full.
+
+        Tokens are issued with the same lifetime, so the oldest ones kept
+        are the first to expire. They are dropped once expired, and the
+        oldest one is dropped when there is no room.
+
+        Args:
+            digest (bytes): The digest of the token.
+            claims (dict): The decoded claims.
+        """
+        now = time.time()
+        while self._claims:
+            oldest = next(iter(self._claims))
+            expired = self._claims[oldest]["expires"] < now
+            if len(self._claims) < self.maxsize and not expired:
+                break
+            del self._claims[oldest]
+        self._claims[digest] = claims
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
+
+def get_token_cache() -> TokenCache:
+    """
+    Retrieve the current instance of the TokenCache.
+
+    Returns:
+        TokenCache: The current instance of the TokenCache.
+    """
+    return token_cache
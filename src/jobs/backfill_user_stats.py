@@ -0,0 +1,83 @@
+"""Module for backfill_user_stats.
+
+Rebuild every user's stats and rating from the ``games`` table, replaying
+the games in the order they were recorded. Rebuild the leaderboard with
+``jobs.rebuild_leaderboard`` afterwards.
+
+The stats table is locked for the whole run, so games recorded meanwhile
+wait and are added on top of the rebuilt stats instead of being lost or
+counted twice.
+
+Only games whose result is 'X', 'O' or 'draw' are replayed. Older games
+store the winner's username instead, which does not tell which player won,
+so they are skipped and their number is logged.
+
+Run from the ``src`` directory:
+
+    python -m jobs.backfill_user_stats
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.db import async_session
+from crud.stats import DRAW, apply_game, empty_stats, get_outcomes
+from models import Game, UserStats
+
+BATCH_SIZE = 10_000
+RESULTS = ("X", "O", DRAW)
+
+
+async def backfill_user_stats(db: AsyncSession) -> tuple[int, int]:
+    """
+    Replace the stats of all users with ones built from their games.
+
+    Args:
+        db (AsyncSession): The database session used for the operation.
+
+    Returns:
+        tuple[int, int]: The number of users with stats and the number of
+                         games skipped for an unknown result.
+    """
+    await db.execute(
+        text(f"lock table {UserStats.__table__.fullname} in exclusive mode")
+    )
+    await db.execute(delete(UserStats))
+    stats: dict[int, UserStats] = {}
+    skipped = 0
+    games = await db.stream(
+        select(Game.player1_id, Game.player2_id, Game.result, Game.created_at)
+        .order_by(Game.created_at, Game.id)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    async for game in games:
+        if game.result not in RESULTS:
+            skipped += 1
+            continue
+        for player_id, _ in get_outcomes(game):
+            if player_id not in stats:
+                stats[player_id] = empty_stats(player_id)
+            stats[player_id].last_played_at = game.created_at
+        apply_game(stats, game)
+    db.add_all(stats.values())
+    await db.commit()
+    return len(stats), skipped
+
+
+async def main() -> None:
+    """Run the backfill and report how many users it covered."""
+    logging.basicConfig(level=logging.INFO)
+    async with async_session() as db:
+        users, skipped = await backfill_user_stats(db)
+    logging.info("Rebuilt the stats of %s users", users)
+    if skipped:
+        logging.warning(
+            "Skipped %s games whose result is not X, O or draw", skipped
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,63 @@
+"""Module for rebuild_leaderboard.
+
+Refill the Redis leaderboard from the ratings stored in Postgres, after
+Redis lost its data or after ``jobs.backfill_user_stats``. A game recorded
+while the job runs may be missing from the result until its players'
+next game.
+
+Run from the ``src`` directory:
+
+    python -m jobs.rebuild_leaderboard
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.db import async_session
+from crud.leaderboard import rebuild_leaderboard
+from models import UserStats
+
+BATCH_SIZE = 10_000
+
+
+async def read_ratings(
+    db: AsyncSession,
+) -> AsyncIterator[dict[int, tuple[float, int]]]:
+    """
+    Read the ratings of all players in batches.
+
+    Args:
+        db (AsyncSession): The database session used for the operation.
+
+    Yields:
+        dict[int, tuple[float, int]]: A batch of ratings and numbers of
+                                      games by Telegram ID.
+    """
+    result = await db.stream(
+        select(
+            UserStats.telegram_id,
+            UserStats.rating,
+            UserStats.wins + UserStats.losses + UserStats.draws,
+        ).execution_options(yield_per=BATCH_SIZE)
+    )
+    async for batch in result.partitions():
+        yield {
+            telegram_id: (rating, games)
+            for telegram_id, rating, games in batch
+        }
+
+
+async def main() -> None:
+    """Run the rebuild and report how many players it covered."""
+    logging.basicConfig(level=logging.INFO)
+    async with async_session() as db:
+        players = await rebuild_leaderboard(read_ratings(db))
+    logging.info("Rebuilt the leaderboard of %s players", players)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,10 +4,11 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config.logger import setup_logger
+from crud.game_batcher import get_game_batcher
 from integrations.redis import get_redis
 from middleware.logger import LogServerMiddleware
 from models.meta import create_db
-from api import game_router, user_router
+from api import game_router, leaderboard_router, user_router
 from metrics import counter_metrics, metrics
 
 
@@ -47,6 +48,7 @@ async def lifespan(app: FastAPI):
     get_redis()
     print("START WEB APP")
     yield
+    await get_game_batcher().close()
     print("END WEB APP")
 
 
@@ -60,6 +62,7 @@ def main() -> FastAPI:
     app = FastAPI(lifespan=lifespan)
     app.include_router(user_router)
     app.include_router(game_router)
+    app.include_router(leaderboard_router)
     app.add_route("/metrics", metrics)
 
     setup_middleware(app)
@@ -64,6 +64,25 @@ INTEGRATIONS_LATENCY = prometheus_client.Histogram(
     buckets=DEFAULT_BUCKETS,
 )
 
+CACHE_REQUESTS = prometheus_client.Counter(
+    "tictactoe_cache_requests_total",
+    "Redis cache lookups by cache and result, a coalesced miss waited for "
+    "the database query of a concurrent miss",
+    ["cache", "result"],
+)
+
+GAME_BATCH_SIZE = prometheus_client.Histogram(
+    "tictactoe_game_batch_size",
+    "Games inserted in one shared transaction",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float("+inf")),
+)
+
+GAME_BATCH_COMMIT_LATENCY = prometheus_client.Histogram(
+    "tictactoe_game_batch_commit_latency_seconds",
+    "Time to insert and commit a batch of games",
+    buckets=DEFAULT_BUCKETS,
+)
+
 ROUTES_LATENCY = prometheus_client.Histogram(
     "tictactoe_routes_latency_seconds",
     "",
@@ -1,8 +1,9 @@
 """Module for init."""
 
-from .models import User, Game
+from .models import User, Game, UserStats
 
 __all__ = (
     "User",
     "Game",
+    "UserStats",
 )
@@ -1,7 +1,17 @@
 """Module for models."""
 
 from dataclasses import dataclass
-from sqlalchemy import BigInteger, String, ForeignKey
+from datetime import datetime
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Float,
+    Index,
+    Integer,
+    String,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .meta import Base
@@ -30,6 +40,20 @@ class Game(Base):
     """Represent a Tic-Tac-Toe game in the application."""
 
     __tablename__ = "games"
+    __table_args__ = (
+        Index(
+            "ix_games_player1_id_created_at_id",
+            "player1_id",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_games_player2_id_created_at_id",
+            "player2_id",
+            "created_at",
+            "id",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
     player1_id: Mapped[int] = mapped_column(
@@ -39,6 +63,12 @@ class Game(Base):
         ForeignKey("users.telegram_id"), nullable=False
     )
     result: Mapped[str] = mapped_column(String, nullable=False)
+    idempotency_key: Mapped[str | None] = mapped_column(
+        String, unique=True, nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
 
     player1: Mapped["User"] = relationship(
         "User", back_populates="games_as_player1", foreign_keys=[player1_id]
@@ -46,3 +76,35 @@ class Game(Base):
     player2: Mapped["User"] = relationship(
         "User", back_populates="games_as_player2", foreign_keys=[player2_id]
     )
+
+
+@dataclass
+class UserStats(Base):
+    """Represent the running totals of a user's finished games."""
+
+    __tablename__ = "user_stats"
+
+    telegram_id: Mapped[int] = mapped_column(
+        ForeignKey("users.telegram_id"), primary_key=True
+    )
+    wins: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    losses: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    draws: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    current_streak: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    best_streak: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    rating: Mapped[float] = mapped_column(
+        Float, nullable=False, server_default="1000"
+    )
+    last_played_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
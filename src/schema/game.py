@@ -1,5 +1,8 @@
 """Module for schema."""
 
+from dataclasses import dataclass
+from datetime import datetime
+
 from pydantic import UUID4, BaseModel
 
 
@@ -9,9 +12,28 @@ class GameCreate(BaseModel):
     player1_id: int
     player2_id: int
     result: str
+    idempotency_key: str | None = None
 
 
 class GameResponse(GameCreate):
     """Model for ask with information about game."""
 
     id: UUID4
+
+
+@dataclass
+class GameRecord:
+    """
+    Represent a stored game in responses and caches.
+
+    The fields follow ``crud.game.GAME_COLUMNS``, so a selected row maps
+    to a record positionally. Without ``__slots__`` orjson serializes a
+    record from its ``__dict__``, its fastest path for dataclasses.
+    """
+
+    id: int
+    player1_id: int
+    player2_id: int
+    result: str
+    idempotency_key: str | None
+    created_at: datetime
@@ -1,5 +1,7 @@
 """Module for user."""
 
+from dataclasses import dataclass
+
 from pydantic import BaseModel
 
 
@@ -8,3 +10,18 @@ class UserCreate(BaseModel):
 
     telegram_id: int
     username: str
+
+
+@dataclass
+class UserRecord:
+    """
+    Represent a stored user in responses and caches.
+
+    The fields follow ``crud.user.USER_COLUMNS``, so a selected row maps
+    to a record positionally. Without ``__slots__`` orjson serializes a
+    record from its ``__dict__``, its fastest path for dataclasses.
+    """
+
+    id: int
+    telegram_id: int
+    username: str | None
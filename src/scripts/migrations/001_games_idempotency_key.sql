@@ -0,0 +1,13 @@
+alter table tictactoe.games add column if not exists idempotency_key varchar;
+do $$
+begin
+    if not exists (
+        select 1 from pg_constraint
+        where conname = 'uq_games_idempotency_key'
+            and conrelid = 'tictactoe.games'::regclass
+    ) then
+        alter table tictactoe.games
+            add constraint uq_games_idempotency_key unique (idempotency_key);
+    end if;
+end
+$$;
@@ -0,0 +1,13 @@
+-- Existing games all get the time of the migration, their order is kept
+-- by the ID that breaks ties in the keyset. The indexes cover the whole
+-- keyset (created_at, id), so a page is a single backward index scan. Run
+-- the index statements outside a transaction, CONCURRENTLY does not block
+-- inserts.
+alter table tictactoe.games
+    add column if not exists created_at timestamptz not null default now();
+create index concurrently if not exists ix_games_player1_id_created_at_id
+    on tictactoe.games (player1_id, created_at, id);
+create index concurrently if not exists ix_games_player2_id_created_at_id
+    on tictactoe.games (player2_id, created_at, id);
+drop index concurrently if exists tictactoe.ix_games_player1_id_created_at;
+drop index concurrently if exists tictactoe.ix_games_player2_id_created_at;
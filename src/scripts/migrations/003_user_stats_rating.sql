@@ -0,0 +1,2 @@
+alter table tictactoe.user_stats
+    add column if not exists rating double precision not null default 1000;